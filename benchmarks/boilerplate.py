@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# this_file: benchmarks/boilerplate.py
+"""Compare a site conversion with and without a `BoilerplateCache`.
+
+Converts pages that share a header, a navigation and a footer, one
+`html22text()` call at a time and through caches in both modes:
+
+    python benchmarks/boilerplate.py --pages 500 --markdown
+"""
+
+import time
+
+import fire
+
+from html22text import BoilerplateCache, Options, html22text
+
+HEADER = "<header><h1>Example</h1><p>Docs, guides and <b>news</b></p></header>"
+NAV = (
+    "<nav><ul>"
+    + "".join(
+        f'<li><a href="section{i}/index.html">Section {i}</a></li>' for i in range(60)
+    )
+    + "</ul></nav>"
+)
+FOOTER = (
+    "<footer><p>&copy; 2024 Example Inc.</p><p>"
+    + "Terms, privacy and cookie policy. " * 20
+    + "</p></footer>"
+)
+
+
+def _page(number: int) -> str:
+    body = "".join(
+        f"<h2>Part {part}</h2><p>Paragraph {part} of page {number}, with a "
+        f"<a href='page{part}.html'>link</a>.</p>"
+        for part in range(10)
+    )
+    return (
+        f"<html><head><title>Page {number}</title></head><body><div id='page'>"
+        f"{HEADER}{NAV}<main>{body}</main>{FOOTER}</div></body></html>"
+    )
+
+
+def main(pages: int = 500, markdown: bool = False) -> None:
+    """Print the time and output size of each way to convert the site.
+
+    Args:
+        pages (int, optional): Number of pages. Defaults to 500.
+        markdown (bool, optional): Convert to Markdown. Defaults to False.
+    """
+    site = [_page(number) for number in range(pages)]
+    options = Options(markdown=markdown)
+    print(f"{pages} pages of {sum(map(len, site)) / pages:.0f} chars on average")
+
+    started = time.perf_counter()
+    size = sum(len(html22text(page, markdown=markdown)) for page in site)
+    print(f"html22text()  {time.perf_counter() - started:>6.2f}s {size:>10} chars")
+    for mode in ("reuse", "drop"):
+        cache = BoilerplateCache(mode)
+        started = time.perf_counter()
+        size = sum(len(cache.convert(page, options)) for page in site)
+        print(
+            f"{mode:<13} {time.perf_counter() - started:>6.2f}s {size:>10} chars"
+            f"  ({cache.hits} blocks from the cache)"
+        )
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
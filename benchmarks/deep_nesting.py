@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# this_file: benchmarks/deep_nesting.py
+"""Measure how conversion time grows with the nesting depth of markup.
+
+Converts tags nested to a depth and to four times that depth, and prints
+the ratio of the two times for each kind of nesting; linear growth gives
+about 4, quadratic growth 16:
+
+    python benchmarks/deep_nesting.py --depth 1000
+"""
+
+import time
+from typing import Any
+
+import fire
+
+from html22text import html22text
+
+# Nested tags and conversion options of each case.
+CASES: tuple[tuple[str, dict[str, Any]], ...] = (
+    ("div", {}),
+    ("span", {"markdown": True}),
+    ("mark", {}),
+    ("kbd", {"markdown": True}),
+    ("blockquote", {"block_quote": True}),
+    ("ul li", {"max_depth": 64}),
+)
+
+
+def _nested(open_tags: str, depth: int, text: str = "x") -> str:
+    close_tags = "".join(f"</{tag}>" for tag in reversed(open_tags.split()))
+    return (
+        "".join(f"<{tag}>" for tag in open_tags.split()) * depth
+        + text
+        + (close_tags * depth)
+    )
+
+
+def _best_time(html_content: str, options: dict[str, Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        html22text(html_content, **options)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main(depth: int = 1000, repeat: int = 3) -> None:
+    """Print the conversion time at a depth and at four times that depth.
+
+    Args:
+        depth (int, optional): Smaller nesting depth. Defaults to 1000.
+        repeat (int, optional): Runs per conversion; the best time is
+            printed. Defaults to 3.
+    """
+    for open_tags, options in CASES:
+        small = _best_time(_nested(open_tags, depth), options, repeat)
+        large = _best_time(_nested(open_tags, depth * 4), options, repeat)
+        print(
+            f"{open_tags:<12} {small * 1e3:>8.1f} ms {large * 1e3:>8.1f} ms"
+            f"  x{large / small:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
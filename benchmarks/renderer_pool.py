@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# this_file: benchmarks/renderer_pool.py
+"""Compare the per-call cost of fresh and pooled renderers.
+
+Renders the same small documents with a newly configured `HTML2Text` per
+call and with a renderer lent from the per-thread pool:
+
+    python benchmarks/renderer_pool.py --size 1024 --calls 20000
+"""
+
+import time
+
+import fire
+
+from html22text import Options
+from html22text.html22text import _pooled_renderer, _prepare_html, _renderer
+
+
+def main(size: int = 1024, calls: int = 20000, markdown: bool = True) -> None:
+    """Print microseconds per call for construction, rendering and conversion.
+
+    Args:
+        size (int, optional): Approximate size of the HTML input in bytes.
+            Defaults to 1024.
+        calls (int, optional): Number of calls per measurement.
+            Defaults to 20000.
+        markdown (bool, optional): Convert to Markdown. Defaults to True.
+    """
+    options = Options(markdown=markdown)
+    paragraph = "<p>Some <b>bold</b> and <a href='x.html'>linked</a> text.</p>"
+    html_content = paragraph * max(1, size // len(paragraph))
+    html = _prepare_html(options, html_content)
+
+    def fresh() -> None:
+        _renderer(options).handle(html)
+
+    def pooled() -> None:
+        with _pooled_renderer(options) as h:
+            h.handle(html)
+
+    def setup_fresh() -> None:
+        _renderer(options)
+
+    def setup_pooled() -> None:
+        with _pooled_renderer(options):
+            pass
+
+    print(f"{len(html_content)} bytes of HTML, {calls} calls")
+    print(f"{'':<12} {'fresh (µs)':>11} {'pooled (µs)':>12}")
+    for name, pair in (
+        ("setup", (setup_fresh, setup_pooled)),
+        ("render", (fresh, pooled)),
+    ):
+        timings = []
+        for function in pair:
+            started = time.perf_counter()
+            for _ in range(calls):
+                function()
+            timings.append((time.perf_counter() - started) / calls * 1e6)
+        print(f"{name:<12} {timings[0]:>11.1f} {timings[1]:>12.1f}")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
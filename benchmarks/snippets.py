@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# this_file: benchmarks/snippets.py
+"""Compare snippets per second of `html22text()` and `convert_snippets()`.
+
+Converts the same short HTML fragments one call at a time and as a batch:
+
+    python benchmarks/snippets.py --snippets 20000 --markdown
+"""
+
+import time
+
+import fire
+
+from html22text import convert_snippets, html22text
+
+FRAGMENTS = [
+    "Thanks, see you <b>tomorrow</b>!",
+    "<p>Release notes are <a href='notes.html'>here</a> &amp; in the wiki.</p>",
+    "<ul><li>milk</li><li>eggs</li></ul>",
+    "<p>Call <em>me</em> maybe.</p><p>Or don't.</p>",
+    "<h3>Opening hours</h3><p>Mon&ndash;Fri 9&ndash;17</p>",
+]
+
+
+def main(snippets: int = 20000, markdown: bool = False) -> None:
+    """Print snippets per second for single calls and for one batch.
+
+    Args:
+        snippets (int, optional): Number of snippets. Defaults to 20000.
+        markdown (bool, optional): Convert to Markdown. Defaults to False.
+    """
+    inputs = [f"{FRAGMENTS[i % len(FRAGMENTS)]} #{i}" for i in range(snippets)]
+    size = sum(map(len, inputs)) / snippets
+    print(f"{snippets} snippets of {size:.0f} chars on average")
+
+    started = time.perf_counter()
+    single = [html22text(snippet, markdown=markdown) for snippet in inputs]
+    print(f"html22text()        {snippets / (time.perf_counter() - started):>8.0f}/s")
+
+    started = time.perf_counter()
+    batch = convert_snippets(inputs, markdown=markdown)
+    print(f"convert_snippets()  {snippets / (time.perf_counter() - started):>8.0f}/s")
+    assert batch == single
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# this_file: benchmarks/tables.py
+"""Compare padded, unpadded and html2text-padded rendering of a large table.
+
+Renders one table of many rows to Markdown with the table padding of
+html22text, without padding, and with the padding of `HTML2Text.handle()`,
+and reports the time and the peak memory of each:
+
+    python benchmarks/tables.py --rows 20000
+"""
+
+import time
+import tracemalloc
+from collections.abc import Callable
+
+import fire
+
+from html22text import Options
+from html22text.html22text import _pooled_renderer, _prepare_html, _render
+
+
+def _table(rows: int) -> str:
+    return (
+        "<table><tr><th>Name</th><th>Qty</th><th>Price</th><th>Note</th></tr>"
+        + "".join(
+            f"<tr><td>item {row}</td><td>{row % 97}</td><td>{row * 1.5:.2f}</td>"
+            f"<td>{'x' * (row % 13)}</td></tr>"
+            for row in range(rows)
+        )
+        + "</table>"
+    )
+
+
+def main(rows: int = 20000) -> None:
+    """Print rows per second and peak memory of every way of rendering.
+
+    Args:
+        rows (int, optional): Number of table rows. Defaults to 20000.
+    """
+    html_content = _table(rows)
+    padded = Options(markdown=True)
+    unpadded = Options(markdown=True, pad_tables=False)
+    html = _prepare_html(padded, html_content)
+
+    def render(options: Options) -> Callable[[], str]:
+        def function() -> str:
+            with _pooled_renderer(options) as h:
+                return _render(h, html)
+
+        return function
+
+    def html2text_padded() -> str:
+        with _pooled_renderer(padded) as h:
+            return str(h.handle(html))
+
+    print(f"{rows} rows, {len(html_content)} bytes of HTML")
+    print(f"{'':<18} {'rows/s':>9} {'peak (MB)':>10}")
+    for name, function in (
+        ("padded", render(padded)),
+        ("unpadded", render(unpadded)),
+        ("html2text padded", html2text_padded),
+    ):
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            function()
+            timings.append(time.perf_counter() - started)
+        seconds = min(timings)
+        tracemalloc.start()
+        try:
+            function()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+        print(f"{name:<18} {rows / seconds:>9.0f} {peak / 1e6:>10.1f}")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# this_file: benchmarks/threads_vs_processes.py
+"""Compare thread and process scaling of `batch_convert()`.
+
+Run on a free-threaded build (e.g. `python3.13t`) to see threads scale;
+on a build with the GIL, threaded conversion stays close to one core:
+
+    python3.13t benchmarks/threads_vs_processes.py --docs 2000 --jobs 1,2,4,8
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import fire
+
+from html22text.batch import batch_convert
+
+SAMPLE = Path(__file__).parent.parent / "sample1.html"
+
+
+def _make_corpus(root: Path, docs: int) -> None:
+    html_content = SAMPLE.read_text(encoding="utf-8")
+    for i in range(docs):
+        (root / f"doc{i:06d}.html").write_text(
+            html_content.replace("</body>", f"<p>Document {i}</p></body>"),
+            encoding="utf-8",
+        )
+
+
+def main(
+    docs: int = 1000,
+    jobs: tuple[int, ...] | int = (1, 2, 4, 8),
+    markdown: bool = True,
+) -> None:
+    """Print documents per second for threads and processes per job count.
+
+    Args:
+        docs (int, optional): Number of documents. Defaults to 1000.
+        jobs (tuple[int, ...] | int, optional): Job counts, e.g. `--jobs 1,4`.
+            Defaults to (1, 2, 4, 8).
+        markdown (bool, optional): Convert to Markdown. Defaults to True.
+    """
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)
+    print(f"Python {sys.version.split()[0]}, GIL enabled: {is_gil_enabled()}")
+    print(f"{'jobs':>4} {'threads (docs/s)':>17} {'processes (docs/s)':>19}")
+    job_counts = jobs if isinstance(jobs, tuple | list) else (jobs,)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "src"
+        src.mkdir()
+        _make_corpus(src, docs)
+        for count in job_counts:
+            rates = []
+            for threads in (True, False):
+                started = time.perf_counter()
+                batch_convert(
+                    str(src),
+                    str(Path(tmp) / f"out-{count}-{threads}"),
+                    jobs=count,
+                    threads=threads,
+                    markdown=markdown,
+                )
+                rates.append(docs / (time.perf_counter() - started))
+            print(f"{count:>4} {rates[0]:>17.0f} {rates[1]:>19.0f}")
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
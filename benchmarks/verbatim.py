@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# this_file: benchmarks/verbatim.py
+"""Compare serialized and verbatim `<pre>` blocks on a code-heavy page.
+
+Converts a page of code listings full of character references with the
+`<pre>` text serialized and parsed again by the renderer, and with the
+text handed to the renderer verbatim:
+
+    python benchmarks/verbatim.py --listings 40 --lines 400
+"""
+
+import time
+
+import fire
+
+from html22text import Options
+from html22text.html22text import _pooled_renderer, _prepare_html, _render
+
+
+def main(listings: int = 40, lines: int = 400, markdown: bool = True) -> None:
+    """Print the conversion time with and without verbatim blocks.
+
+    Args:
+        listings (int, optional): Number of `<pre>` blocks. Defaults to 40.
+        lines (int, optional): Lines per block. Defaults to 400.
+        markdown (bool, optional): Convert to Markdown. Defaults to True.
+    """
+    options = Options(markdown=markdown)
+    code = "\n".join(
+        f"    if (a[{line}] &lt; b &amp;&amp; c &gt; d) {{ s = &quot;{line}&quot;; }}"
+        for line in range(lines)
+    )
+    html_content = "".join(
+        f"<h2>Listing {listing}</h2><p>Some text.</p><pre><code>{code}</code></pre>"
+        for listing in range(listings)
+    )
+
+    def convert(verbatim: bool) -> str:
+        with _pooled_renderer(options) as h:
+            blocks = getattr(h, "verbatim", None) if verbatim else None
+            return _render(h, _prepare_html(options, html_content, verbatim=blocks))
+
+    print(f"{len(html_content)} bytes of HTML")
+    results = []
+    for name, verbatim in (("serialized", False), ("verbatim", True)):
+        timings = []
+        for _ in range(3):
+            started = time.perf_counter()
+            results.append(convert(verbatim))
+            timings.append(time.perf_counter() - started)
+        print(f"{name:<12} {min(timings) * 1e3:>8.1f} ms")
+    print("identical output:", len(set(results)) == 1)
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -12,10 +12,15 @@ python -m ruff format --check src/ tests/
 
 # Run type checking
 echo "🔍 Running type checking..."
-python -m mypy --package html22text --package tests
+python -m mypy --package html22text --module html22text_client --package tests
 
 # Run tests with coverage
 echo "🧪 Running tests with coverage..."
 python -m pytest --cov=src/html22text --cov-report=term-missing --cov-report=html --cov-fail-under=80 tests/
 
+# Compare optimized code paths with the reference, check time budgets
+echo "🔍 Running differential and stress checks..."
+python -m tests.differential --docs 500 --check
+python -m tests.stress --check
+
 echo "✅ All tests passed!"
\ No newline at end of file
@@ -1,6 +1,34 @@
-from .html22text import html22text
+from .batch import batch_convert
+from .boilerplate import BoilerplateCache
+from .chunking import Chunk, chunks
+from .crawl import crawl
+from .html22text import Options, convert_to, html22text
+from .metadata import Metadata, extract_metadata
+from .presets import PRESETS, load_presets
+from .preview import preview
+from .result import ConversionResult, convert_result
+from .snippets import convert_snippets
+from .watch import watch
 
-__all__ = ["html22text"]
+__all__ = [
+    "PRESETS",
+    "BoilerplateCache",
+    "Chunk",
+    "ConversionResult",
+    "Metadata",
+    "Options",
+    "batch_convert",
+    "chunks",
+    "convert_result",
+    "convert_snippets",
+    "convert_to",
+    "crawl",
+    "extract_metadata",
+    "html22text",
+    "load_presets",
+    "preview",
+    "watch",
+]
 
 # Version will be set by hatch-vcs based on git tags
 __version__ = "0.0.0"  # Fallback version
@@ -1,12 +1,107 @@
 #!/usr/bin/env python3
+import contextlib
+import functools
+import sys
+from collections.abc import Callable, Iterator
+from pathlib import Path
+from typing import Any
+
 import fire
 
-from .html22text import html22text
+from .batch import batch_convert, merge_manifests
+from .crawl import crawl
+from .html22text import convert_to, html22text
+from .preview import preview
+from .profiling import profile_conversion
+from .server import server
+from .watch import watch
 
+# Subcommands recognized as the first CLI argument. Anything else is treated
+# as HTML content (or a path) for `html22text()`.
+COMMANDS: dict[str, Callable[..., Any]] = {
+    "batch": batch_convert,
+    "crawl": crawl,
+    "merge-manifests": merge_manifests,
+    "preview": preview,
+    "server": server,
+    "watch": watch,
+}
 
-def cli() -> None:
+
+def convert_to_output(html_content: str, output: str = "-", **options: Any) -> None:
+    """Convert HTML text or file and stream the result to a file or stdout.
+
+    Args:
+        html_content (str): Input HTML text or file path.
+        output (str, optional): Output file path, or "-" for stdout.
+            Defaults to "-".
+        **options: Conversion options of `html22text()`.
+    """
+    if output == "-":
+        convert_to(sys.stdout.buffer, html_content, **options)
+        sys.stdout.buffer.flush()
+    else:
+        with Path(output).open("wb") as output_file:
+            convert_to(output_file, html_content, **options)
+
+
+def _join_output_flag(argv: list[str]) -> list[str]:
+    """Rewrites `-o PATH` and `--output PATH` as `--output=PATH`.
+
+    Fire would otherwise read `-o -` (stdout) as its command separator.
+    """
+    joined: list[str] = []
+    args = iter(argv)
+    for arg in args:
+        if arg in {"-o", "--output"}:
+            joined.append(f"--output={next(args, '-')}")
+        else:
+            joined.append(arg)
+    return joined
+
+
+@contextlib.contextmanager
+def _plain_display() -> Iterator[None]:
+    """Makes Fire print output directly instead of through a pager.
+
+    `fire.core.Display` is module state, so it is restored on exit; this
+    keeps `cli()` from leaving a global change behind when it is embedded.
+    The library itself never touches it.
+    """
+    display = fire.core.Display
     fire.core.Display = lambda lines, out: print(*lines, file=out)
-    fire.Fire(html22text)
+    try:
+        yield
+    finally:
+        fire.core.Display = display
+
+
+def _with_stdin(
+    function: Callable[..., Any], argv: list[str]
+) -> tuple[Callable[..., Any], list[str]]:
+    """Binds the HTML read from stdin if the first argument is "-"."""
+    if argv and argv[0] == "-":
+        return functools.partial(function, sys.stdin.read()), argv[1:]
+    return function, argv
+
+
+def cli() -> None:
+    # The server is used by the `html22text` command, see html22text_client
+    argv = [arg for arg in sys.argv[1:] if arg != "--server"]
+    with _plain_display():
+        if argv and argv[0] in COMMANDS:
+            name = f"html22text {argv[0]}"
+            fire.Fire(COMMANDS[argv[0]], command=argv[1:], name=name)
+        elif "-o" in argv or any(arg.split("=")[0] == "--output" for arg in argv):
+            function, command = _with_stdin(convert_to_output, _join_output_flag(argv))
+            fire.Fire(function, command=command, name="html22text")
+        elif "--profile" in argv:
+            argv.remove("--profile")
+            function, command = _with_stdin(profile_conversion, argv)
+            fire.Fire(function, command=command, name="html22text --profile")
+        else:
+            function, command = _with_stdin(html22text, argv)
+            fire.Fire(function, command=command, name="html22text")
 
 
 if __name__ == "__main__":
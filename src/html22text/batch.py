@@ -0,0 +1,714 @@
+#!/usr/bin/env python3
+
+import contextlib
+import dataclasses
+import functools
+import hashlib
+import io
+import json
+import os
+import sys
+import tarfile
+import time
+import zipfile
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from pathlib import Path, PurePosixPath, PureWindowsPath
+from typing import Any, NamedTuple
+from urllib.parse import unquote, urljoin
+
+from .boilerplate import BOILERPLATE_CACHE_SIZE, BoilerplateCache
+from .html22text import Options, _renderer_settings, is_doc, rel_txt_href
+from .metrics import Metrics, exporting
+from .pool import ProcessPool, TaskFailed
+from .presets import resolve_options
+from .profiling import _run_stages
+from .writer import BackgroundWriter
+
+ZIP_SUFFIXES = (".zip",)
+TAR_SUFFIXES = (
+    ".tar",
+    ".tar.gz",
+    ".tgz",
+    ".tar.bz2",
+    ".tbz2",
+    ".tar.xz",
+    ".txz",
+)
+# When `_DirectorySink` syncs written files to storage: never (leave it to
+# the OS), once per `flush()`, or before each file is renamed into place.
+FSYNC_POLICIES = ("never", "batch", "always")
+
+
+def archive_kind(path: str) -> str:
+    """Tells which archive format a path refers to, judging by its suffix.
+
+    Args:
+        path (str): File name or path.
+
+    Returns:
+        str: "zip", "tar", or "" if the path is not an archive (a directory).
+    """
+    name = path.lower()
+    if name.endswith(ZIP_SUFFIXES):
+        return "zip"
+    if name.endswith(TAR_SUFFIXES):
+        return "tar"
+    return ""
+
+
+def iter_sources(
+    src: str, include: Callable[[str], bool] | None = None
+) -> Iterator[tuple[str, bytes]]:
+    """Yields the HTML documents found in a directory, zip or tar archive.
+
+    Archives are read member by member without extracting them to disk. Tar
+    archives are opened in streaming mode, so compressed tarballs are
+    decompressed once, front to back.
+
+    Args:
+        src (str): Directory, `.zip` or `.tar[.gz|.bz2|.xz]` path.
+        include (Callable[[str], bool] | None, optional): Filter on member
+            paths; documents it rejects are not read. Defaults to None.
+
+    Yields:
+        tuple[str, bytes]: POSIX member path relative to the source root and
+            the raw document bytes.
+    """
+
+    def wanted(member_name: str) -> bool:
+        return is_doc(member_name) and (include is None or include(member_name))
+
+    kind = archive_kind(src)
+    if kind == "zip":
+        with zipfile.ZipFile(src) as zip_file:
+            for info in zip_file.infolist():
+                if not info.is_dir() and wanted(info.filename):
+                    yield info.filename, zip_file.read(info)
+    elif kind == "tar":
+        with tarfile.open(src, mode="r|*") as tar_file:
+            for member in tar_file:
+                if not member.isfile() or not wanted(member.name):
+                    continue
+                member_file = tar_file.extractfile(member)
+                if member_file is not None:
+                    yield member.name, member_file.read()
+    else:
+        root = Path(src)
+        for path in sorted(root.rglob("*")):
+            member_name = path.relative_to(root).as_posix()
+            if path.is_file() and wanted(member_name):
+                yield member_name, path.read_bytes()
+
+
+def safe_member_name(member_name: str) -> str:
+    """Normalizes a member path and checks that it stays inside the output.
+
+    Args:
+        member_name (str): POSIX path of a source or output document.
+
+    Returns:
+        str: Path with empty and "." segments removed.
+
+    Raises:
+        ValueError: If the path is absolute, has a drive, or has a ".."
+            segment, which would write outside the output root.
+    """
+    path = PurePosixPath(member_name.replace("\\", "/"))
+    if path.is_absolute() or PureWindowsPath(member_name).drive or ".." in path.parts:
+        error_message = f"Unsafe member path: {member_name!r}"
+        raise ValueError(error_message)
+    return path.as_posix()
+
+
+def output_name(member_name: str, file_ext: str) -> str:
+    """Maps a source member path to the path of its converted output.
+
+    The name is derived with `rel_txt_href`, the same function that rewrites
+    relative links inside the documents, so links between converted
+    documents resolve within the output tree or archive.
+
+    Args:
+        member_name (str): POSIX path of the source document.
+        file_ext (str): Target file extension.
+
+    Returns:
+        str: POSIX path of the output document.
+    """
+    return unquote(rel_txt_href(member_name, file_ext))
+
+
+def _fsync_directory(path: Path) -> None:
+    """Syncs a directory entry, where the platform supports it."""
+    if hasattr(os, "O_DIRECTORY"):
+        fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+class _DirectorySink:
+    """Writes converted documents below a directory.
+
+    Each document is written to a temporary file next to its target and
+    renamed into place, so readers never see a partial file. Documents
+    whose content did not change are not rewritten, which keeps their
+    mtime and saves the metadata operations. Parent directories are
+    created once per run. See `FSYNC_POLICIES` for `fsync`.
+    """
+
+    def __init__(self, root: str, fsync: str = "never") -> None:
+        if fsync not in FSYNC_POLICIES:
+            error_message = (
+                f"Invalid fsync policy {fsync!r}, expected one of: "
+                f"{', '.join(FSYNC_POLICIES)}"
+            )
+            raise ValueError(error_message)
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.resolved_root = self.root.resolve()
+        self.fsync = fsync
+        self.directories = {self.root}
+        # Temporary file of each target, renamed into place by `flush()`
+        self.pending: dict[Path, Path] = {}
+        self.written = 0
+        self.skipped = 0
+
+    def write(self, name: str, data: bytes) -> None:
+        """Writes a document to `name` below the root.
+
+        Raises:
+            ValueError: If `name` leads outside the root, see
+                `safe_member_name`, also through a symlink.
+        """
+        path = self.root / safe_member_name(name)
+        if not path.resolve().is_relative_to(self.resolved_root):
+            error_message = f"Unsafe member path: {name!r}"
+            raise ValueError(error_message)
+        if path.parent not in self.directories:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.directories.add(path.parent)
+        with contextlib.suppress(OSError):
+            if (
+                path not in self.pending
+                and path.stat().st_size == len(data)
+                and path.read_bytes() == data
+            ):
+                self.skipped += 1
+                return
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with temp_path.open("wb") as temp_file:
+            temp_file.write(data)
+            if self.fsync == "always":
+                temp_file.flush()
+                os.fsync(temp_file.fileno())
+        self.written += 1
+        if self.fsync == "batch":
+            # A later write of the same name replaced the temporary file
+            self.pending[path] = temp_path
+            return
+        temp_path.replace(path)
+        if self.fsync == "always":
+            _fsync_directory(path.parent)
+
+    def flush(self) -> None:
+        """Syncs and renames the files written since the last flush."""
+        pending, self.pending = self.pending, {}
+        for temp_path in pending.values():
+            with temp_path.open("rb") as temp_file:
+                os.fsync(temp_file.fileno())
+        for path, temp_path in pending.items():
+            temp_path.replace(path)
+        for directory in {path.parent for path in pending}:
+            _fsync_directory(directory)
+
+    def close(self) -> None:
+        self.flush()
+
+
+class _ZipSink:
+    """Writes converted documents as members of a zip archive."""
+
+    def __init__(self, path: str) -> None:
+        self.zip_file = zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def write(self, name: str, data: bytes) -> None:
+        self.zip_file.writestr(name, data)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.zip_file.close()
+
+
+class _TarSink:
+    """Writes converted documents as members of a (compressed) tar archive."""
+
+    def __init__(self, path: str) -> None:
+        name = path.lower()
+        if name.endswith((".gz", ".tgz")):
+            self.tar_file = tarfile.open(path, "w:gz")  # noqa: SIM115
+        elif name.endswith((".bz2", ".tbz2")):
+            self.tar_file = tarfile.open(path, "w:bz2")  # noqa: SIM115
+        elif name.endswith((".xz", ".txz")):
+            self.tar_file = tarfile.open(path, "w:xz")  # noqa: SIM115
+        else:
+            self.tar_file = tarfile.open(path, "w")  # noqa: SIM115
+
+    def write(self, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        self.tar_file.addfile(info, io.BytesIO(data))
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.tar_file.close()
+
+
+Sink = _DirectorySink | _ZipSink | _TarSink
+
+
+def open_sink(dest: str, fsync: str = "never") -> Sink:
+    """Opens a writer for converted documents, picked by the `dest` suffix.
+
+    Args:
+        dest (str): Output directory, `.zip` or `.tar[.gz|.bz2|.xz]` path.
+        fsync (str, optional): Fsync policy of directory output, one of
+            `FSYNC_POLICIES`. Defaults to "never".
+
+    Returns:
+        Sink: Object with `write(name, data)`, `flush()` and `close()`
+            methods, where `data` is the UTF-8 encoded document.
+    """
+    kind = archive_kind(dest)
+    if kind == "zip":
+        return _ZipSink(dest)
+    if kind == "tar":
+        return _TarSink(dest)
+    return _DirectorySink(dest, fsync)
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parses a `K/N` shard specification.
+
+    Args:
+        spec (str): Shard number and shard count, e.g. "2/8". Shards are
+            numbered from 1.
+
+    Returns:
+        tuple[int, int]: Shard number and shard count.
+
+    Raises:
+        ValueError: If the specification is malformed or out of range.
+    """
+    number, _, count = str(spec).partition("/")
+    try:
+        shard = (int(number), int(count))
+    except ValueError:
+        shard = (0, 0)
+    if not 1 <= shard[0] <= shard[1]:
+        error_message = f"Invalid shard {spec!r}, expected K/N with 1 <= K <= N"
+        raise ValueError(error_message)
+    return shard
+
+
+def shard_of(member_name: str, count: int) -> int:
+    """Assigns a member path to one of `count` shards, numbered from 1.
+
+    The assignment depends only on the path, so every node computes the
+    same partition regardless of the order in which it reads the inputs.
+
+    Args:
+        member_name (str): POSIX path of the source document.
+        count (int): Number of shards.
+
+    Returns:
+        int: Shard number.
+    """
+    digest = hashlib.blake2b(member_name.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % count + 1
+
+
+class _Result(NamedTuple):
+    """Converted document, as sent back by a worker."""
+
+    source: str
+    output: str
+    data: bytes
+    bytes_in: int
+    timings: dict[str, float]
+    cache: tuple[int, int, int]
+
+
+# Conversion options and boilerplate cache of a worker process, set once
+# by `_init_worker`.
+_worker_state: dict[str, Any] = {}
+
+
+def _init_worker(
+    options: Options, boilerplate: str = "", cache_size: int = BOILERPLATE_CACHE_SIZE
+) -> None:
+    """Pool initializer that hands the conversion options to a worker once.
+
+    With a `boilerplate` mode, the worker gets a `BoilerplateCache` of its own.
+    """
+    _worker_state["options"] = options
+    _worker_state["boilerplate"] = (
+        BoilerplateCache(boilerplate, cache_size) if boilerplate else None
+    )
+
+
+def _convert_document(
+    member_name: str,
+    data: bytes,
+    options: Options,
+    boilerplate: BoilerplateCache | None = None,
+) -> _Result:
+    """Converts one document, resolving assets against its own member path.
+
+    Raises:
+        ValueError: If the output path would lead outside the output root.
+    """
+    output = safe_member_name(output_name(member_name, options.file_ext))
+    if options.base_url:
+        options = dataclasses.replace(
+            options, base_url=urljoin(options.base_url, member_name)
+        )
+    timings: dict[str, float] = {}
+    last = time.perf_counter()
+
+    def record_time(stage: str) -> None:
+        nonlocal last
+        now = time.perf_counter()
+        timings[stage] = now - last
+        last = now
+
+    html_content = data.decode("utf-8", errors="replace")
+    text = _run_stages(html_content, options, None, record_time, boilerplate)
+    cache_info = _renderer_settings.cache_info()
+    return _Result(
+        member_name,
+        output,
+        text.encode("utf-8"),
+        len(data),
+        timings,
+        (os.getpid(), cache_info.hits, cache_info.misses),
+    )
+
+
+def _convert_safely(
+    task: tuple[str, bytes],
+    options: Options | None = None,
+    boilerplate: BoilerplateCache | None = None,
+) -> _Result | TaskFailed:
+    """Converts one archive member, returning failures instead of raising.
+
+    Without `options`, the options and the boilerplate cache handed to the
+    worker process are used.
+    """
+    member_name, data = task
+    if options is None:
+        options = _worker_state["options"]
+        boilerplate = _worker_state["boilerplate"]
+    try:
+        return _convert_document(member_name, data, options, boilerplate)
+    except Exception as exc:  # noqa: BLE001
+        return TaskFailed("error", f"{type(exc).__name__}: {exc}")
+
+
+def _map_threads(
+    func: Callable[[Any], Any], tasks: Iterable[Any], jobs: int
+) -> Iterator[tuple[Any, Any]]:
+    """Applies `func` to every task on `jobs` threads.
+
+    At most two tasks per thread are in flight, so sources are not read
+    much faster than they are converted.
+
+    Yields:
+        tuple[Any, Any]: Each task with its result, in completion order.
+    """
+    with ThreadPoolExecutor(jobs) as executor:
+        running: dict[Future[Any], Any] = {}
+        for task in tasks:
+            if len(running) >= 2 * jobs:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield running.pop(future), future.result()
+            running[executor.submit(func, task)] = task
+        for future in as_completed(running):
+            yield running[future], future.result()
+
+
+def _manifest_record(result: _Result) -> dict[str, Any]:
+    """Describes one converted document for the manifest."""
+    return {
+        "source": result.source,
+        "output": result.output,
+        "status": "ok",
+        "bytes_in": result.bytes_in,
+        "bytes_out": len(result.data),
+        "sha256": hashlib.sha256(result.data).hexdigest(),
+    }
+
+
+def _reject_duplicate_outputs(
+    results: Iterable[tuple[Any, _Result | TaskFailed]],
+) -> Iterator[tuple[Any, _Result | TaskFailed]]:
+    """Fails the documents whose output an earlier document already has.
+
+    Different sources can map to the same output, such as `a.html` and
+    `a.htm`, and the later one would silently overwrite the first.
+    """
+    # Source of each output written so far
+    written: dict[str, str] = {}
+    for task, result in results:
+        if isinstance(result, _Result):
+            first = written.setdefault(result.output, result.source)
+            if first != result.source:
+                error = (
+                    f"ValueError: Duplicate output {result.output!r}, "
+                    f"already written for {first!r}"
+                )
+                yield task, TaskFailed("error", error)
+                continue
+        yield task, result
+
+
+def _error_type(failure: TaskFailed) -> str:
+    """Returns the exception type of a failed task, or its status."""
+    if failure.status == "error":
+        return failure.error.split(":", 1)[0]
+    return failure.status
+
+
+def batch_convert(  # noqa: PLR0913
+    src: str,
+    out: str,
+    *,
+    jobs: int = 0,
+    shard: str = "",
+    manifest: str = "",
+    timeout: float = 0,
+    memory_limit: int = 0,
+    max_tasks_per_worker: int = 0,
+    preset: str = "",
+    preset_file: str = "",
+    threads: bool = False,
+    fsync: str = "never",
+    metrics: str = "",
+    metrics_port: int = 0,
+    boilerplate: str = "",
+    boilerplate_cache_size: int = BOILERPLATE_CACHE_SIZE,
+    **options: Any,
+) -> int:
+    """Convert all HTML documents in a directory or archive.
+
+    Documents are streamed from `src`, converted by a pool of worker
+    processes and written to `out`, so archives never need to be extracted.
+    Each output keeps the member path of its source with the extension
+    replaced, which is also how relative links between documents are
+    rewritten. With a `base_url`, each document resolves its assets against
+    `base_url` joined with its own member path.
+
+    With `shard="K/N"`, only the documents that `shard_of` assigns to shard
+    K are converted, so N nodes (or N local processes) given the same input
+    split the work without coordinating. A `{shard}` placeholder in `out`
+    is replaced by K, which gives every shard its own output archive. Each
+    shard writes a manifest, which `merge_manifests` combines.
+
+    A document that fails to convert does not stop the batch: it is
+    reported on stderr and recorded in the manifest with its status. With
+    `timeout` or `memory_limit`, a document that exceeds its budget has its
+    worker killed and replaced (see `ProcessPool`), which keeps a few
+    pathological pages from holding up the whole batch.
+
+    The conversion options are resolved once into an `Options` preset and
+    handed to each worker process when it starts, so tasks carry nothing
+    but the documents. With `threads`, the workers are threads of the
+    current process instead, which avoids the memory of a process pool and
+    scales on free-threaded CPython builds (see `html22text()` on thread
+    safety).
+
+    Outputs are written by a `BackgroundWriter` thread in batches, so the
+    workers never wait for storage. In an output directory, each file is
+    replaced atomically and files whose content is unchanged are skipped.
+
+    With `metrics` or `metrics_port`, counters and latency histograms of
+    the batch (see `Metrics`) are exported in the Prometheus text format.
+
+    With `boilerplate`, documents are rendered block by block through a
+    `BoilerplateCache`, which renders the header, navigation and footer
+    that the pages of a site share only once ("reuse"), or leaves them out
+    of every page but the first that contains them ("drop"). Each worker
+    process has a cache of its own; threads share one. Which page keeps a
+    dropped block therefore depends on how the documents are scheduled:
+    "drop" output is only reproducible with `jobs=1`, no `threads` and no
+    `max_tasks_per_worker`, where one cache sees the documents in order.
+
+    Args:
+        src (str): Source directory, `.zip` or `.tar[.gz|.bz2|.xz]` archive.
+        out (str): Output directory, `.zip` or `.tar[.gz|.bz2|.xz]` archive.
+        jobs (int, optional): Number of worker processes. 0 uses all CPUs,
+            1 converts in the current process unless a budget is set.
+            Defaults to 0.
+        shard (str, optional): Shard to process, as "K/N". Defaults to ""
+            (all documents).
+        manifest (str, optional): Path of a JSON Lines manifest with one
+            record per document. Defaults to "", which writes no manifest
+            unless sharding, in which case it is `<out>.shard-K-of-N.jsonl`.
+        timeout (float, optional): Wall-time limit per document in seconds,
+            0 for none. Defaults to 0.
+        memory_limit (int, optional): Address-space limit per worker process
+            in MiB, 0 for none. Defaults to 0.
+        max_tasks_per_worker (int, optional): Replace each worker process
+            after this many documents, 0 for never. Defaults to 0.
+        preset (str, optional): Name of an option preset, see
+            `resolve_options`. Defaults to "".
+        preset_file (str, optional): TOML file with option presets.
+            Defaults to "".
+        threads (bool, optional): Convert on `jobs` threads instead of
+            worker processes. Defaults to False.
+        fsync (str, optional): When to sync output files to storage: "never",
+            once per write batch ("batch"), or for every file ("always").
+            Defaults to "never".
+        metrics (str, optional): File that receives the metrics every few
+            seconds and at the end. Defaults to "" (no file).
+        metrics_port (int, optional): Serve the metrics on this local port
+            while the batch runs. Defaults to 0 (no endpoint).
+        boilerplate (str, optional): "reuse" or "drop" to convert with a
+            `BoilerplateCache` in that mode. Defaults to "" (no cache).
+        boilerplate_cache_size (int, optional): Number of blocks each cache
+            remembers. Defaults to `BOILERPLATE_CACHE_SIZE`.
+        **options: Conversion options of `html22text()`, which override
+            those of the preset.
+
+    Returns:
+        int: Number of converted documents.
+
+    Raises:
+        ValueError: If `threads` is combined with a time or memory budget
+            or worker recycling, which need worker processes, or if the
+            boilerplate mode is unknown.
+    """
+    options.pop("is_input_path", None)
+    conversion = resolve_options(preset, preset_file, **options)
+    jobs = jobs or os.cpu_count() or 1
+    budgeted = bool(timeout or memory_limit or max_tasks_per_worker)
+    if threads and budgeted:
+        error_message = (
+            "timeout, memory_limit and max_tasks_per_worker need worker "
+            "processes and cannot be combined with threads"
+        )
+        raise ValueError(error_message)
+    # Also validates the mode before any worker starts
+    cache = (
+        BoilerplateCache(boilerplate, boilerplate_cache_size) if boilerplate else None
+    )
+
+    include = None
+    if shard:
+        number, count = parse_shard(shard)
+        out = out.replace("{shard}", str(number))
+        manifest = manifest or f"{out.rstrip('/')}.shard-{number}-of-{count}.jsonl"
+
+        def include(member_name: str) -> bool:
+            return shard_of(member_name, count) == number
+
+    tasks = iter_sources(src, include)
+
+    converted = 0
+    registry = Metrics()
+    with contextlib.ExitStack() as stack:
+        update_metrics = stack.enter_context(exporting(registry, metrics, metrics_port))
+        writer = BackgroundWriter(open_sink(out, fsync))
+        sink = stack.enter_context(contextlib.closing(writer))
+        manifest_file = None
+        if manifest:
+            manifest_file = stack.enter_context(
+                Path(manifest).open("w", encoding="utf-8")
+            )
+
+        results: Iterator[tuple[Any, _Result | TaskFailed]]
+        if threads:
+            convert = functools.partial(
+                _convert_safely, options=conversion, boilerplate=cache
+            )
+            results = _map_threads(convert, tasks, jobs)
+        elif jobs == 1 and not budgeted:
+            results = (
+                (task, _convert_safely(task, conversion, cache)) for task in tasks
+            )
+        else:
+            pool = ProcessPool(
+                _convert_safely,
+                jobs,
+                timeout,
+                memory_limit,
+                max_tasks_per_worker,
+                initializer=_init_worker,
+                initargs=(conversion, boilerplate, boilerplate_cache_size),
+            )
+            results = pool.imap_unordered(tasks)
+        for task, result in _reject_duplicate_outputs(results):
+            if isinstance(result, TaskFailed):
+                print(f"{task[0]}: {result.status}: {result.error}", file=sys.stderr)
+                record = {"source": task[0], **result._asdict()}
+                registry.record_failure(result.status, _error_type(result))
+            else:
+                sink.write(result.output, result.data)
+                record = _manifest_record(result)
+                registry.record_document(
+                    result.bytes_in, len(result.data), result.timings, result.cache
+                )
+                converted += 1
+            if manifest_file:
+                manifest_file.write(json.dumps(record) + "\n")
+            update_metrics()
+    return converted
+
+
+def merge_manifests(output: str, *manifests: str) -> int:
+    """Combine per-shard manifests into one, sorted by source path.
+
+    Args:
+        output (str): Path of the merged JSON Lines manifest.
+        *manifests (str): Paths of the shard manifests.
+
+    Returns:
+        int: Number of records in the merged manifest.
+
+    Raises:
+        ValueError: If a source document appears in more than one record,
+            which means the shards were not run with the same partition.
+    """
+    records: dict[str, dict[str, Any]] = {}
+    for manifest in manifests:
+        with Path(manifest).open(encoding="utf-8") as manifest_file:
+            for line in manifest_file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record["source"] in records:
+                    error_message = (
+                        f"Duplicate manifest record for {record['source']!r} "
+                        f"in {manifest}"
+                    )
+                    raise ValueError(error_message)
+                records[record["source"]] = record
+
+    with Path(output).open("w", encoding="utf-8") as output_file:
+        output_file.writelines(
+            json.dumps(records[source]) + "\n" for source in sorted(records)
+        )
+    return len(records)
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+
+import hashlib
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from bs4 import BeautifulSoup, NavigableString, PageElement, Tag
+
+from .html22text import (
+    BLOCK_TAGS,
+    Options,
+    _parse,
+    _pooled_renderer,
+    _render,
+    _renderer_key,
+    _rewrite,
+)
+
+# Modes of a `BoilerplateCache`: "reuse" renders a repeated block once,
+# "drop" leaves out blocks already seen in another document.
+BOILERPLATE_MODES = frozenset({"reuse", "drop"})
+# Number of blocks a `BoilerplateCache` remembers by default.
+BOILERPLATE_CACHE_SIZE = 1024
+# Blocks whose HTML is shorter than this are rendered without the cache.
+BOILERPLATE_MIN_SIZE = 64
+# Tags that `_top_level_blocks()` descends into when they wrap the whole page.
+WRAPPER_TAGS = frozenset({"article", "body", "div", "main", "section"})
+
+# Key of a cached block: the options it was rendered with and its hash.
+_Entry = tuple[Options, bytes]
+
+
+def _top_level_blocks(soup: BeautifulSoup) -> list[list[PageElement]]:
+    """Splits a page into its top-level blocks.
+
+    The blocks are the children of `<body>`, or of the soup if there is no
+    `<body>`, after descending into wrappers that are the only child of
+    their parent, such as `<div id="page">`. Each block tag is a block of
+    its own, and the text and inline tags between two block tags form one
+    block. Whitespace between blocks is left out.
+
+    Returns:
+        list[list[PageElement]]: Nodes of every block, in order.
+    """
+    root: Tag = soup.body or soup
+    children: list[PageElement]
+    while True:
+        children = [
+            child
+            for child in root.contents
+            if not (type(child) is NavigableString and not child.strip())
+        ]
+        if (
+            len(children) == 1
+            and isinstance(children[0], Tag)
+            and children[0].name in WRAPPER_TAGS
+        ):
+            root = children[0]
+            continue
+        break
+
+    blocks: list[list[PageElement]] = []
+    inline: list[PageElement] = []
+    for child in children:
+        if isinstance(child, Tag) and child.name in BLOCK_TAGS:
+            if inline:
+                blocks.append(inline)
+                inline = []
+            blocks.append([child])
+        else:
+            inline.append(child)
+    if inline:
+        blocks.append(inline)
+    return blocks
+
+
+class BoilerplateCache:
+    """Rendered top-level blocks, shared by the documents of one site.
+
+    The pages of a site repeat the same header, navigation, sidebar and
+    footer. A cache splits every page into its top-level blocks (see
+    `_top_level_blocks()`), and keys each block by a hash of its rewritten
+    HTML and by the options. In "reuse" mode, a block that is in the cache
+    is not rendered again and its text is taken from the cache. In "drop"
+    mode, a block that an earlier document contained is left out, so only
+    the first page keeps the boilerplate, which also shrinks the output of
+    a site mirror. Which page is the first depends on the order in which
+    the documents reach the cache, so the output of "drop" mode is only
+    reproducible if the documents are converted one after another, in the
+    same order, through the same cache.
+
+    The blocks of a page are rendered one by one and joined by a blank
+    line. Each block is rendered as by `html22text()`, but blocks are
+    always set off by one blank line, where html2text puts none between a
+    `<header>` and a `<footer>` with nothing but text in them, and several
+    after a list. A page converts to the same text whether its blocks come
+    from the cache or not.
+
+    The cache holds at most `max_size` blocks and forgets the least
+    recently used first. It is thread-safe, so the threads of a batch can
+    share it; worker processes each have their own.
+
+    Attributes:
+        mode (str): "reuse" or "drop".
+        max_size (int): Number of blocks the cache remembers.
+        min_size (int): Blocks with shorter HTML are rendered without the
+            cache, and never dropped.
+        hits (int): Blocks that were found in the cache.
+        misses (int): Blocks that were rendered and added to the cache.
+        documents (int): Number of documents converted.
+    """
+
+    def __init__(
+        self,
+        mode: str = "reuse",
+        max_size: int = BOILERPLATE_CACHE_SIZE,
+        min_size: int = BOILERPLATE_MIN_SIZE,
+    ) -> None:
+        if mode not in BOILERPLATE_MODES:
+            error_message = f"Unknown boilerplate mode: {mode!r}"
+            raise ValueError(error_message)
+        self.mode = mode
+        self.max_size = max_size
+        self.min_size = min_size
+        self.hits = 0
+        self.misses = 0
+        self.documents = 0
+        self.lock = threading.Lock()
+        # Text of each block, and the number of the document it was first
+        # seen in, by options and hash of its HTML
+        self.blocks: OrderedDict[_Entry, tuple[str, int]] = OrderedDict()
+
+    def convert(
+        self,
+        html_content: str,
+        options: Options | None = None,
+        *,
+        is_input_path: bool = False,
+        links: list[str] | None = None,
+    ) -> str:
+        """Convert HTML text or file, reusing the blocks of earlier documents.
+
+        The blocks are joined by exactly one blank line, also where
+        `html22text()` puts more or none. For example, a list between two
+        paragraphs, `"<p>x</p><ul><li>a</li></ul><p>y</p>"`, converts to
+        `"x\\n\\n   a\\n\\ny\\n"`, where `html22text()` gives
+        `"x\\n\\n   a\\n\\n\\n\\ny\\n"`.
+
+        Args:
+            html_content (str): Input HTML text or file path.
+            options (Options | None, optional): Conversion options. Defaults
+                to None (the default options).
+            is_input_path (bool, optional): `html_content` is a file path.
+                Defaults to False.
+            links (list[str] | None, optional): Collector for the original
+                hrefs of relative document links, see `html22text()`.
+                Defaults to None.
+
+        Returns:
+            str: Markdown or plain-text as string.
+        """
+        options = options or Options()
+        if is_input_path:
+            html_content = Path(html_content).read_text(encoding="utf-8")
+        soup = _rewrite(_parse(html_content, options.selector), options, links)
+        return self.render(soup, options)
+
+    def render(self, soup: BeautifulSoup, options: Options) -> str:
+        """Renders a parsed and rewritten document block by block.
+
+        Args:
+            soup (BeautifulSoup): Document, as rewritten by `_rewrite()`.
+            options (Options): Conversion options.
+
+        Returns:
+            str: Markdown or plain-text as string.
+        """
+        key = _renderer_key(options)
+        with self.lock:
+            document = self.documents
+            self.documents += 1
+        texts = []
+        for block in _top_level_blocks(soup):
+            html = "".join(map(str, block))
+            entry = None
+            if len(html) >= self.min_size:
+                digest = hashlib.blake2b(html.encode("utf-8"), digest_size=16)
+                entry = (key, digest.digest())
+            text = self._lookup(entry, document)
+            if text is None:
+                with _pooled_renderer(options) as h:
+                    text = _render(h, html).strip("\n")
+                self._store(entry, text, document)
+            if text:
+                texts.append(text)
+        return "\n\n".join(texts) + "\n"
+
+    def _lookup(self, entry: _Entry | None, document: int) -> str | None:
+        """Returns the text of a block from the cache, "" to drop it, or None."""
+        if entry is None:
+            return None
+        with self.lock:
+            cached = self.blocks.get(entry)
+            if cached is None:
+                return None
+            self.blocks.move_to_end(entry)
+            self.hits += 1
+        text, first = cached
+        if self.mode == "drop" and first != document:
+            return ""
+        return text
+
+    def _store(self, entry: _Entry | None, text: str, document: int) -> None:
+        if entry is None:
+            return
+        with self.lock:
+            self.misses += 1
+            self.blocks[entry] = (text, document)
+            if len(self.blocks) > self.max_size:
+                self.blocks.popitem(last=False)
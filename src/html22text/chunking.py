@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import re
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple
+
+from .html22text import _iter_render, _prepare
+
+HEADING_RE = re.compile(r"(#{1,6}) +(.*)")
+
+
+class Chunk(NamedTuple):
+    """A size-bounded piece of converted text.
+
+    Attributes:
+        text (str): Chunk text; blocks are separated by blank lines.
+        headings (tuple[str, ...]): Titles of the enclosing headings,
+            outermost first.
+    """
+
+    text: str
+    headings: tuple[str, ...]
+
+
+def _iter_blocks(lines: Iterable[str]) -> Iterator[str]:
+    """Groups lines into blocks separated by blank lines."""
+    block: list[str] = []
+    for line in lines:
+        if line.strip():
+            block.append(line)
+        elif block:
+            yield "\n".join(block)
+            block = []
+    if block:
+        yield "\n".join(block)
+
+
+def _split_long(text: str, limit: int, first_limit: int) -> Iterator[str]:
+    """Cuts text into pieces of at most `limit` chars, preferring whitespace.
+
+    The first piece may be limited to `first_limit` instead, to fill up the
+    room left in the current chunk.
+    """
+    while len(text) > first_limit:
+        cut = max(
+            text.rfind("\n", 0, first_limit + 1), text.rfind(" ", 0, first_limit + 1)
+        )
+        if cut <= 0:
+            cut = first_limit
+        yield text[:cut].rstrip()
+        text = text[cut:].lstrip()
+        first_limit = limit
+    if text:
+        yield text
+
+
+def _tail(text: str, overlap: int) -> str:
+    """Returns at most `overlap` trailing chars of text, starting at a word."""
+    if overlap <= 0 or not text:
+        return ""
+    tail = text[-overlap:]
+    if len(tail) < len(text) and not text[-overlap - 1].isspace():
+        space = tail.find(" ")
+        tail = tail[space + 1 :] if space != -1 else ""
+    return tail.strip()
+
+
+def chunks(
+    html_content: str,
+    max_chars: int = 2000,
+    overlap: int = 0,
+    **options: Any,
+) -> Iterator[Chunk]:
+    """Convert HTML and yield the output in heading-aware, size-bounded chunks.
+
+    Chunks are built while the document is rendered, from the stream of
+    output lines, so the full text never has to be held in memory. A new
+    chunk starts at every heading and whenever the next paragraph would
+    push the chunk past `max_chars`; paragraphs longer than that are split
+    at whitespace. Each chunk carries the path of headings it belongs to.
+
+    Args:
+        html_content (str): Input HTML text or file path.
+        max_chars (int, optional): Maximum chunk length. Defaults to 2000.
+        overlap (int, optional): Number of trailing chars of a chunk that are
+            repeated at the start of the next chunk of the same section.
+            Defaults to 0.
+        **options: Conversion options of `html22text()`, e.g. `markdown=True`.
+
+    Yields:
+        Chunk: Chunk text and its heading path.
+
+    Raises:
+        ValueError: If `overlap` is not smaller than `max_chars`.
+    """
+    if not 0 <= overlap < max_chars:
+        error_message = f"overlap must be in [0, max_chars), got {overlap}"
+        raise ValueError(error_message)
+
+    h, html = _prepare(html_content, **options)
+    path: list[tuple[int, str]] = []
+    parts: list[str] = []
+    size = 0
+    fresh = True  # No new content since the chunk started (overlap only)
+
+    def flush() -> Chunk | None:
+        nonlocal parts, size, fresh
+        chunk = None
+        if parts and not fresh:
+            chunk = Chunk("\n\n".join(parts), tuple(title for _, title in path))
+        parts, size, fresh = [], 0, True
+        return chunk
+
+    def add(block: str) -> None:
+        nonlocal size, fresh
+        size += len(block) + (2 if parts else 0)
+        parts.append(block)
+        fresh = False
+
+    for block in _iter_blocks(_iter_render(h, html)):
+        heading = HEADING_RE.fullmatch(block)
+        if heading:
+            chunk = flush()
+            if chunk:
+                yield chunk
+            level = len(heading.group(1))
+            while path and path[-1][0] >= level:
+                path.pop()
+            path.append((level, heading.group(2).strip()))
+
+        # Blocks too long for one chunk are split into pieces that leave room
+        # for the overlap, the first one filling up the current chunk. Pieces
+        # are at least one char long, even if `max_chars` leaves no room.
+        limit = max(max_chars - overlap - 2, max_chars // 2, 1)
+        room = max_chars - size - 2 if parts else limit
+        first_limit = (
+            room if len(block) > limit and room >= max(limit // 4, 1) else limit
+        )
+        for piece in _split_long(block, limit, first_limit):
+            if parts and size + 2 + len(piece) > max_chars:
+                previous = "\n\n".join(parts)
+                chunk = flush()
+                if chunk:
+                    yield chunk
+                tail = _tail(previous, min(overlap, max_chars - len(piece) - 2))
+                if tail:
+                    parts.append(tail)
+                    size = len(tail)
+            add(piece)
+
+    chunk = flush()
+    if chunk:
+        yield chunk
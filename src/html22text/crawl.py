@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+import contextlib
+import dataclasses
+import json
+import os
+import posixpath
+import sys
+from collections.abc import Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+from urllib.parse import unquote, urljoin
+
+from .batch import _init_worker, _worker_state, open_sink, output_name
+from .html22text import Options
+from .presets import resolve_options
+
+LINK_GRAPH_NAME = "link-graph.json"
+BROKEN_LINKS_NAME = "broken-links.json"
+FAILED_PAGES_NAME = "failed-pages.json"
+
+
+def _convert_page(
+    root: str, page: str, options: Options
+) -> tuple[str, bytes, list[str]]:
+    """Converts one page and collects its document links."""
+    if options.base_url:
+        options = dataclasses.replace(options, base_url=urljoin(options.base_url, page))
+    links: list[str] = []
+    html_content = (Path(root) / page).read_text(encoding="utf-8", errors="replace")
+    text = options.convert(html_content, links=links)
+    return page, text.encode("utf-8"), links
+
+
+def _convert_in_worker(task: tuple[str, str]) -> tuple[str, bytes, list[str]]:
+    """Converts one page with the worker's options. Runs in a worker process."""
+    root, page = task
+    return _convert_page(root, page, _worker_state["options"])
+
+
+def _iter_conversions(
+    root: str, pending: list[str], options: Options, jobs: int
+) -> Iterator[tuple[str, tuple[bytes, list[str]] | Exception]]:
+    """Converts the pending pages, including those added while iterating.
+
+    Pages are taken from `pending`, to which the caller appends the pages
+    that the converted ones link to. A page that fails to convert yields
+    its exception instead of its output.
+
+    Yields:
+        tuple[str, tuple[bytes, list[str]] | Exception]: Each page, with its
+            converted text and its links, or the error.
+    """
+    if jobs == 1:
+        while pending:
+            page = pending.pop()
+            try:
+                _, data, links = _convert_page(root, page, options)
+            except Exception as exc:  # noqa: BLE001
+                yield page, exc
+                continue
+            yield page, (data, links)
+        return
+
+    executor = ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(options,))
+    with executor:
+        # Page of each running conversion
+        running: dict[Future[tuple[str, bytes, list[str]]], str] = {}
+        while pending or running:
+            for page in pending:
+                running[executor.submit(_convert_in_worker, (root, page))] = page
+            pending.clear()
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                page = running.pop(future)
+                try:
+                    _, data, links = future.result()
+                except Exception as exc:  # noqa: BLE001
+                    yield page, exc
+                    continue
+                yield page, (data, links)
+
+
+def _resolve_link(page: str, href: str) -> str:
+    """Resolves a relative document href against the page that contains it.
+
+    Returns:
+        str: Normalized POSIX path relative to the crawl root. Paths that
+            escape the root start with "..".
+    """
+    return posixpath.normpath(posixpath.join(posixpath.dirname(page), unquote(href)))
+
+
+def crawl(
+    entry: str,
+    out_dir: str,
+    jobs: int = 0,
+    preset: str = "",
+    preset_file: str = "",
+    **options: Any,
+) -> int:
+    """Convert an HTML page and every local document reachable from it.
+
+    Starting from `entry`, relative document links (those rewritten by
+    `prep_doc`, see `is_doc`) are followed within the directory of `entry`.
+    Each page is scheduled once, parsed once by a worker process, and its
+    links are taken from that same conversion. Besides the converted pages,
+    `out_dir` receives `link-graph.json`, mapping every page to the pages it
+    links to, `broken-links.json`, listing links to missing files or to
+    files outside the crawl root, and `failed-pages.json`, listing the pages
+    that could not be converted with their error. A failed page is also
+    reported on stderr, and does not stop the crawl.
+
+    Args:
+        entry (str): Path of the entry page.
+        out_dir (str): Output directory, `.zip` or `.tar[.gz|.bz2|.xz]` archive.
+        jobs (int, optional): Number of worker processes. 0 uses all CPUs,
+            1 converts in the current process. Defaults to 0.
+        preset (str, optional): Name of an option preset, see
+            `resolve_options`. Defaults to "".
+        preset_file (str, optional): TOML file with option presets.
+            Defaults to "".
+        **options: Conversion options of `html22text()`, which override
+            those of the preset.
+
+    Returns:
+        int: Number of converted pages.
+    """
+    options.pop("is_input_path", None)
+    conversion = resolve_options(preset, preset_file, **options)
+    file_ext = conversion.file_ext
+    jobs = jobs or os.cpu_count() or 1
+    entry_path = Path(entry)
+    root = str(entry_path.parent)
+
+    graph: dict[str, list[str]] = {}
+    broken: list[dict[str, str]] = []
+    failed: list[dict[str, str]] = []
+    seen = {entry_path.name}
+    missing: set[str] = set()
+    pending = [entry_path.name]
+
+    def schedule_links(page: str, links: list[str]) -> None:
+        targets = graph.setdefault(page, [])
+        for href in links:
+            target = _resolve_link(page, href)
+            if target.startswith("../") or target == "..":
+                broken.append({"page": page, "href": href, "reason": "outside root"})
+                continue
+            if target not in targets:
+                targets.append(target)
+            if target not in seen and target not in missing:
+                if (Path(root) / target).is_file():
+                    seen.add(target)
+                    pending.append(target)
+                else:
+                    missing.add(target)
+            if target in missing:
+                broken.append({"page": page, "href": href, "reason": "not found"})
+
+    with contextlib.closing(open_sink(out_dir)) as sink:
+        for page, outcome in _iter_conversions(root, pending, conversion, jobs):
+            if isinstance(outcome, Exception):
+                error = f"{type(outcome).__name__}: {outcome}"
+                print(f"{page}: error: {error}", file=sys.stderr)
+                failed.append({"page": page, "error": error})
+                continue
+            data, links = outcome
+            sink.write(output_name(page, file_ext), data)
+            schedule_links(page, links)
+
+        graph_json = json.dumps(
+            dict(sorted(graph.items())), indent=2, ensure_ascii=False
+        )
+        sink.write(LINK_GRAPH_NAME, graph_json.encode("utf-8"))
+        broken_json = json.dumps(broken, indent=2, ensure_ascii=False)
+        sink.write(BROKEN_LINKS_NAME, broken_json.encode("utf-8"))
+        failed_json = json.dumps(failed, indent=2, ensure_ascii=False)
+        sink.write(FAILED_PAGES_NAME, failed_json.encode("utf-8"))
+    return len(graph)
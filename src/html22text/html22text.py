@@ -1,14 +1,29 @@
 #!/usr/bin/env python3
 
 import contextlib
+import copy
+import dataclasses
+import functools
+import inspect
+import io
+import re
+import threading
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import repeat
 from pathlib import Path
-from typing import cast  # For type hinting kill_tags and casting
+from typing import IO, Any, cast  # For type hinting kill_tags and casting
 from urllib.parse import quote as urlquote
 from urllib.parse import urljoin, urlparse
 
 from bs4 import BeautifulSoup
-from bs4.element import NavigableString, PageElement, Tag  # Import specific BS4 types
+from bs4.element import (  # Import specific BS4 types
+    NavigableString,
+    PageElement,
+    PreformattedString,
+    Tag,
+)
 from html2text import HTML2Text
+from html2text import config as html2text_config
 
 SelectorSyntaxError: type[Exception]  # Forward declaration for type checkers
 try:
@@ -28,6 +43,52 @@ except ImportError:
             """Dummy SelectorSyntaxError if not found in bs4 or soupsieve."""
 
 
+# Size of the HTML slices fed to the renderer when streaming output.
+FEED_SIZE = 64 * 1024
+# Number of output characters collected before each write in `convert_to()`.
+WRITE_SIZE = 64 * 1024
+# Tags whose content is set off by whitespace when `flatten_deep()` unwraps
+# them, so that the words of adjacent blocks do not run together.
+BLOCK_TAGS = frozenset(
+    {
+        "address", "article", "aside", "blockquote", "dd", "div", "dl", "dt",
+        "figcaption", "figure", "footer", "h1", "h2", "h3", "h4", "h5", "h6",
+        "header", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+        "td", "th", "tr", "ul",
+    }
+)  # fmt: skip
+# Childless tags that `flatten_deep()` keeps.
+VOID_TAGS = frozenset({"br", "hr", "img"})
+# Actions of tag rules, see `Options.tag_rules`. Any other action is a
+# space-separated list of tags to render the tag as, outermost first.
+TAG_RULE_ACTIONS = frozenset({"drop", "keep", "text", "unwrap"})
+# Rules that apply unless overridden.
+DEFAULT_TAG_RULES = {"kbd": "text", "mark": "text"}
+# Tags whose text `Tag.get_text()` leaves out, and so do "text" rules.
+NON_TEXT_TAGS = frozenset({"rp", "rt", "script", "style", "template"})
+# Tags whose content html2text does not render, and `flatten_deep()` drops.
+QUIET_TAGS = frozenset({"head", "script", "style"})
+# `PageElement.extract()` of Beautiful Soup 4.12.1 and later takes the
+# position of the element as the private `_self_index` parameter, which
+# `_extract_all()` passes where it exists.
+EXTRACT_TAKES_INDEX = "_self_index" in inspect.signature(PageElement.extract).parameters
+# Number of option sets whose renderers each thread keeps for reuse.
+RENDERER_POOL_SIZE = 16
+# Text of `<pre>` blocks at least this long skips serialization and is
+# handed to the renderer as is, see `_swap_verbatim()`.
+VERBATIM_SIZE = 256
+# Stands in for a verbatim block in the serialized HTML: its index in the
+# renderer's `verbatim` list between two private-use chars.
+VERBATIM_TOKEN = re.compile("\ue000(\\d+)\ue001")
+# Documents in which the token chars can occur, literally or as a character
+# reference, are serialized in full.
+_TOKEN_CHARS = re.compile("\ue000|&#(?:x0*e000|0*57344)", re.IGNORECASE)
+_PRE_TAG = re.compile("<pre", re.IGNORECASE)
+# First piece of data that text gives when serialized and parsed again: up
+# to the first char that is escaped as a character reference, or that char.
+_FIRST_PIECE = re.compile("[^&<>]+|.", re.DOTALL)
+
+
 # Helper function for IRI to URI conversion using urllib.parse
 def _iri_to_uri_urllib(iri_string: str) -> str:
     """
@@ -141,12 +202,17 @@ def abs_asset_href(href: str, base_url: str) -> str:
     return _iri_to_uri_urllib(joined_url)
 
 
-def replace_asset_hrefs(soup: BeautifulSoup, base_url: str) -> BeautifulSoup:
+def replace_asset_hrefs(
+    soup: BeautifulSoup, base_url: str, assets: list[str] | None = None
+) -> BeautifulSoup:
     """Makes all relative asset links absolute in the soup.
 
     Args:
         soup (BeautifulSoup): Parsed HTML.
         base_url (str): Base URL.
+        assets (list[str] | None, optional): If given, every asset URL is
+            appended to it as made absolute, `<link href>` first, then
+            `src` attributes. Defaults to None.
 
     Returns:
         BeautifulSoup: Modified soup.
@@ -156,7 +222,10 @@ def replace_asset_hrefs(soup: BeautifulSoup, base_url: str) -> BeautifulSoup:
             link_tag: Tag = element
             current_href = link_tag.get("href")
             if isinstance(current_href, str):
-                link_tag["href"] = abs_asset_href(current_href, base_url)
+                new_href = abs_asset_href(current_href, base_url)
+                link_tag["href"] = new_href
+                if assets is not None:
+                    assets.append(new_href)
             elif isinstance(current_href, list):  # Should not happen for 'href'
                 # Changed to TypeError as per TRY004 suggestion
                 error_message = (
@@ -169,16 +238,23 @@ def replace_asset_hrefs(soup: BeautifulSoup, base_url: str) -> BeautifulSoup:
         if isinstance(element, Tag):
             asset_tag: Tag = element
             current_src = asset_tag.get("src")
+            if isinstance(current_src, list):  # Should not happen for 'src'
+                current_src = str(current_src[0])
             if isinstance(current_src, str):
-                asset_tag["src"] = abs_asset_href(current_src, base_url)
-            elif isinstance(current_src, list):  # Should not happen for 'src'
-                asset_tag["src"] = abs_asset_href(str(current_src[0]), base_url)
+                new_src = abs_asset_href(current_src, base_url)
+                asset_tag["src"] = new_src
+                if assets is not None:
+                    assets.append(new_src)
 
     return soup
 
 
 def prep_doc(
-    soup: BeautifulSoup, base_url: str, file_ext: str = "txt"
+    soup: BeautifulSoup,
+    base_url: str,
+    file_ext: str = "txt",
+    links: list[str] | None = None,
+    assets: list[str] | None = None,
 ) -> BeautifulSoup:
     """Transforms relative HTML doc hrefs to relative text hrefs.
 
@@ -186,6 +262,10 @@ def prep_doc(
         soup (BeautifulSoup): Parsed HTML.
         base_url (str): Base URL.
         file_ext (str, optional): Target file extension. Defaults to "txt".
+        links (list[str] | None, optional): If given, the original value of
+            every rewritten href is appended to it. Defaults to None.
+        assets (list[str] | None, optional): Collector passed on to
+            `replace_asset_hrefs`. Defaults to None.
 
     Returns:
         BeautifulSoup: Modified soup.
@@ -195,16 +275,503 @@ def prep_doc(
             anchor_tag: Tag = element
             current_href = anchor_tag.get("href")
             if isinstance(current_href, str):
-                anchor_tag["href"] = rel_txt_href(current_href, file_ext)
+                new_href = rel_txt_href(current_href, file_ext)
+                if links is not None and new_href != current_href:
+                    links.append(current_href)
+                anchor_tag["href"] = new_href
             # Removed check for `isinstance(current_href, list)` for anchor tags'
             # href, as this is highly unlikely for standard HTML and
             # `rel_txt_href` expects a string.
 
     # The RET504 for this was valid, direct return.
-    return replace_asset_hrefs(soup, base_url)
+    return replace_asset_hrefs(soup, base_url, assets)
+
+
+def flatten_deep(soup: BeautifulSoup, max_depth: int) -> BeautifulSoup:
+    """Unwraps all tags nested more than `max_depth` levels deep.
+
+    The text below the cut-off depth is kept, as are `<br>`, `<hr>` and
+    `<img>` tags, but the other tags are removed and block-level content is
+    reduced to whitespace-separated running text. The content of
+    `QUIET_TAGS`, comments and declarations are dropped, as the renderer
+    leaves them out anyway. This bounds the nesting
+    the renderer sees, and with it the cost of machine-generated markup.
+    The tree is walked iteratively, so any depth is handled.
+
+    Args:
+        soup (BeautifulSoup): Parsed HTML.
+        max_depth (int): Maximum depth of tags to keep, top-level tags being
+            at depth 1.
+
+    Returns:
+        BeautifulSoup: Modified soup.
+    """
+    stack: list[tuple[Tag, int]] = [(soup, 0)]
+    while stack:
+        tag, depth = stack.pop()
+        if depth < max_depth:
+            stack.extend(
+                (child, depth + 1) for child in tag.contents if isinstance(child, Tag)
+            )
+            continue
+        if not any(isinstance(child, Tag) for child in tag.contents):
+            continue
+        _extract_all(tag.find_all(QUIET_TAGS))
+        flat: list[PageElement] = []
+        for node in tag.descendants:
+            if isinstance(node, PreformattedString):
+                continue
+            if isinstance(node, NavigableString):
+                flat.append(type(node)(str(node)))
+            elif not isinstance(node, Tag):
+                continue
+            elif node.name in VOID_TAGS:
+                flat.append(copy.copy(node))
+            elif node.name in BLOCK_TAGS:
+                flat.append(NavigableString(" "))
+        tag.clear()
+        tag.extend(flat)
+    return soup
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Options:
+    """Conversion options of `html22text()` as a frozen, hashable value.
+
+    An `Options` instance pickles to a few hundred bytes and compares by
+    value, so it can be handed to a worker process once instead of with
+    every document, and it is the key of the caches that depend on the
+    options. Named presets (see `presets.PRESETS`) are `Options` instances.
+
+    Attributes:
+        markdown (bool): Output Markdown if True or plain-text if False.
+        selector (str): Select the portion of HTML to extract.
+        base_url (str): Base URL for link conversion.
+        open_quote (str): If plain-text, char to use for `<q>`.
+        close_quote (str): If plain-text, char to use for `</q>`.
+        block_quote (bool): If plain-text, treat `<blockquote>` as `<q>`.
+        default_image_alt (str): If plain-text, default text placeholder for
+            images.
+        kill_strikethrough (bool): If plain-text, remove content of `<s></s>`.
+        kill_tags (str | None): Comma-separated string of CSS selectors whose
+            content should be removed.
+        kill_images (bool): Drop images.
+        file_ext_override (str): File extension for relative `.html` link
+            conversion.
+        max_depth (int): If positive, unwrap tags nested deeper than this.
+        tag_rules (Mapping[str, str] | tuple[tuple[str, str], ...]): Action
+            per tag name, applied while rendering: "text" renders only the text
+            inside the tag, "unwrap" renders its content as if the tag were
+            absent, "drop" removes it with its content, "keep" disables a
+            default rule, and a space-separated list of tag names renders
+            the tag as those tags, e.g. "p q". `<mark>` and `<kbd>` are
+            rendered as text by default. Normalized to sorted pairs.
+        pad_tables (bool): If markdown, pad table cells so that the columns
+            line up. If False, rows are written as they are rendered, which
+            is faster and needs no buffering on tables with many rows.
+    """
+
+    markdown: bool = False
+    selector: str = "html"
+    base_url: str = ""
+    open_quote: str = "“"
+    close_quote: str = "”"
+    block_quote: bool = False
+    default_image_alt: str = ""
+    kill_strikethrough: bool = False
+    kill_tags: str | None = None
+    kill_images: bool = False
+    file_ext_override: str = ""
+    max_depth: int = 0
+    tag_rules: Mapping[str, str] | tuple[tuple[str, str], ...] = ()
+    pad_tables: bool = True
+
+    def __post_init__(self) -> None:
+        # Normalized to sorted pairs, so that equal rules compare and hash
+        # equal whether they come from a mapping (TOML, the CLI) or not.
+        rules = tuple(sorted(dict(self.tag_rules or ()).items()))
+        object.__setattr__(self, "tag_rules", rules)
+        for tag, action in rules:
+            if action not in TAG_RULE_ACTIONS and not action.split():
+                error_message = f"Invalid rule for <{tag}>: {action!r}"
+                raise ValueError(error_message)
+
+    @property
+    def file_ext(self) -> str:
+        """Extension of converted documents and of rewritten document links."""
+        return self.file_ext_override or ("md" if self.markdown else "txt")
+
+    @property
+    def resolved_tag_rules(self) -> dict[str, str]:
+        """Tag rules in effect: the defaults, overridden by `tag_rules`."""
+        rules = dict(DEFAULT_TAG_RULES)
+        if not self.markdown and self.block_quote:
+            # Render <blockquote> as <p><q> for custom quoting. Otherwise,
+            # <blockquote> is passed through for native html2text handling.
+            rules["blockquote"] = "p q"
+        rules.update(self.tag_rules)
+        return {tag: action for tag, action in rules.items() if action != "keep"}
+
+    def as_kwargs(self) -> dict[str, Any]:
+        """Returns the options as keyword arguments for `html22text()`."""
+        return {
+            field.name: getattr(self, field.name) for field in dataclasses.fields(self)
+        }
+
+    def convert(
+        self,
+        html_content: str,
+        *,
+        is_input_path: bool = False,
+        links: list[str] | None = None,
+    ) -> str:
+        """Convert HTML text or file with these options.
+
+        Args:
+            html_content (str): Input HTML text or file path.
+            is_input_path (bool, optional): `html_content` is a file path.
+                Defaults to False.
+            links (list[str] | None, optional): Collector for the original
+                hrefs of relative document links, see `html22text()`.
+                Defaults to None.
+
+        Returns:
+            str: Markdown or plain-text as string.
+        """
+        with _pooled_renderer(self) as h:
+            html = _prepare_html(
+                self, html_content, is_input_path, links, _verbatim_of(h)
+            )
+            return _render(h, html)
+
+
+def _parse(html_content: str, selector: str = "html") -> BeautifulSoup:
+    """Parses HTML and narrows it down to the first match of `selector`.
+
+    Args:
+        html_content (str): Input HTML text.
+        selector (str, optional): CSS selector. Defaults to "html".
+
+    Returns:
+        BeautifulSoup: Parsed HTML.
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+    selected_tag = _select(soup, selector)
+    if selected_tag is not None:
+        # Ensure we operate on a copy if selection happens, to avoid modifying original
+        soup = BeautifulSoup(selected_tag.encode("utf-8"), "html.parser")
+    return soup
+
+
+def _select(soup: BeautifulSoup, selector: str) -> Tag | None:
+    """Returns the first match of `selector`, or None.
+
+    Invalid selectors match nothing.
+    """
+    with contextlib.suppress(IndexError, SelectorSyntaxError):  # SIM105
+        selected_tag = soup.select(selector)
+        if selected_tag:  # Check if selector found anything
+            return selected_tag[0]
+    return None
+
+
+def _rewrite(
+    soup: BeautifulSoup,
+    options: Options,
+    links: list[str] | None = None,
+    assets: list[str] | None = None,
+) -> BeautifulSoup:
+    """Rewrites links and transforms or removes tags before rendering.
+
+    Args:
+        soup (BeautifulSoup): Parsed HTML.
+        options (Options): Conversion options.
+        links (list[str] | None, optional): Collector passed on to `prep_doc`.
+            Defaults to None.
+        assets (list[str] | None, optional): Collector passed on to
+            `prep_doc`. Defaults to None.
+
+    Returns:
+        BeautifulSoup: Modified soup.
+    """
+    if options.max_depth > 0:
+        soup = flatten_deep(soup, options.max_depth)
+
+    actual_kill_tags: list[str] = []
+    if options.kill_tags:
+        actual_kill_tags = [tag.strip() for tag in options.kill_tags.split(",")]
+
+    # Link rewriting is invisible in plain text, where html2text drops links
+    # and images, so it is safe to run just to collect the links.
+    if options.markdown or links is not None or assets is not None:
+        soup = prep_doc(soup, options.base_url, options.file_ext, links, assets)
+
+    # Custom plain_tables logic removed as html2text native handling is
+    # preferred. Other tag transformations, such as flattening <mark> and
+    # <kbd>, are tag rules applied while rendering (see `_RuleRenderer`).
+
+    for kill_item in actual_kill_tags:  # Use the initialized list
+        _extract_all(soup.select(kill_item))
+
+    return soup
+
+
+def _extract_all(tags: Iterable[Tag]) -> None:
+    """Removes tags from the tree in time linear in the number of siblings.
+
+    `Tag.extract()` looks up the position of the tag among its siblings,
+    which makes removing many siblings one by one quadratic. The positions
+    are looked up once per parent instead, and the tags removed from the
+    last to the first so that the remaining positions stay valid. Without
+    `EXTRACT_TAKES_INDEX`, the tags are extracted one by one.
+    """
+    if not EXTRACT_TAKES_INDEX:
+        for tag in tags:
+            tag.extract()
+        return
+    by_parent: dict[int, tuple[Tag, list[Tag]]] = {}
+    for tag in tags:
+        if tag.parent is not None:
+            by_parent.setdefault(id(tag.parent), (tag.parent, []))[1].append(tag)
+    for parent, children in by_parent.values():
+        positions = {id(child): index for index, child in enumerate(parent.contents)}
+        for child in sorted(children, key=lambda child: positions[id(child)])[::-1]:
+            child.extract(_self_index=positions[id(child)])
+
+
+class _RuleRenderer(HTML2Text):
+    """`HTML2Text` that applies tag rules while it parses the HTML.
+
+    Rules run inside the rendering pass, so they need neither changes to
+    the tree nor a walk of their own. Text is held back until the next tag
+    that is rendered, so that tags skipped by a rule do not split it: the
+    renderer handles the same events as if the rules had been applied to
+    the tree, e.g. a `<mark>` replaced by its text, and whitespace and
+    emphasis come out the same.
+
+    Attributes:
+        tag_rules (Mapping[str, str]): Action per tag name, see
+            `Options.tag_rules`.
+        verbatim (list[str]): Text of the blocks that `_swap_verbatim()`
+            took out of the HTML, put back in place of their tokens.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.tag_rules: Mapping[str, str] = {}
+        self.verbatim: list[str] = []
+        self.pending_data: list[str] = []
+        # Tag of the "text" or "drop" rule being applied, and its nesting
+        self.skipped_tag = ""
+        self.skip_depth = 0
+        self.dropping = False
+        # Nesting of NON_TEXT_TAGS, whose text "text" rules leave out
+        self.non_text_depth = 0
+
+    def flush_data(self) -> None:
+        """Renders the text held back so far as one piece."""
+        if self.pending_data:
+            data = "".join(self.pending_data)
+            self.pending_data = []
+            match = VERBATIM_TOKEN.fullmatch(data) if self.verbatim else None
+            if match:
+                self.handle_verbatim(self.verbatim[int(match[1])])
+            else:
+                super().handle_data(data)
+
+    def handle_verbatim(self, text: str) -> None:
+        """Renders the text of a block that `_swap_verbatim()` took out.
+
+        html2text strips whitespace after emphasis marks and detects
+        automatic links in the first piece of data only, so the text is
+        rendered as that piece and the rest, as if it had been parsed.
+        """
+        head = cast("re.Match[str]", _FIRST_PIECE.match(text))[0]
+        super().handle_data(head)
+        super().handle_data(text[len(head) :])
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        if tag in NON_TEXT_TAGS:
+            self.non_text_depth += 1
+        if self.skip_depth:
+            if tag == self.skipped_tag:
+                self.skip_depth += 1
+            return
+        action = self.tag_rules.get(tag)
+        if action in {"text", "drop"}:
+            self.skipped_tag, self.skip_depth = tag, 1
+            self.dropping = action == "drop"
+        elif action != "unwrap":
+            self.flush_data()
+            if action is None:
+                super().handle_starttag(tag, attrs)
+                return
+            *outer, inner = action.split()
+            for name in outer:
+                super().handle_starttag(name, [])
+            super().handle_starttag(inner, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in NON_TEXT_TAGS:
+            self.non_text_depth -= 1
+        if self.skip_depth:
+            if tag == self.skipped_tag:
+                self.skip_depth -= 1
+            return
+        action = self.tag_rules.get(tag)
+        if action not in {"text", "drop", "unwrap"}:
+            self.flush_data()
+            for name in reversed((action or tag).split()):
+                super().handle_endtag(name)
+
+    def handle_data(self, data: str, entity_char: bool = False) -> None:
+        if self.skip_depth and (self.dropping or self.non_text_depth):
+            return
+        if entity_char:
+            self.flush_data()
+            super().handle_data(data, entity_char)
+        else:
+            self.pending_data.append(data)
+
+    def handle_comment(self, data: str) -> None:
+        del data
+        if not self.skip_depth:
+            self.flush_data()
+
+    def handle_decl(self, decl: str) -> None:
+        self.handle_comment(decl)
+
+    def handle_pi(self, data: str) -> None:
+        self.handle_comment(data)
+
+    def unknown_decl(self, data: str) -> None:
+        self.handle_comment(data)
+
+    def close(self) -> None:
+        super().close()
+        self.flush_data()
+
+
+@functools.lru_cache(maxsize=64)
+def _renderer_settings(options: Options) -> dict[str, Any]:
+    """Computes the `HTML2Text` attributes for the options, memoized per Options.
+
+    The returned dict is shared between calls and must not be modified.
+    """
+    markdown = options.markdown
+    settings: dict[str, Any] = {
+        # Universal settings
+        "body_width": 0,  # No line wrapping
+        "bypass_tables": False,
+        "escape_snob": False,
+        "google_doc": False,
+        "google_list_indent": 0,
+        "images_as_html": False,
+        "images_with_size": False,
+        "links_each_paragraph": False,
+        "protect_links": True,
+        "single_line_break": False,
+        "tag_callback": None,
+        "unicode_snob": True,
+        "wrap_links": False,
+        "wrap_list_items": False,
+        "wrap_tables": False,
+        "tag_rules": options.resolved_tag_rules,
+        # Settings from direct pass-through parameters
+        "close_quote": options.close_quote,
+        "default_image_alt": options.default_image_alt,
+        "hide_strikethrough": options.kill_strikethrough,
+        "open_quote": options.open_quote,
+        # Conditional settings based on markdown mode or other parameters
+        "emphasis_mark": "_" if markdown else "",
+        "ignore_emphasis": not markdown,
+        "ignore_images": not markdown or options.kill_images,
+        "ignore_links": not markdown,
+        "ignore_mailto_links": not markdown,
+        "ignore_tables": False,  # Always let html2text process tables natively
+        "images_to_alt": not markdown,  # Convert images to alt text if not markdown
+        "inline_links": bool(markdown),
+        "mark_code": bool(markdown),  # Enable code marking for Markdown
+        "pad_tables": bool(markdown) and options.pad_tables,
+        "skip_internal_links": not markdown,
+        "strong_mark": "**" if markdown else "",
+        "ul_item_mark": "-" if markdown else "",
+        "use_automatic_links": bool(markdown),
+    }
+    return settings
+
+
+def _renderer(options: Options) -> HTML2Text:
+    """Creates an `HTML2Text` renderer configured for Markdown or plain text.
+
+    Args:
+        options (Options): Conversion options.
+
+    Returns:
+        HTML2Text: Configured renderer.
+    """
+    settings = _renderer_settings(_renderer_key(options))
+    h = _RuleRenderer() if settings["tag_rules"] else HTML2Text()
+    vars(h).update(settings)
+    return h
+
 
+def _renderer_key(options: Options) -> Options:
+    """Returns the options that renderers are cached and pooled by."""
+    if options.base_url:
+        # The base URL does not affect rendering; leaving it out of the cache
+        # key keeps per-document base URLs from defeating the cache.
+        options = dataclasses.replace(options, base_url="")
+    return options
 
-def html22text(  # noqa: PLR0913, PLR0915
+
+_renderer_pool = threading.local()
+
+
+@contextlib.contextmanager
+def _pooled_renderer(options: Options) -> Iterator[HTML2Text]:
+    """Lends a configured renderer from the pool of the current thread.
+
+    Restoring a renderer is cheaper than constructing and configuring a new
+    one: each pooled renderer keeps a snapshot of its attributes, taken
+    right after configuration, and is reset to it before it is lent again,
+    with fresh copies of its lists and dicts. A renderer is lent to one
+    caller at a time, so nested conversions get renderers of their own.
+
+    Args:
+        options (Options): Conversion options.
+
+    Yields:
+        HTML2Text: Renderer in its initial state.
+    """
+    key = _renderer_key(options)
+    pool: dict[Options, list[tuple[HTML2Text, dict[str, Any], list[str]]]]
+    pool = _renderer_pool.__dict__.setdefault("renderers", {})
+    idle = pool.get(key)
+    if idle:
+        h, snapshot, containers = idle.pop()
+        state = vars(h)
+        state.clear()
+        state.update(snapshot)
+        for name in containers:
+            state[name] = snapshot[name].copy()
+    else:
+        h = _renderer(key)
+        snapshot = vars(h).copy()
+        containers = [
+            name for name, value in snapshot.items() if type(value) in {list, dict}
+        ]
+        for name in containers:
+            snapshot[name] = snapshot[name].copy()
+    try:
+        yield h
+    finally:
+        if key not in pool and len(pool) >= RENDERER_POOL_SIZE:
+            pool.clear()
+        pool.setdefault(key, []).append((h, snapshot, containers))
+
+
+def html22text(  # noqa: PLR0913
     html_content: str,  # Renamed from html to avoid confusion with module
     is_input_path: bool = False,  # Renamed from input
     markdown: bool = False,
@@ -218,9 +785,22 @@ def html22text(  # noqa: PLR0913, PLR0915
     kill_tags: str | None = None,  # Comma-separated string of selectors
     kill_images: bool = False,
     file_ext_override: str = "",  # Renamed file_ext to avoid confusion
+    *,
+    links: list[str] | None = None,
+    max_depth: int = 0,
+    tag_rules: Mapping[str, str] | None = None,
+    pad_tables: bool = True,
 ) -> str:
     """Convert HTML text or file to Markdown or plain-text text.
 
+    This function, `Options.convert()`, `convert_to()` and `chunks()` are
+    thread-safe, including on free-threaded CPython builds: every call
+    parses into its own soup and renders with its own `HTML2Text`
+    instance, and the only state shared between calls is read-only
+    configuration and `functools.lru_cache` caches. Renderers are reused
+    through per-thread pools. `HTML2Text` instances are stateful and must
+    not be shared between threads.
+
     Args:
         html_content (str): Input HTML text or file path.
         is_input_path (bool, optional): `html_content` is a file path.
@@ -244,94 +824,347 @@ def html22text(  # noqa: PLR0913, PLR0915
             of CSS selectors whose content should be removed. Defaults to None.
         file_ext_override (str, optional): If markdown, file extension for relative
             `.html` link conversion. Defaults to "".
+        links (list[str] | None, optional): If given, the original hrefs of
+            all relative document links (see `is_doc`) are appended to it,
+            in both Markdown and plain-text mode. Defaults to None.
+        max_depth (int, optional): If positive, tags nested more than this
+            many levels deep are unwrapped into running text (see
+            `flatten_deep`), which bounds the cost of pathologically deep
+            markup. Defaults to 0 (no limit).
+        tag_rules (Mapping[str, str] | None, optional): Tag rules, such as
+            `{"aside": "drop", "mark": "keep"}`, see `Options.tag_rules`.
+            Defaults to None.
+        pad_tables (bool, optional): If markdown, pad table cells so that
+            the columns line up. False writes rows unpadded, which is
+            faster on very large tables. Defaults to True.
 
     Returns:
         str: Markdown or plain-text as string.
+
+    Raises:
+        ValueError: If a tag rule is invalid.
     """
-    actual_kill_tags: list[str] = []
-    if kill_tags:
-        actual_kill_tags = [tag.strip() for tag in kill_tags.split(',')]
+    options = Options(
+        markdown=markdown,
+        selector=selector,
+        base_url=base_url,
+        open_quote=open_quote,
+        close_quote=close_quote,
+        block_quote=block_quote,
+        default_image_alt=default_image_alt,
+        kill_strikethrough=kill_strikethrough,
+        kill_tags=kill_tags,
+        kill_images=kill_images,
+        file_ext_override=file_ext_override,
+        max_depth=max_depth,
+        tag_rules=tuple(dict(tag_rules or {}).items()),
+        pad_tables=pad_tables,
+    )
+    return options.convert(html_content, is_input_path=is_input_path, links=links)
+
+
+def _prepare_with(
+    options: Options,
+    html_content: str,
+    is_input_path: bool = False,
+    links: list[str] | None = None,
+) -> tuple[HTML2Text, str]:
+    """Runs the stages of `Options.convert()` that precede rendering.
+
+    Returns:
+        tuple[HTML2Text, str]: Configured renderer and the HTML to feed it.
+    """
+    h = _renderer(options)
+    html = _prepare_html(options, html_content, is_input_path, links, _verbatim_of(h))
+    return h, html
+
+
+def _prepare_html(
+    options: Options,
+    html_content: str,
+    is_input_path: bool = False,
+    links: list[str] | None = None,
+    verbatim: list[str] | None = None,
+) -> str:
+    """Reads, parses and rewrites the input, and returns the HTML to render.
 
+    If `verbatim` is given, the text of large `<pre>` blocks is moved to
+    it, see `_swap_verbatim()`.
+    """
     if is_input_path:
         html_content = Path(html_content).read_text(encoding="utf-8")
 
-    soup = BeautifulSoup(html_content, "html.parser")
-    with contextlib.suppress(IndexError, SelectorSyntaxError):  # SIM105
-        # Ensure we operate on a copy if selection happens, to avoid modifying original
-        selected_tag = soup.select(selector)
-        if selected_tag:  # Check if selector found anything
-            soup = BeautifulSoup(selected_tag[0].encode("utf-8"), "html.parser")
-
-    current_file_ext = file_ext_override
-    if not current_file_ext:  # SIM108 applied here
-        current_file_ext = "md" if markdown else "txt"
-
-    if markdown:
-        soup = prep_doc(soup, base_url, current_file_ext)
-
-    tag_or_element: Tag | PageElement | NavigableString
-    for tag_or_element in soup.find_all(True):
-        if isinstance(tag_or_element, Tag):
-            tag: Tag = tag_or_element  # Narrowing type
-
-            if tag.name in ("mark", "kbd"):
-                tag.replace_with(tag.get_text(""))  # type: ignore[arg-type]
-            # Custom plain_tables logic removed as html2text native handling is
-            # preferred.
-            if not markdown and tag.name == "blockquote" and block_quote:
-                # If block_quote is True for plain text, transform <blockquote>
-                # to <p><q> for custom quoting. Otherwise, <blockquote> is
-                # passed through for native html2text handling.
-                tag.name = "q"
-                tag.wrap(soup.new_tag("p"))
-            # Other specific tag transformations for plain text mode have been
-            # removed to rely more on html2text's default behavior.
+    soup = _parse(html_content, options.selector)
+    soup = _rewrite(soup, options, links)
+    return _serialize(soup, options, html_content, verbatim)
 
-    for kill_item in actual_kill_tags:  # Use the initialized list
-        for element_to_kill in soup.select(kill_item):  # select usually returns Tags
-            if isinstance(element_to_kill, Tag):
-                found_tag_to_kill: Tag = element_to_kill
-                found_tag_to_kill.replace_with("")  # type: ignore[arg-type]
-
-    h = HTML2Text()
-
-    # Universal settings
-    h.body_width = 0  # No line wrapping
-    h.bypass_tables = False
-    h.escape_snob = False
-    h.google_doc = False
-    h.google_list_indent = 0
-    h.images_as_html = False
-    h.images_with_size = False
-    h.links_each_paragraph = False
-    h.protect_links = True
-    h.single_line_break = False
-    h.tag_callback = None
-    h.unicode_snob = True
-    h.wrap_links = False
-    h.wrap_list_items = False
-    h.wrap_tables = False
-
-    # Settings from direct pass-through parameters
-    h.close_quote = close_quote
-    h.default_image_alt = default_image_alt
-    h.hide_strikethrough = kill_strikethrough
-    h.open_quote = open_quote
-
-    # Conditional settings based on markdown mode or other parameters
-    h.emphasis_mark = "_" if markdown else ""
-    h.ignore_emphasis = not markdown
-    h.ignore_images = not markdown or kill_images
-    h.ignore_links = not markdown
-    h.ignore_mailto_links = not markdown
-    h.ignore_tables = False  # Always let html2text process tables natively
-    h.images_to_alt = not markdown  # Convert images to alt text if not markdown
-    h.inline_links = bool(markdown)
-    h.mark_code = bool(markdown)  # Enable code marking for Markdown
-    h.pad_tables = bool(markdown)
-    h.skip_internal_links = not markdown
-    h.strong_mark = "**" if markdown else ""
-    h.ul_item_mark = "-" if markdown else ""
-    h.use_automatic_links = bool(markdown)
-
-    return cast("str", h.handle(str(soup)))
+
+def _serialize(
+    soup: BeautifulSoup,
+    options: Options,
+    html_content: str,
+    verbatim: list[str] | None = None,
+) -> str:
+    """Serializes the rewritten soup of `html_content` for the renderer.
+
+    If `verbatim` is given, the text of large `<pre>` blocks is moved to
+    it, see `_swap_verbatim()`.
+    """
+    if (
+        verbatim is not None
+        and _PRE_TAG.search(html_content)
+        and not _TOKEN_CHARS.search(html_content)
+    ):
+        _swap_verbatim(soup, options, verbatim)
+    return str(soup)
+
+
+def _verbatim_of(h: HTML2Text) -> list[str] | None:
+    """Returns the list of verbatim blocks of a renderer that can restore them."""
+    return h.verbatim if isinstance(h, _RuleRenderer) else None
+
+
+def _swap_verbatim(soup: BeautifulSoup, options: Options, verbatim: list[str]) -> None:
+    """Takes the text of large `<pre>` blocks out of the tree.
+
+    The text of a `<pre>` with no other content than the text, or than one
+    `<code>` around it, is appended to `verbatim` and replaced with a
+    `VERBATIM_TOKEN`, which the renderer replaces with the text again. A
+    long code listing is then neither escaped when the tree is serialized
+    nor parsed again, character reference by character reference, by the
+    renderer, and the text is not copied along the way. Blocks are left in
+    place if a tag rule applies to them, to their `<code>` or to one of
+    their ancestors, which could split or join their text.
+
+    Args:
+        soup (BeautifulSoup): Parsed and rewritten document.
+        options (Options): Conversion options.
+        verbatim (list[str]): List that the texts are appended to.
+    """
+    rules = options.resolved_tag_rules
+    if "code" in rules:
+        return
+    for pre in soup.find_all("pre"):
+        if any(tag.name in rules for tag in (pre, *pre.parents)):
+            continue
+        inner = pre.contents[0] if len(pre.contents) == 1 else None
+        if isinstance(inner, Tag) and inner.name == "code":
+            inner = inner.contents[0] if len(inner.contents) == 1 else None
+        if type(inner) is NavigableString and len(inner) >= VERBATIM_SIZE:
+            token = f"\ue000{len(verbatim)}\ue001"
+            verbatim.append(inner.replace_with(token))
+
+
+def _bind(html_content: str, **options: Any) -> tuple[Options, dict[str, Any]]:
+    """Splits `html22text()` keyword arguments into Options and the rest.
+
+    Returns:
+        tuple[Options, dict[str, Any]]: Conversion options, and all bound
+            arguments of `html22text()` including defaults.
+    """
+    bound = inspect.signature(html22text).bind(html_content, **options)
+    bound.apply_defaults()
+    arguments = bound.arguments
+    fields = {field.name for field in dataclasses.fields(Options)}
+    return Options(**{name: arguments[name] for name in fields}), arguments
+
+
+def _prepare(html_content: str, **options: Any) -> tuple[HTML2Text, str]:
+    """Runs the stages of `html22text()` that precede rendering.
+
+    Args:
+        html_content (str): Input HTML text or file path.
+        **options: Options of `html22text()`.
+
+    Returns:
+        tuple[HTML2Text, str]: Configured renderer and the HTML to feed it.
+    """
+    conversion, arguments = _bind(html_content, **options)
+    return _prepare_with(
+        conversion, html_content, arguments["is_input_path"], arguments["links"]
+    )
+
+
+def _feed_slices(html: str, size: int = FEED_SIZE) -> Iterator[str]:
+    """Splits HTML into slices of at least `size` chars, each cut before a `<`.
+
+    Cutting before a tag keeps every text node within one slice, so the
+    renderer sees the same data events as when fed the whole string.
+    """
+    start = 0
+    while start < len(html):
+        end = html.find("<", start + size)
+        if end == -1:
+            end = len(html)
+        yield html[start:end]
+        start = end
+
+
+def _iter_pieces(h: HTML2Text, html: str, feed_size: int = FEED_SIZE) -> Iterator[str]:
+    """Feeds HTML to the renderer in slices and yields output as it is produced.
+
+    This mirrors `HTML2Text.handle()` for `body_width = 0`, minus table
+    padding: the renderer keeps its last output piece, which it may still
+    retract, and everything before it is handed out after every slice.
+    """
+    nbsp = "\N{NO-BREAK SPACE}" if h.unicode_snob else " "
+    h.start = True
+    for html_slice in [*_feed_slices(html, feed_size), ""]:
+        h.feed(html_slice)
+        if len(h.outtextlist) > 1:
+            pieces = h.outtextlist[:-1]
+            del h.outtextlist[:-1]
+            for piece in pieces:
+                yield piece.replace("&nbsp_place_holder;", nbsp)
+    h.close()
+    h.pbr()
+    h.o("", force="end")
+    for piece in h.outtextlist:
+        yield piece.replace("&nbsp_place_holder;", nbsp)
+    h.outtextlist = []
+
+
+def _iter_lines(pieces: Iterable[str]) -> Iterator[str]:
+    """Regroups output pieces into lines, without their trailing newline.
+
+    Like `str.split("\n")`, the last line is yielded even when empty.
+    """
+    pending = ""
+    for piece in pieces:
+        if "\n" not in piece:
+            pending += piece
+            continue
+        lines = (pending + piece).split("\n")
+        pending = lines.pop()
+        yield from lines
+    yield pending
+
+
+def _is_separator(line: str) -> bool:
+    """Tells whether a table line is the `---|---` line under the header."""
+    stripped = line.strip()
+    return "-" in stripped and "|" in stripped and not stripped.strip("-|")
+
+
+def _reformat_table(lines: list[str]) -> Iterator[str]:
+    """Pads the cells of a table so that its columns line up.
+
+    This gives the same lines as html2text's `reformat_table(lines, 1)`,
+    with one pass over the lines into a list of column widths, after which
+    the rows are padded and yielded one at a time. A table without lines,
+    as the outer table of nested tables is, gives no lines where html2text
+    raises `IndexError`.
+    """
+    widths: list[int] = []
+    for line in lines:
+        lengths = [len(cell.rstrip()) + 1 for cell in line.split("|")]
+        shared = min(len(widths), len(lengths))
+        widths[:shared] = map(max, widths, lengths)
+        widths.extend(lengths[shared:])
+    for line in lines:
+        cells = [cell.rstrip() for cell in line.split("|")]
+        if _is_separator(line):
+            yield "|-" + "|".join(map(str.ljust, cells, widths, repeat("-"))) + "|"
+        else:
+            yield "| " + "|".join(map(str.ljust, cells, widths)) + "|"
+
+
+def _pad_tables(lines: Iterable[str]) -> Iterator[str]:
+    """Streaming equivalent of html2text's `pad_tables_in_text()`.
+
+    Lines outside tables pass straight through, and only one table at a
+    time is buffered for padding.
+    """
+    marker = html2text_config.TABLE_MARKER_FOR_PAD
+    table: list[str] = []
+    in_table = False
+    for line in lines:
+        if marker in line:
+            in_table = not in_table
+            if not in_table:
+                yield from _reformat_table(table)
+                table = []
+                yield ""
+            continue
+        if in_table:
+            table.append(line)
+        else:
+            yield line
+
+
+def _render(h: HTML2Text, html: str) -> str:
+    """Renders HTML in one piece, like `h.handle(html)`.
+
+    Tables are padded with `_pad_tables`, and text without tables is
+    returned as rendered, without splitting it into lines.
+    """
+    h.start = True
+    h.feed(html)
+    h.feed("")
+    text = cast("str", h.optwrap(h.finish()))
+    if h.pad_tables and html2text_config.TABLE_MARKER_FOR_PAD in text:
+        return "\n".join(_pad_tables(text.split("\n")))
+    return text
+
+
+def _iter_render(h: HTML2Text, html: str, feed_size: int = FEED_SIZE) -> Iterator[str]:
+    """Renders HTML as a stream of output lines, without trailing newlines.
+
+    Joining the lines with newlines gives the same text as
+    `h.handle(html)`, for renderers with `body_width = 0`.
+    """
+    lines = _iter_lines(_iter_pieces(h, html, feed_size))
+    if h.pad_tables:
+        return _pad_tables(lines)
+    return lines
+
+
+def convert_to(
+    fp: IO[str] | IO[bytes],
+    html_content: str,
+    encoding: str = "utf-8",
+    **options: Any,
+) -> int:
+    """Convert HTML text or file and write the output to a stream.
+
+    The output is rendered as a stream and written in buffered pieces of
+    about `WRITE_SIZE` characters, so memory use does not grow with the
+    size of the output. Binary streams receive the output encoded.
+
+    Args:
+        fp (IO[str] | IO[bytes]): Writable text or binary stream.
+        html_content (str): Input HTML text or file path.
+        encoding (str, optional): Encoding for binary streams.
+            Defaults to "utf-8".
+        **options: Conversion options of `html22text()`.
+
+    Returns:
+        int: Number of characters written.
+    """
+    binary = isinstance(fp, io.RawIOBase | io.BufferedIOBase)
+    h, html = _prepare(html_content, **options)
+    buffer: list[str] = []
+    buffered = 0
+    written = 0
+
+    def flush() -> None:
+        nonlocal buffered, written
+        text = "".join(buffer)
+        if binary:
+            cast("IO[bytes]", fp).write(text.encode(encoding))
+        else:
+            cast("IO[str]", fp).write(text)
+        written += len(text)
+        buffer.clear()
+        buffered = 0
+
+    for index, line in enumerate(_iter_render(h, html)):
+        if index:
+            buffer.append("\n")
+            buffered += 1
+        buffer.append(line)
+        buffered += len(line)
+        if buffered >= WRITE_SIZE:
+            flush()
+    flush()
+    return written
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import NamedTuple
+
+from .html22text import abs_asset_href, rel_txt_href
+
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+
+class Metadata(NamedTuple):
+    """Title, links, assets and headings of a document.
+
+    Attributes:
+        title (str): Text of the first `<title>`, whitespace collapsed.
+        links (tuple[tuple[str, str], ...]): Original and rewritten href of
+            every relative document link, as rewritten by `prep_doc`.
+        assets (tuple[str, ...]): Absolute URLs of `<link href>` and `src`
+            attributes, as made absolute by `replace_asset_hrefs`.
+        headings (tuple[tuple[int, str], ...]): Level and text of every
+            `<h1>` to `<h6>`.
+
+    All sequences are in document order.
+    """
+
+    title: str
+    links: tuple[tuple[str, str], ...]
+    assets: tuple[str, ...]
+    headings: tuple[tuple[int, str], ...]
+
+
+class _MetadataParser(HTMLParser):
+    """Collects `Metadata` from the tokenizer events, without building a tree."""
+
+    def __init__(self, base_url: str, file_ext: str) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.file_ext = file_ext
+        self.title: list[str] | None = None
+        self.links: list[tuple[str, str]] = []
+        self.assets: list[str] = []
+        self.headings: list[tuple[int, str]] = []
+        self.in_title = False
+        self.heading: tuple[int, list[str]] | None = None
+
+    def handle_starttag(self, tag: str, attrs: list[tuple[str, str | None]]) -> None:
+        attributes = dict(attrs)
+        if tag == "a" and "href" in attributes:
+            href = attributes["href"] or ""
+            new_href = rel_txt_href(href, self.file_ext)
+            if new_href != href:
+                self.links.append((href, new_href))
+        elif tag == "link" and "href" in attributes:
+            self.assets.append(abs_asset_href(attributes["href"] or "", self.base_url))
+        if "src" in attributes:
+            self.assets.append(abs_asset_href(attributes["src"] or "", self.base_url))
+        if tag == "title" and self.title is None:
+            self.title = []
+            self.in_title = True
+        elif tag in HEADING_TAGS and self.heading is None:
+            self.heading = (HEADING_TAGS[tag], [])
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title":
+            self.in_title = False
+        elif tag in HEADING_TAGS and self.heading is not None:
+            level, parts = self.heading
+            self.headings.append((level, " ".join("".join(parts).split())))
+            self.heading = None
+
+    def handle_data(self, data: str) -> None:
+        if self.in_title and self.title is not None:
+            self.title.append(data)
+        if self.heading is not None:
+            self.heading[1].append(data)
+
+
+def extract_metadata(
+    html_content: str,
+    base_url: str = "",
+    file_ext: str = "txt",
+    is_input_path: bool = False,
+) -> Metadata:
+    """Extract the title, links, assets and headings of an HTML document.
+
+    This is one pass of the HTML tokenizer that `html22text()` parses with,
+    without building a tree or rendering, at a fraction of the cost of a
+    conversion. Links and assets are normalized with the same functions as
+    in a conversion (`rel_txt_href` and `abs_asset_href`).
+
+    Args:
+        html_content (str): Input HTML text or file path.
+        base_url (str, optional): Base URL for assets. Defaults to "".
+        file_ext (str, optional): Extension of rewritten document links.
+            Defaults to "txt".
+        is_input_path (bool, optional): `html_content` is a file path.
+            Defaults to False.
+
+    Returns:
+        Metadata: Title, links, assets and headings.
+    """
+    if is_input_path:
+        html_content = Path(html_content).read_text(encoding="utf-8")
+    parser = _MetadataParser(base_url, file_ext)
+    parser.feed(html_content)
+    parser.close()
+    if parser.heading is not None:  # Unclosed at the end of the document
+        parser.handle_endtag(f"h{parser.heading[0]}")
+    return Metadata(
+        " ".join("".join(parser.title or []).split()),
+        tuple(parser.links),
+        tuple(parser.assets),
+        tuple(parser.headings),
+    )
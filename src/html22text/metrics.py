@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+
+import contextlib
+import os
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# Minimum number of seconds between two dumps of the metrics file.
+DUMP_INTERVAL = 5.0
+# Upper bounds in seconds of the latency histogram buckets.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Type and help text of every exported metric.
+METRICS = {
+    "html22text_documents_total": ("counter", "Documents processed, by status."),
+    "html22text_bytes_in_total": ("counter", "Bytes of HTML converted."),
+    "html22text_bytes_out_total": ("counter", "Bytes of text produced."),
+    "html22text_errors_total": ("counter", "Failed documents, by error type."),
+    "html22text_cache_hits_total": ("counter", "Cache hits, by cache."),
+    "html22text_cache_misses_total": ("counter", "Cache misses, by cache."),
+    "html22text_document_seconds": ("histogram", "Conversion time per document."),
+    "html22text_stage_seconds": ("histogram", "Time per conversion stage."),
+}
+
+Labels = tuple[tuple[str, str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Labels) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in labels)
+    return f"{{{pairs}}}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Metrics:
+    """Counters and latency histograms in the Prometheus text format.
+
+    A registry is filled by the main process of a long-running mode from
+    the results its workers send back, so it sees every worker. All
+    methods are thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.counters: dict[tuple[str, Labels], float] = {}
+        self.histograms: dict[tuple[str, Labels], list[float]] = {}
+        # Absolute (hits, misses) per cache and process, as reported last.
+        self.caches: dict[tuple[str, int], tuple[int, int]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        """Adds `value` to a counter."""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels: str) -> None:
+        """Records a duration in a histogram."""
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            # Bucket counts, then sum and count
+            histogram = self.histograms.setdefault(
+                key, [0.0] * (len(LATENCY_BUCKETS) + 2)
+            )
+            for index, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    histogram[index] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+
+    def record_document(
+        self,
+        bytes_in: int,
+        bytes_out: int,
+        timings: Mapping[str, float],
+        cache: tuple[int, int, int] | None = None,
+    ) -> None:
+        """Records a converted document.
+
+        Args:
+            bytes_in (int): Size of the HTML.
+            bytes_out (int): Size of the output.
+            timings (Mapping[str, float]): Seconds per conversion stage.
+            cache (tuple[int, int, int] | None, optional): Process ID and
+                the absolute hit and miss counts of its renderer settings
+                cache. Defaults to None.
+        """
+        self.inc("html22text_documents_total", status="ok")
+        self.inc("html22text_bytes_in_total", bytes_in)
+        self.inc("html22text_bytes_out_total", bytes_out)
+        for stage, seconds in timings.items():
+            self.observe("html22text_stage_seconds", seconds, stage=stage)
+        self.observe("html22text_document_seconds", sum(timings.values()))
+        if cache is not None:
+            pid, hits, misses = cache
+            with self.lock:
+                self.caches["renderer_settings", pid] = (hits, misses)
+
+    def record_failure(self, status: str, error_type: str) -> None:
+        """Records a document that failed with `status` and an error type."""
+        self.inc("html22text_documents_total", status=status)
+        self.inc("html22text_errors_total", type=error_type)
+
+    def render(self) -> str:
+        """Returns all metrics in the Prometheus text exposition format."""
+        with self.lock:
+            counters = dict(self.counters)
+            histograms = {key: list(value) for key, value in self.histograms.items()}
+            for (cache_name, _), (hits, misses) in self.caches.items():
+                for name, count in [
+                    ("html22text_cache_hits_total", hits),
+                    ("html22text_cache_misses_total", misses),
+                ]:
+                    key = (name, (("cache", cache_name),))
+                    counters[key] = counters.get(key, 0) + count
+
+        lines: list[str] = []
+        for name, (kind, help_text) in METRICS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(
+                        f"{name}{_format_labels(labels)} {_format_value(value)}"
+                    )
+            for (metric, labels), histogram in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                for bound, bucket in zip(LATENCY_BUCKETS, histogram, strict=False):
+                    bucket_labels = (*labels, ("le", repr(bound)))
+                    lines.append(
+                        f"{name}_bucket{_format_labels(bucket_labels)} "
+                        f"{_format_value(bucket)}"
+                    )
+                total = _format_value(histogram[-1])
+                lines += [
+                    f"{name}_bucket{_format_labels((*labels, ('le', '+Inf')))} {total}",
+                    f"{name}_sum{_format_labels(labels)} {histogram[-2]!r}",
+                    f"{name}_count{_format_labels(labels)} {total}",
+                ]
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str) -> None:
+        """Writes the metrics to a file, atomically.
+
+        The file can be picked up by the textfile collector of the
+        Prometheus node exporter.
+        """
+        target = Path(path)
+        temp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+        temp_path.write_text(self.render(), encoding="utf-8")
+        temp_path.replace(target)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serves the metrics over HTTP on a background thread.
+
+        Args:
+            port (int): TCP port, 0 for any free port.
+            host (str, optional): Address to bind. Defaults to "127.0.0.1".
+
+        Returns:
+            ThreadingHTTPServer: The running server; call `shutdown()` to
+                stop it.
+        """
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                body = metrics.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+@contextlib.contextmanager
+def exporting(
+    metrics: Metrics, path: str = "", port: int = 0
+) -> Iterator[Callable[[], None]]:
+    """Exports metrics to a file and/or a local HTTP endpoint while it runs.
+
+    Args:
+        metrics (Metrics): Registry to export.
+        path (str, optional): File that receives the metrics, rewritten at
+            most every `DUMP_INTERVAL` seconds and once more on exit.
+            Defaults to "" (no file).
+        port (int, optional): Serve the metrics on `127.0.0.1:port` until
+            exit. Defaults to 0 (no endpoint).
+
+    Yields:
+        Callable[[], None]: Function to call after updating the metrics; it
+            rewrites the file when it is due.
+    """
+    server = metrics.serve(port) if port else None
+    last_dump = 0.0
+
+    def update() -> None:
+        nonlocal last_dump
+        if path and time.monotonic() - last_dump >= DUMP_INTERVAL:
+            metrics.dump(path)
+            last_dump = time.monotonic()
+
+    try:
+        yield update
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+        if path:
+            metrics.dump(path)
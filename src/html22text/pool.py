@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+
+import contextlib
+import multiprocessing
+import time
+from collections.abc import Callable, Iterable, Iterator
+from multiprocessing.connection import Connection, wait
+from typing import TYPE_CHECKING, Any, NamedTuple, cast
+
+if TYPE_CHECKING:
+    from multiprocessing.process import BaseProcess
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore[assignment]
+
+
+# Prefix of the error of a task that ran out of memory. Its worker exits
+# after reporting it, and the pool replaces the worker.
+MEMORY_ERROR = "MemoryError:"
+
+
+class TaskFailed(NamedTuple):
+    """Outcome of a task that did not return a result.
+
+    Attributes:
+        status (str): "error" if the task raised, "timeout" if it exceeded
+            its wall time and its worker was killed, "crashed" if the worker
+            died (e.g. killed by the OS).
+        error (str): Exception type and message, or a description.
+    """
+
+    status: str
+    error: str
+
+
+def _worker_main(
+    conn: Connection,
+    func: Callable[[Any], Any],
+    memory_limit: int,
+    initializer: Callable[..., None] | None,
+    initargs: tuple[Any, ...],
+) -> None:
+    """Runs tasks received over `conn` until it receives None.
+
+    After a `MemoryError`, the worker reports it and exits, since its heap
+    may be left fragmented or in an inconsistent state.
+    """
+    if memory_limit and resource is not None:
+        limit = memory_limit * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if initializer is not None:
+        initializer(*initargs)
+    while True:
+        task = conn.recv()
+        if task is None:
+            return
+        exhausted = False
+        try:
+            outcome = func(task)
+        except MemoryError as exc:
+            outcome = TaskFailed("error", f"{MEMORY_ERROR} {exc}")
+            exhausted = True
+            del exc
+        except Exception as exc:  # noqa: BLE001
+            outcome = TaskFailed("error", f"{type(exc).__name__}: {exc}")
+            del exc
+        try:
+            conn.send(outcome)
+        except Exception as exc:  # noqa: BLE001
+            # E.g. a result that cannot be pickled.
+            conn.send(TaskFailed("error", f"{type(exc).__name__}: {exc}"))
+        if exhausted:
+            return
+
+
+class _Worker:
+    """A worker process, its connection and its current task."""
+
+    def __init__(self, pool: "ProcessPool") -> None:
+        context = multiprocessing.get_context()
+        self.conn, child_conn = context.Pipe()
+        self.process: BaseProcess = context.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                pool.func,
+                pool.memory_limit,
+                pool.initializer,
+                pool.initargs,
+            ),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.task: Any = None
+        self.started = 0.0
+        self.done = 0
+
+    def submit(self, task: Any) -> None:
+        self.task = task
+        self.started = time.monotonic()
+        self.conn.send(task)
+
+    def stop(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        else:
+            with contextlib.suppress(OSError):
+                self.conn.send(None)
+        self.process.join()
+        self.conn.close()
+
+
+class ProcessPool:
+    """Process pool that bounds the time and memory spent on each task.
+
+    Unlike `multiprocessing.Pool`, a task that runs longer than `timeout`
+    gets its worker killed and replaced, and the pool carries on. Workers
+    can be limited to an address-space budget, and are replaced after
+    `max_tasks` tasks so that memory fragmentation cannot accumulate.
+    Tasks are pulled from the input one at a time, as workers become idle.
+
+    Args:
+        func (Callable[[Any], Any]): Picklable function applied to each task.
+        jobs (int): Number of worker processes.
+        timeout (float, optional): Wall-time limit per task in seconds,
+            0 for none. Defaults to 0.
+        memory_limit (int, optional): Address-space limit per worker in MiB,
+            0 for none. Exceeding it makes the task fail with a
+            `MemoryError`, and its worker is replaced. Only enforced where
+            the `resource` module exists. Defaults to 0.
+        max_tasks (int, optional): Number of tasks after which a worker is
+            replaced, 0 for never. Defaults to 0.
+        initializer (Callable[..., None] | None, optional): Called with
+            `initargs` in every worker when it starts, e.g. to receive state
+            shared by all tasks once. Defaults to None.
+        initargs (tuple[Any, ...], optional): Picklable arguments of
+            `initializer`. Defaults to ().
+    """
+
+    def __init__(  # noqa: PLR0913
+        self,
+        func: Callable[[Any], Any],
+        jobs: int,
+        timeout: float = 0,
+        memory_limit: int = 0,
+        max_tasks: int = 0,
+        *,
+        initializer: Callable[..., None] | None = None,
+        initargs: tuple[Any, ...] = (),
+    ) -> None:
+        self.func = func
+        self.jobs = jobs
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.max_tasks = max_tasks
+        self.initializer = initializer
+        self.initargs = initargs
+
+    def _spawn(self) -> _Worker:
+        return _Worker(self)
+
+    def _expire(
+        self, busy: dict[Connection, _Worker], idle: list[_Worker]
+    ) -> Iterator[tuple[Any, TaskFailed]]:
+        """Kills and replaces the workers whose task is overdue."""
+        if not self.timeout:
+            return
+        now = time.monotonic()
+        for conn, worker in list(busy.items()):
+            if now - worker.started >= self.timeout:
+                del busy[conn]
+                worker.stop(kill=True)
+                yield worker.task, TaskFailed("timeout", f"Exceeded {self.timeout:g} s")
+                idle.append(self._spawn())
+
+    def imap_unordered(self, tasks: Iterable[Any]) -> Iterator[tuple[Any, Any]]:
+        """Applies the function to every task.
+
+        Args:
+            tasks (Iterable[Any]): Picklable tasks.
+
+        Yields:
+            tuple[Any, Any]: Each task with its result or `TaskFailed`, in
+                completion order.
+        """
+        pending = iter(tasks)
+        idle = [self._spawn() for _ in range(self.jobs)]
+        busy: dict[Connection, _Worker] = {}
+        try:
+            while True:
+                while idle:
+                    task = next(pending, None)
+                    if task is None:
+                        break
+                    worker = idle.pop()
+                    worker.submit(task)
+                    busy[worker.conn] = worker
+                if not busy:
+                    return
+
+                wait_time = None
+                if self.timeout:
+                    oldest = min(worker.started for worker in busy.values())
+                    wait_time = max(0.0, oldest + self.timeout - time.monotonic())
+                ready = wait(list(busy), wait_time)
+
+                for conn in ready:
+                    worker = busy.pop(cast("Connection", conn))
+                    try:
+                        outcome = worker.conn.recv()
+                    except (EOFError, OSError):
+                        code = worker.process.exitcode
+                        worker.stop(kill=True)
+                        yield (
+                            worker.task,
+                            TaskFailed("crashed", f"Worker exited with code {code}"),
+                        )
+                        idle.append(self._spawn())
+                        continue
+                    worker.done += 1
+                    task, worker.task = worker.task, None
+                    if (
+                        isinstance(outcome, TaskFailed)
+                        and outcome.error.startswith(MEMORY_ERROR)
+                    ) or (self.max_tasks and worker.done >= self.max_tasks):
+                        worker.stop()
+                        worker = self._spawn()
+                    idle.append(worker)
+                    yield task, outcome
+
+                yield from self._expire(busy, idle)
+        finally:
+            for worker in [*idle, *busy.values()]:
+                worker.stop(kill=worker.task is not None)
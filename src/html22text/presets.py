@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+
+import dataclasses
+import sys
+from pathlib import Path
+from typing import Any
+
+from .html22text import Options
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:  # pragma: no cover
+    import tomli as tomllib
+
+# Presets available without a presets file.
+PRESETS: dict[str, Options] = {
+    "text": Options(),
+    "markdown": Options(markdown=True),
+}
+
+
+def load_presets(path: str) -> dict[str, Options]:
+    """Loads named option presets from a TOML file.
+
+    Every top-level table is a preset, named after the table, whose keys
+    are options of `html22text()`:
+
+        [docs]
+        markdown = true
+        kill_tags = "nav,footer"
+
+    Args:
+        path (str): Path of the TOML file.
+
+    Returns:
+        dict[str, Options]: Presets by name.
+
+    Raises:
+        ValueError: If a preset is not a table or has an unknown option.
+    """
+    with Path(path).open("rb") as presets_file:
+        tables = tomllib.load(presets_file)
+    presets: dict[str, Options] = {}
+    for name, table in tables.items():
+        if not isinstance(table, dict):
+            error_message = f"Preset {name!r} in {path} must be a table"
+            raise ValueError(error_message)  # noqa: TRY004
+        try:
+            presets[name] = Options(**table)
+        except TypeError as exc:
+            error_message = f"Invalid preset {name!r} in {path}: {exc}"
+            raise ValueError(error_message) from exc
+    return presets
+
+
+def resolve_options(preset: str = "", preset_file: str = "", **options: Any) -> Options:
+    """Builds conversion options from a named preset and overrides.
+
+    Args:
+        preset (str, optional): Name of a preset in `PRESETS` or in
+            `preset_file`. Defaults to "" (the default options).
+        preset_file (str, optional): TOML file with more presets, see
+            `load_presets`. Defaults to "".
+        **options: Options of `html22text()` that override the preset.
+
+    Returns:
+        Options: The resolved options.
+
+    Raises:
+        ValueError: If the preset is unknown.
+    """
+    presets = dict(PRESETS)
+    if preset_file:
+        presets.update(load_presets(preset_file))
+    if preset and preset not in presets:
+        error_message = (
+            f"Unknown preset {preset!r}, expected one of: {', '.join(presets)}"
+        )
+        raise ValueError(error_message)
+    base = presets[preset] if preset else Options()
+    return dataclasses.replace(base, **options)
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Any
+
+from bs4 import BeautifulSoup
+
+from .chunking import _iter_blocks
+from .html22text import FEED_SIZE, _bind, _iter_render, _renderer, _rewrite, _select
+
+# Size of the first HTML prefix that is converted, at least, and how many
+# chars of HTML it spans per requested char of output.
+PREFIX_SIZE = 16 * 1024
+PREFIX_RATIO = 8
+# Factor by which the prefix grows when it did not yield enough output.
+PREFIX_GROWTH = 4
+
+
+def _prefixes(
+    html_content: str, is_input_path: bool, size: int
+) -> Iterator[tuple[str, bool]]:
+    """Yields growing prefixes of the input, each cut before a `<`.
+
+    Files are read only as far as the prefixes reach. Each prefix comes with
+    whether it is the whole input.
+    """
+    if not is_input_path:
+        while (cut := html_content.find("<", size)) != -1:
+            yield html_content[:cut], False
+            size *= PREFIX_GROWTH
+        yield html_content, True
+        return
+
+    with Path(html_content).open(encoding="utf-8") as html_file:
+        text = ""
+        while True:
+            while (cut := text.find("<", size)) == -1:
+                data = html_file.read(max(size, FEED_SIZE))
+                if not data:
+                    yield text, True
+                    return
+                text += data
+            yield text[:cut], False
+            size *= PREFIX_GROWTH
+
+
+def _take_blocks(
+    blocks: Iterable[str], max_chars: int, max_blocks: int, complete: bool
+) -> list[str] | None:
+    """Collects output blocks until the limits are reached.
+
+    A block only counts once the next one has started, since the last block
+    of a prefix may be cut short.
+
+    Returns:
+        list[str] | None: The blocks, or None if the input prefix was too
+            short to tell.
+    """
+    taken: list[str] = []
+    size = 0
+    for block in blocks:
+        if (max_blocks and len(taken) >= max_blocks) or (
+            max_chars and size >= max_chars
+        ):
+            return taken
+        taken.append(block)
+        size += len(block) + 2
+    return taken if complete else None
+
+
+def preview(
+    html_content: str,
+    max_chars: int = 500,
+    max_blocks: int = 0,
+    **options: Any,
+) -> str:
+    """Convert only the beginning of an HTML document, e.g. for a search snippet.
+
+    Instead of the whole document, a prefix of the HTML is parsed and
+    rendered, and rendering stops as soon as the limits are reached. If the
+    prefix does not yield enough complete blocks of output, a prefix four
+    times as long is tried, so the cost depends on how much HTML precedes
+    the preview rather than on the size of the document. Files are only
+    read as far as needed.
+
+    Args:
+        html_content (str): Input HTML text or file path.
+        max_chars (int, optional): Maximum length of the preview, which is
+            cut at whitespace where possible. 0 for no limit.
+            Defaults to 500.
+        max_blocks (int, optional): Maximum number of blocks (paragraphs,
+            headings, lists, ...) of the preview. 0 for no limit.
+            Defaults to 0.
+        **options: Conversion options of `html22text()`, e.g. `markdown=True`.
+
+    Returns:
+        str: Beginning of the converted text, with blocks separated by blank
+            lines and without trailing whitespace.
+
+    Raises:
+        ValueError: If neither limit is positive.
+    """
+    if max_chars <= 0 and max_blocks <= 0:
+        error_message = "max_chars or max_blocks must be positive"
+        raise ValueError(error_message)
+    max_chars = max(max_chars, 0)
+    max_blocks = max(max_blocks, 0)
+
+    conversion, arguments = _bind(html_content, **options)
+    size = max(PREFIX_SIZE, PREFIX_RATIO * max_chars)
+    blocks: list[str] | None = None
+    prefixes = _prefixes(html_content, arguments["is_input_path"], size)
+    for prefix, whole in prefixes:
+        complete = whole
+        soup = BeautifulSoup(prefix, "html.parser")
+        selected_tag = _select(soup, conversion.selector)
+        if selected_tag is not None:
+            # Content that follows the element means that it was closed
+            complete = whole or any(
+                node.next_sibling is not None
+                for node in [selected_tag, *selected_tag.parents]
+            )
+            soup = BeautifulSoup(selected_tag.encode("utf-8"), "html.parser")
+        elif not complete and conversion.selector != "html":
+            continue  # The selected element may start further on
+        soup = _rewrite(soup, conversion)
+        lines = _iter_render(_renderer(conversion), str(soup))
+        blocks = _take_blocks(_iter_blocks(lines), max_chars, max_blocks, complete)
+        if blocks is not None:
+            break
+
+    text = "\n\n".join(blocks or [])
+    if max_chars and len(text) > max_chars:
+        cut = max(text.rfind("\n", 0, max_chars + 1), text.rfind(" ", 0, max_chars + 1))
+        text = text[: cut if cut > 0 else max_chars]
+    return text.rstrip()
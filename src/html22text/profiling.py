@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+
+import cProfile
+import io
+import pstats
+import time
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+from .boilerplate import BoilerplateCache
+from .html22text import (
+    Options,
+    _bind,
+    _parse,
+    _pooled_renderer,
+    _render,
+    _rewrite,
+    _serialize,
+    _verbatim_of,
+)
+
+STAGES = ("parse", "rewrite", "serialize", "render")
+
+
+def _run_stages(
+    html_content: str,
+    options: Options,
+    links: list[str] | None,
+    on_stage: Callable[[str], None],
+    boilerplate: BoilerplateCache | None = None,
+) -> str:
+    """Runs the `html22text()` pipeline stage by stage.
+
+    The document is serialized and rendered as by `Options.convert()`, with
+    a pooled renderer and verbatim `<pre>` blocks. `on_stage` is called
+    after each stage with its name. With a
+    `boilerplate` cache, the document is serialized and rendered block by
+    block, which counts as the render stage.
+    """
+    soup = _parse(html_content, options.selector)
+    on_stage("parse")
+    soup = _rewrite(soup, options, links)
+    on_stage("rewrite")
+    if boilerplate is not None:
+        text = boilerplate.render(soup, options)
+        on_stage("render")
+        return text
+    with _pooled_renderer(options) as h:
+        html = _serialize(soup, options, html_content, _verbatim_of(h))
+        on_stage("serialize")
+        text = _render(h, html)
+        on_stage("render")
+    return text
+
+
+def profile_conversion(
+    html_content: str,
+    top: int = 25,
+    pstats_path: str = "",
+    **options: Any,
+) -> str:
+    """Profile one `html22text()` conversion and report where time and memory go.
+
+    The conversion runs twice: once under `cProfile` for timings, and once
+    under `tracemalloc` for the peak memory of each stage (parse, rewrite,
+    serialize, render), so that neither tool skews the other's numbers.
+
+    Args:
+        html_content (str): Input HTML text or file path.
+        top (int, optional): Number of functions to list, by cumulative time.
+            Defaults to 25.
+        pstats_path (str, optional): If given, the raw profile is also dumped
+            to this file, e.g. for `snakeviz`. Defaults to "".
+        **options: Conversion options passed on to `html22text()`.
+
+    Returns:
+        str: The report.
+    """
+    conversion, arguments = _bind(html_content, **options)
+    links = arguments["links"]
+    if arguments["is_input_path"]:
+        html_content = Path(html_content).read_text(encoding="utf-8")
+
+    timings: dict[str, float] = {}
+    last = time.perf_counter()
+
+    def record_time(stage: str) -> None:
+        nonlocal last
+        now = time.perf_counter()
+        timings[stage] = now - last
+        last = now
+
+    profiler = cProfile.Profile()
+    last = time.perf_counter()
+    profiler.runcall(_run_stages, html_content, conversion, links, record_time)
+
+    peaks: dict[str, int] = {}
+
+    def record_peak(stage: str) -> None:
+        peaks[stage] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.reset_peak()
+
+    tracemalloc.start()
+    try:
+        _run_stages(html_content, conversion, links, record_peak)
+    finally:
+        tracemalloc.stop()
+
+    report = io.StringIO()
+    report.write(f"{'stage':<10} {'time (ms)':>10} {'peak memory (KiB)':>18}\n")
+    for stage in STAGES:
+        report.write(
+            f"{stage:<10} {timings[stage] * 1000:>10.2f} {peaks[stage] / 1024:>18.1f}\n"
+        )
+    report.write(
+        f"{'total':<10} {sum(timings.values()) * 1000:>10.2f} "
+        f"{max(peaks.values()) / 1024:>18.1f}\n\n"
+    )
+    stats = pstats.Stats(profiler, stream=report)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+    if pstats_path:
+        stats.dump_stats(pstats_path)
+        report.write(f"Profile written to {pstats_path}\n")
+    return report.getvalue()
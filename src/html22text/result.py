@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+
+import time
+from pathlib import Path
+from typing import Any
+
+from .html22text import (
+    Options,
+    _bind,
+    _parse,
+    _pooled_renderer,
+    _render,
+    _rewrite,
+    _serialize,
+    _verbatim_of,
+)
+from .metadata import Metadata, extract_metadata
+
+
+class ConversionResult:
+    """Text of a conversion, with what the conversion found on the way.
+
+    The links and assets are collected while the conversion rewrites them,
+    and the timings are taken around its stages, so they cost no extra
+    pass over the document. The other fields are computed when they are
+    first read: `words` from the text, and `metadata`, `title` and
+    `headings` with one pass of the tokenizer over the input, which is
+    released afterwards.
+
+    With a `selector`, the text, links and assets come from the selected
+    part of the document, but `metadata`, `title` and `headings` describe
+    the whole input, so that the `<title>` in `<head>` is still found.
+
+    Attributes:
+        text (str): Markdown or plain-text, as from `html22text()`.
+        links (tuple[str, ...]): Original hrefs of the relative document
+            links that were rewritten, see `prep_doc`.
+        assets (tuple[str, ...]): Absolute URLs of `<link href>` and `src`
+            attributes, see `replace_asset_hrefs`.
+        timings (dict[str, float]): Seconds spent in each stage: parse,
+            rewrite, serialize and render.
+        options (Options): Conversion options.
+    """
+
+    __slots__ = (
+        "_metadata",
+        "_source",
+        "_words",
+        "assets",
+        "links",
+        "options",
+        "text",
+        "timings",
+    )
+
+    def __init__(  # noqa: PLR0913
+        self,
+        *,
+        text: str,
+        links: tuple[str, ...],
+        assets: tuple[str, ...],
+        timings: dict[str, float],
+        options: Options,
+        source: str,
+    ) -> None:
+        self.text = text
+        self.links = links
+        self.assets = assets
+        self.timings = timings
+        self.options = options
+        self._source = source
+        self._words: int | None = None
+        self._metadata: Metadata | None = None
+
+    def __str__(self) -> str:
+        return self.text
+
+    @property
+    def words(self) -> int:
+        """Number of whitespace-separated words in the text."""
+        if self._words is None:
+            self._words = len(self.text.split())
+        return self._words
+
+    @property
+    def metadata(self) -> Metadata:
+        """Title, links, assets and headings of the whole input, see `Metadata`."""
+        if self._metadata is None:
+            self._metadata = extract_metadata(
+                self._source, self.options.base_url, self.options.file_ext
+            )
+            self._source = ""
+        return self._metadata
+
+    @property
+    def title(self) -> str:
+        """Text of the first `<title>` of the whole input, whitespace collapsed."""
+        return self.metadata.title
+
+    @property
+    def headings(self) -> tuple[tuple[int, str], ...]:
+        """Level and text of every heading of the whole input."""
+        return self.metadata.headings
+
+
+def convert_result(html_content: str, **options: Any) -> ConversionResult:
+    """Convert HTML text or file, and return the text with its links and timings.
+
+    The text is the same as from `html22text()` with the same options. The
+    links and the assets are always collected, also in plain text, where
+    `html22text()` leaves them alone unless `links` is given.
+
+    Args:
+        html_content (str): Input HTML text or file path.
+        **options: Options of `html22text()`, e.g. `markdown=True`. A given
+            `links` list receives the links as well.
+
+    Returns:
+        ConversionResult: Text, links, assets and timings of the conversion.
+
+    Raises:
+        ValueError: If a tag rule is invalid.
+    """
+    conversion, arguments = _bind(html_content, **options)
+    if arguments["is_input_path"]:
+        html_content = Path(html_content).read_text(encoding="utf-8")
+    links = arguments["links"]
+    if links is None:
+        links = []
+    first_link = len(links)
+    assets: list[str] = []
+    timings: dict[str, float] = {}
+    last = time.perf_counter()
+
+    def record_time(stage: str) -> None:
+        nonlocal last
+        now = time.perf_counter()
+        timings[stage] = now - last
+        last = now
+
+    with _pooled_renderer(conversion) as h:
+        soup = _parse(html_content, conversion.selector)
+        record_time("parse")
+        soup = _rewrite(soup, conversion, links, assets)
+        record_time("rewrite")
+        html = _serialize(soup, conversion, html_content, _verbatim_of(h))
+        record_time("serialize")
+        text = _render(h, html)
+        record_time("render")
+    return ConversionResult(
+        text=text,
+        links=tuple(links[first_link:]),
+        assets=tuple(assets),
+        timings=timings,
+        options=conversion,
+        source=html_content,
+    )
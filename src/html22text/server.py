@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+import contextlib
+import gc
+import json
+import os
+import select
+import socket
+import sys
+import time
+import traceback
+from pathlib import Path
+from typing import Any
+
+from html22text_client import (
+    CONTROL,
+    IDLE_TIMEOUT,
+    RUN,
+    START_TIMEOUT,
+    STDIO,
+    connect,
+    control,
+    receive_all,
+    socket_path,
+    spawn,
+)
+
+from .html22text import html22text
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None  # type: ignore[assignment]
+
+# Seconds between checks for finished requests and for the idle timeout.
+POLL_INTERVAL = 0.5
+# Seconds a client has to send its request.
+REQUEST_TIMEOUT = 10.0
+# Converted once at startup, so that every request starts from warm caches.
+WARM_UP_HTML = (
+    "<title>T</title><h1>H</h1><p><a href='a.html'>a</a> <b>b</b> <q>q</q></p>"
+    "<ul><li><img src='i.png' alt='i'></li></ul><pre>p</pre>"
+    "<table><tr><th>t</th></tr><tr><td>d</td></tr></table><blockquote>b</blockquote>"
+)
+
+
+def _use_encodings(encodings: list[list[str] | None]) -> None:
+    """Reopens stdin, stdout and stderr with the client's encodings.
+
+    Args:
+        encodings (list[list[str] | None]): Encoding and error handler of
+            the client's stdin, stdout and stderr, or None for a stream it
+            does not have.
+    """
+    for fd, (name, encoding) in enumerate(
+        zip(("stdin", "stdout", "stderr"), encodings, strict=True)
+    ):
+        stream = getattr(sys, name)
+        if encoding is None or (
+            stream is not None and [stream.encoding, stream.errors] == encoding
+        ):
+            continue
+        reopened = open(  # noqa: SIM115
+            fd,
+            "r" if fd == 0 else "w",
+            encoding=encoding[0],
+            errors=encoding[1],
+            closefd=False,
+            # Line-buffered, as Python opens stderr and terminals
+            buffering=1 if name == "stderr" or os.isatty(fd) else -1,
+        )
+        setattr(sys, name, reopened)
+
+
+def _run_request(conn: socket.socket, fds: list[int]) -> int:
+    """Runs a CLI request in a forked process and sends back its exit status.
+
+    The client's stdin, stdout and stderr become those of this process, so
+    the command reads and writes them directly, with the client's encodings.
+    The command also runs with the client's environment variables and time
+    zone.
+    """
+    request = json.loads(receive_all(conn))
+    sys.stdout.flush()
+    sys.stderr.flush()
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    # Imported here, as __main__ imports this module for its commands
+    from .__main__ import cli  # noqa: PLC0415
+
+    code = 1
+    try:
+        os.chdir(request["cwd"])
+        os.environ.clear()
+        os.environ.update(request["env"])
+        time.tzset()
+        _use_encodings(request["encodings"])
+        sys.argv = ["html22text", *request["argv"]]
+        cli()
+        code = 0
+    except SystemExit as exc:
+        if exc.code is None or isinstance(exc.code, int):
+            code = exc.code or 0
+        else:
+            print(exc.code, file=sys.stderr)
+    except BaseException:  # noqa: BLE001
+        traceback.print_exc()
+    finally:
+        with contextlib.suppress(OSError):
+            sys.stdout.flush()
+        with contextlib.suppress(OSError):
+            sys.stderr.flush()
+    conn.sendall(str(code).encode())
+    return code
+
+
+class Server:
+    """Runs `html22text` commands for thin clients, from a warm process.
+
+    The server imports and warms up the library once, then forks a process
+    for every request, which starts with the parsers, renderers and caches
+    already in memory. Requests run in parallel, each in its own process
+    with the working directory, stdin, stdout and stderr of its client.
+    The server exits after `idle_timeout` seconds without requests.
+
+    Attributes:
+        path (str): Socket path.
+        idle_timeout (float): Seconds without requests before exiting.
+        started (float): Start time, as `time.time()`.
+        requests (int): Number of requests run.
+        failures (int): Number of requests with a nonzero exit status.
+        active (set[int]): Process IDs of the requests running.
+    """
+
+    def __init__(self, path: str, idle_timeout: float = IDLE_TIMEOUT) -> None:
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.requests = 0
+        self.failures = 0
+        self.active: set[int] = set()
+        self.stopping = False
+
+    def status(self) -> dict[str, Any]:
+        """Returns the counters of the server."""
+        return {
+            "pid": os.getpid(),
+            "path": self.path,
+            "uptime": round(time.time() - self.started, 3),
+            "idle_timeout": self.idle_timeout,
+            "requests": self.requests,
+            "failures": self.failures,
+            "active": len(self.active),
+        }
+
+    def serve(self) -> None:
+        """Serves requests until stopped or idle.
+
+        Returns at once if another server already serves on `path`.
+        """
+        lock_path = Path(f"{self.path}.lock")
+        with lock_path.open("w") as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return
+            html22text(WARM_UP_HTML)
+            html22text(WARM_UP_HTML, markdown=True)
+            # Keeps the warm objects out of collections, so that the memory
+            # pages of forked processes stay shared with the server.
+            gc.freeze()
+            Path(self.path).unlink(missing_ok=True)
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as listener:
+                listener.bind(self.path)
+                listener.listen(128)
+                try:
+                    self._loop(listener)
+                finally:
+                    Path(self.path).unlink(missing_ok=True)
+                    # Serves the clients that connected before the unlink
+                    listener.setblocking(False)
+                    with contextlib.suppress(BlockingIOError):
+                        while True:
+                            self._handle(listener, listener.accept()[0])
+                    while self.active:
+                        self._reap(block=True)
+
+    def _loop(self, listener: socket.socket) -> None:
+        last_active = time.monotonic()
+        while not self.stopping:
+            readable, _, _ = select.select([listener], [], [], POLL_INTERVAL)
+            if self._reap() or readable:
+                last_active = time.monotonic()
+            if readable:
+                self._handle(listener, listener.accept()[0])
+            elif not self.active and time.monotonic() - last_active > self.idle_timeout:
+                return
+
+    def _handle(self, listener: socket.socket, conn: socket.socket) -> None:
+        """Answers a control command, or forks a process for a request."""
+        conn.setblocking(True)
+        conn.settimeout(REQUEST_TIMEOUT)
+        with conn:
+            fds: list[int] = []
+            try:
+                message, fds, _, _ = socket.recv_fds(conn, 1, 3)
+                if message == CONTROL:
+                    command = json.loads(receive_all(conn)).get("command")
+                    self.stopping = self.stopping or command == "stop"
+                    conn.sendall(json.dumps(self.status()).encode())
+                elif message == RUN and len(fds) == len(STDIO):
+                    self._fork(listener, conn, fds)
+            except (OSError, ValueError):
+                pass  # A client that went away or sent garbage
+            finally:
+                for fd in fds:
+                    os.close(fd)
+
+    def _fork(
+        self, listener: socket.socket, conn: socket.socket, fds: list[int]
+    ) -> None:
+        pid = os.fork()
+        if pid == 0:
+            code = 1
+            try:
+                listener.close()
+                conn.settimeout(None)
+                code = _run_request(conn, fds)
+            finally:
+                os._exit(code)
+        self.active.add(pid)
+        self.requests += 1
+
+    def _reap(self, block: bool = False) -> int:
+        """Collects finished requests and returns how many finished."""
+        finished = 0
+        for pid in list(self.active):
+            done, status = os.waitpid(pid, 0 if block else os.WNOHANG)
+            if done:
+                finished += 1
+                self.active.discard(pid)
+                self.failures += os.waitstatus_to_exitcode(status) != 0
+        return finished
+
+
+def server(
+    action: str = "status",
+    path: str = "",
+    idle_timeout: float = IDLE_TIMEOUT,
+) -> str:
+    """Run, start, stop or query the conversion server of the current user.
+
+    With `--server` or `HTML22TEXT_SERVER=1`, the `html22text` command runs
+    in this server, which it starts when none is running, instead of
+    importing and warming up the library in every process.
+
+    Args:
+        action (str, optional): "run" serves in the foreground, "start"
+            starts a server in the background, "stop" stops it, and
+            "status" shows its counters. Defaults to "status".
+        path (str, optional): Socket path. Defaults to the per-user path
+            (see `html22text_client.socket_path()`).
+        idle_timeout (float, optional): Seconds without requests after which
+            a server started by "run" or "start" exits. Defaults to
+            `IDLE_TIMEOUT`.
+
+    Returns:
+        str: Status of the server as JSON, or a message.
+
+    Raises:
+        ValueError: If the action is unknown.
+        RuntimeError: If there is no private directory for the socket.
+    """
+    if action not in {"run", "start", "stop", "status"}:
+        error_message = f"Unknown server action: {action!r}"
+        raise ValueError(error_message)
+    path = path or socket_path()
+    if not path:
+        error_message = "No private directory for the server socket"
+        raise RuntimeError(error_message)
+    if action == "run":
+        Server(path, idle_timeout).serve()
+        return "stopped"
+    if action == "start" and control("status", path) is None:
+        spawn(path, idle_timeout)
+        client = connect(path, START_TIMEOUT)
+        if client is not None:
+            client.close()
+    reply = control(action if action == "stop" else "status", path)
+    return "not running" if reply is None else json.dumps(reply)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from bs4 import BeautifulSoup
+from bs4.builder import HTMLParserTreeBuilder  # type: ignore[attr-defined]
+
+from .html22text import _bind, _parse, _pooled_renderer, _render, _rewrite
+
+
+def convert_snippets(snippets: Iterable[str], **options: Any) -> list[str]:
+    """Convert many short HTML fragments, such as CMS fields or chat messages.
+
+    The result is the same as calling `html22text()` on every snippet, but
+    the costs that do not depend on the snippet are paid once per batch:
+    the options are bound and validated once, one parser tree builder is
+    reused for all snippets, and renderers come from the per-thread pool.
+    With the default `selector`, the selector is only applied to snippets
+    that contain an `<html>` tag, as it matches nothing in the others.
+    `benchmarks/snippets.py` measures the throughput on your machine.
+
+    Args:
+        snippets (Iterable[str]): Input HTML texts, or file paths if
+            `is_input_path` is given.
+        **options: Options of `html22text()`, e.g. `markdown=True`. A
+            `links` list collects the links of all snippets.
+
+    Returns:
+        list[str]: Markdown or plain-text of every snippet, in order.
+
+    Raises:
+        ValueError: If a tag rule is invalid.
+    """
+    conversion, arguments = _bind("", **options)
+    is_input_path = arguments["is_input_path"]
+    links = arguments["links"]
+    builder = HTMLParserTreeBuilder()
+    rewrite = bool(
+        conversion.markdown
+        or conversion.kill_tags
+        or conversion.max_depth > 0
+        or links is not None
+    )
+
+    texts = []
+    for snippet in snippets:
+        html_content = snippet
+        if is_input_path:
+            html_content = Path(snippet).read_text(encoding="utf-8")
+        if conversion.selector == "html" and "<html" not in html_content.lower():
+            soup = BeautifulSoup(html_content, builder=builder)
+        else:
+            soup = _parse(html_content, conversion.selector)
+        if rewrite:
+            soup = _rewrite(soup, conversion, links)
+        with _pooled_renderer(conversion) as h:
+            texts.append(_render(h, str(soup)))
+    return texts
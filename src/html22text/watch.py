@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+import contextlib
+import hashlib
+import json
+import os
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from .batch import _convert_document, output_name
+from .html22text import is_doc
+from .metrics import Metrics, exporting
+from .presets import resolve_options
+
+INDEX_NAME = ".html22text-watch.json"
+
+
+def _scan(root: Path, prefix: str = "") -> Iterator[tuple[str, os.stat_result]]:
+    """Yields the member path and stat of every HTML document below `root`."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            member_name = f"{prefix}{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                yield from _scan(Path(entry.path), f"{member_name}/")
+            elif entry.is_file() and is_doc(member_name):
+                yield member_name, entry.stat()
+
+
+class Watcher:
+    """Keeps the converted copy of a directory tree in sync with its source.
+
+    Changes are detected with an index of modification times, sizes and
+    content hashes: a document is read only when its mtime or size changed,
+    and converted only when its content hash changed as well. The index is
+    stored in the output directory, so a restarted watcher does not
+    reconvert unchanged documents. The index records the conversion
+    options, and a watcher started with other options reconverts every
+    document, after removing the outputs written with another extension.
+    A document whose output is missing is converted again as well, unless
+    it failed to convert: that is retried only when its content changes.
+    `preset`, `preset_file` and the other
+    options are resolved as in `batch_convert`. Conversions and failures
+    are recorded in `metrics`.
+    """
+
+    def __init__(
+        self,
+        src: str,
+        out: str,
+        preset: str = "",
+        preset_file: str = "",
+        **options: Any,
+    ) -> None:
+        options.pop("is_input_path", None)
+        self.src = Path(src)
+        self.out = Path(out)
+        self.options = resolve_options(preset, preset_file, **options)
+        self.file_ext = self.options.file_ext
+        self.index_path = self.out / INDEX_NAME
+        self.metrics = Metrics()
+        # Fingerprint of the options that the indexed outputs were made with
+        self.fingerprint = repr(self.options)
+        self.index: dict[str, tuple[int, int, str]] = {}
+        # Content hash of each document that failed to convert
+        self.failed: dict[str, str] = {}
+        stored: dict[str, Any] = {}
+        if self.index_path.is_file():
+            stored = json.loads(self.index_path.read_text(encoding="utf-8"))
+        documents = stored.get("documents", {})
+        if stored.get("options") == self.fingerprint:
+            self.index = {name: tuple(entry) for name, entry in documents.items()}
+        elif stored.get("file_ext", self.file_ext) != self.file_ext:
+            for member_name in documents:
+                output_path = self.out / output_name(member_name, stored["file_ext"])
+                output_path.unlink(missing_ok=True)
+
+    def sync(self) -> list[str]:
+        """Converts new and changed documents, removes outputs of deleted ones.
+
+        Returns:
+            list[str]: Member paths of the documents that were (re)converted
+                or removed.
+        """
+        changed: list[str] = []
+        current: set[str] = set()
+        for member_name, stat in _scan(self.src):
+            current.add(member_name)
+            entry = self.index.get(member_name)
+            output_path = self.out / output_name(member_name, self.file_ext)
+            if member_name not in self.failed and not output_path.is_file():
+                entry = None
+            if entry and entry[:2] == (stat.st_mtime_ns, stat.st_size):
+                continue
+            data = (self.src / member_name).read_bytes()
+            digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+            self.index[member_name] = (stat.st_mtime_ns, stat.st_size, digest)
+            if entry and entry[2] == digest:
+                continue
+            try:
+                result = _convert_document(member_name, data, self.options)
+            except Exception as exc:  # noqa: BLE001
+                print(f"{member_name}: error: {exc}", file=sys.stderr)
+                self.metrics.record_failure("error", type(exc).__name__)
+                self.failed[member_name] = digest
+                continue
+            self.failed.pop(member_name, None)
+            self.metrics.record_document(
+                result.bytes_in, len(result.data), result.timings, result.cache
+            )
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_bytes(result.data)
+            changed.append(member_name)
+
+        for member_name in sorted(self.index.keys() - current):
+            del self.index[member_name]
+            self.failed.pop(member_name, None)
+            (self.out / output_name(member_name, self.file_ext)).unlink(missing_ok=True)
+            changed.append(member_name)
+
+        if changed or not self.index_path.exists():
+            self.out.mkdir(parents=True, exist_ok=True)
+            stored = {
+                "options": self.fingerprint,
+                "file_ext": self.file_ext,
+                "documents": self.index,
+            }
+            self.index_path.write_text(json.dumps(stored), encoding="utf-8")
+        return changed
+
+
+def watch(  # noqa: PLR0913
+    src: str,
+    out: str,
+    *,
+    interval: float = 0.1,
+    once: bool = False,
+    metrics: str = "",
+    metrics_port: int = 0,
+    **options: Any,
+) -> None:
+    """Convert a directory tree and keep reconverting documents as they change.
+
+    The watcher runs in one long-lived process, so the cost of starting
+    Python and importing the converter is paid once, and each change costs
+    one stat poll plus the conversion of the changed document. Polling is
+    used because it works the same on every platform and filesystem; with
+    the default interval a saved page is picked up within 100 ms. A page
+    that fails to convert is reported on stderr and retried when it changes.
+
+    Args:
+        src (str): Source directory.
+        out (str): Output directory.
+        interval (float, optional): Seconds between polls. Defaults to 0.1.
+        once (bool, optional): Sync once and exit instead of watching.
+            Defaults to False.
+        metrics (str, optional): File that receives the Prometheus metrics
+            of the watcher (see `batch_convert`). Defaults to "".
+        metrics_port (int, optional): Serve the metrics on this local port.
+            Defaults to 0.
+        **options: `preset`, `preset_file` and conversion options of
+            `html22text()`, as for `batch_convert`.
+    """
+    watcher = Watcher(src, out, **options)
+    exporter = exporting(watcher.metrics, metrics, metrics_port)
+    with exporter as update_metrics, contextlib.suppress(KeyboardInterrupt):
+        while True:
+            started = time.perf_counter()
+            changed = watcher.sync()
+            if changed:
+                elapsed = (time.perf_counter() - started) * 1000
+                print(
+                    f"synced {len(changed)} document(s) in {elapsed:.1f} ms",
+                    file=sys.stderr,
+                )
+            update_metrics()
+            if once:
+                return
+            time.sleep(interval)
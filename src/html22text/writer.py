@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+import contextlib
+import queue
+import threading
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .batch import Sink
+
+# Number of documents handed to the sink between two flushes.
+WRITE_BATCH = 256
+# Number of documents that may wait for the writer thread.
+MAX_PENDING = 1024
+
+
+class BackgroundWriter:
+    """Runs a sink on its own thread, so that producers never wait for I/O.
+
+    Documents are queued by `write()` and handed to the sink in batches of
+    up to `batch_size`, each followed by a `flush()` of the sink, which is
+    where a directory sink syncs and renames its files. The queue holds at
+    most `max_pending` documents, which bounds memory when the storage is
+    slower than the conversion. An error in the writer thread is raised by
+    the next `write()` or by `close()`.
+
+    Args:
+        sink (Sink): Sink that receives the documents, see `open_sink`.
+        batch_size (int, optional): Documents per batch. Defaults to
+            `WRITE_BATCH`.
+        max_pending (int, optional): Queue capacity. Defaults to
+            `MAX_PENDING`.
+    """
+
+    def __init__(
+        self,
+        sink: "Sink",
+        batch_size: int = WRITE_BATCH,
+        max_pending: int = MAX_PENDING,
+    ) -> None:
+        self.sink = sink
+        self.batch_size = batch_size
+        self.queue: queue.Queue[tuple[str, bytes] | None] = queue.Queue(max_pending)
+        self.error: BaseException | None = None
+        self.thread = threading.Thread(
+            target=self._run, name="html22text-writer", daemon=True
+        )
+        self.thread.start()
+
+    def _run(self) -> None:
+        done = False
+        while not done:
+            batch = [self.queue.get()]
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get())
+            done = batch[-1] is None  # The end marker is always queued last
+            # After an error, keep draining the queue without writing, so
+            # that producers blocked on a full queue wake up.
+            if self.error is not None:
+                continue
+            try:
+                for item in batch:
+                    if item is not None:
+                        self.sink.write(*item)
+                self.sink.flush()
+            except BaseException as exc:  # noqa: BLE001
+                self.error = exc
+
+    def write(self, name: str, data: bytes) -> None:
+        """Queues a document for writing.
+
+        Raises:
+            BaseException: The error that stopped the writer thread, if any.
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put((name, data))
+
+    def close(self) -> None:
+        """Writes the queued documents and closes the sink.
+
+        After an error in the writer thread, an error in closing the sink is
+        ignored, so that the first error is the one raised.
+
+        Raises:
+            BaseException: The error that stopped the writer thread, if any.
+        """
+        self.queue.put(None)
+        self.thread.join()
+        if self.error is not None:
+            with contextlib.suppress(Exception):
+                self.sink.close()
+            raise self.error
+        self.sink.close()
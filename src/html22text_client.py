@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+import hashlib
+import json
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+# Environment variables: use the conversion server, the socket path to use
+# instead of the per-user default, and the idle timeout of spawned servers.
+SERVER_ENV = "HTML22TEXT_SERVER"
+SOCKET_ENV = "HTML22TEXT_SOCKET"
+IDLE_ENV = "HTML22TEXT_SERVER_IDLE"
+# Seconds without requests after which a spawned server exits.
+IDLE_TIMEOUT = 600.0
+# Seconds to wait for a spawned server to accept connections.
+START_TIMEOUT = 15.0
+# Message types: a conversion, with the client's stdin, stdout and stderr
+# attached, and a control command.
+RUN = b"R"
+CONTROL = b"C"
+# File descriptors sent with a conversion: stdin, stdout and stderr.
+STDIO = [0, 1, 2]
+
+
+def supported() -> bool:
+    """Tells whether the platform can pass file descriptors between processes."""
+    return hasattr(socket, "AF_UNIX") and hasattr(socket, "send_fds")
+
+
+def socket_path() -> str:
+    """Returns the path of the conversion server socket of the current user.
+
+    The socket is in a per-user directory that only the user can access,
+    in `$XDG_RUNTIME_DIR` or the temporary directory, and its name depends
+    on the Python interpreter and on the installed package, so that an
+    upgrade or another virtualenv gets a server of its own. `$HTML22TEXT_SOCKET`
+    overrides the path.
+
+    Returns:
+        str: Socket path, or "" if the directory is not private.
+    """
+    if os.environ.get(SOCKET_ENV):
+        return os.environ[SOCKET_ENV]
+    base = os.environ.get("XDG_RUNTIME_DIR") or tempfile.gettempdir()
+    directory = Path(base) / f"html22text-{os.getuid()}"
+    directory.mkdir(mode=0o700, exist_ok=True)
+    status = directory.stat()
+    if status.st_uid != os.getuid() or status.st_mode & 0o077:
+        return ""
+    package = Path(__file__).resolve().parent / "html22text"
+    stamp = [sys.executable, str(package)]
+    with_mtime = package / "html22text.py"
+    if with_mtime.exists():
+        stamp.append(str(with_mtime.stat().st_mtime_ns))
+    key = hashlib.sha256("\0".join(stamp).encode()).hexdigest()[:16]
+    return str(directory / f"{key}.sock")
+
+
+def connect(path: str, timeout: float = 0) -> socket.socket | None:
+    """Connects to the server, retrying for up to `timeout` seconds."""
+    deadline = time.monotonic() + timeout
+    while True:
+        client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            client.connect(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            client.close()
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.01)
+        else:
+            return client
+
+
+def receive_all(client: socket.socket) -> bytes:
+    """Reads everything the server sends until it closes the connection."""
+    chunks = []
+    while chunk := client.recv(65536):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def spawn(path: str, idle_timeout: float | None = None) -> None:
+    """Starts a detached conversion server on `path`.
+
+    Args:
+        path (str): Socket path.
+        idle_timeout (float | None, optional): Seconds without requests
+            after which the server exits. Defaults to `$HTML22TEXT_SERVER_IDLE`
+            or `IDLE_TIMEOUT`.
+    """
+    # Imported here, as only starting the server needs it
+    import subprocess  # noqa: PLC0415
+
+    if idle_timeout is None:
+        idle_timeout = float(os.environ.get(IDLE_ENV) or IDLE_TIMEOUT)
+    command = [sys.executable, "-m", "html22text", "server", "run"]
+    command += [f"--path={path}", f"--idle_timeout={idle_timeout}"]
+    subprocess.Popen(
+        command,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def control(command: str, path: str = "") -> dict[str, Any] | None:
+    """Sends a control command ("status" or "stop") to a running server.
+
+    Returns:
+        dict[str, Any] | None: Reply of the server, or None if no server
+            is running.
+    """
+    client = connect(path or socket_path())
+    if client is None:
+        return None
+    with client:
+        client.sendall(CONTROL + json.dumps({"command": command}).encode())
+        client.shutdown(socket.SHUT_WR)
+        reply = receive_all(client)
+    return json.loads(reply) if reply else None
+
+
+def run(argv: list[str]) -> int | None:
+    """Runs a CLI command in the conversion server, starting it if needed.
+
+    The server runs the command in a process forked from its warm state,
+    with the working directory, the environment and the stdin, stdout and
+    stderr of this process, with their encodings, so output streams straight
+    to where it would have gone, as it would have been written.
+
+    Args:
+        argv (list[str]): CLI arguments, without the program name.
+
+    Returns:
+        int | None: Exit status of the command, or None if no server is
+            available and the command should run in this process.
+    """
+    try:
+        path = socket_path() if supported() else ""
+        client = connect(path) if path else None
+        if path and client is None:
+            spawn(path)
+            client = connect(path, START_TIMEOUT)
+    except OSError:  # Such as a socket path that is too long
+        return None
+    if client is None:
+        return None
+    with client:
+        socket.send_fds(client, [RUN], STDIO)
+        request = {
+            "argv": argv,
+            "cwd": str(Path.cwd()),
+            "env": dict(os.environ),
+            "encodings": [
+                [stream.encoding, stream.errors] if stream else None
+                for stream in (sys.stdin, sys.stdout, sys.stderr)
+            ],
+        }
+        client.sendall(json.dumps(request).encode())
+        client.shutdown(socket.SHUT_WR)
+        reply = receive_all(client)
+    if not reply:
+        print("html22text: the conversion server failed", file=sys.stderr)
+        return 1
+    return int(reply)
+
+
+def requested(argv: list[str]) -> bool:
+    """Tells whether `--server` or `$HTML22TEXT_SERVER` asks for the server."""
+    return "--server" in argv or os.environ.get(SERVER_ENV, "") not in {"", "0"}
+
+
+def main() -> None:
+    """Entry point of the `html22text` command.
+
+    With `--server` or `HTML22TEXT_SERVER=1`, the command runs in the
+    conversion server, and this process imports nothing but the standard
+    library modules it needs to connect. Otherwise, or if the server is
+    not available, it runs in this process.
+    """
+    argv = sys.argv[1:]
+    if requested(argv):
+        status = run([arg for arg in argv if arg != "--server"])
+        if status is not None:
+            sys.exit(status)
+    from html22text.__main__ import cli  # noqa: PLC0415
+
+    cli()
+
+
+if __name__ == "__main__":
+    main()
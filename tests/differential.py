@@ -0,0 +1,386 @@
+# this_file: tests/differential.py
+"""Differential test harness: optimized code paths against the reference.
+
+Every optimized pipeline converts the same documents with the same options
+as the reference implementation in `tests/reference.py`, and every output
+that differs by a single byte is reported with the offset of the first
+difference and a line diff. The documents are `sample1.html`, the HTML
+constants of the test modules, and a corpus of random HTML generated from
+a seed, so a divergence found by fuzzing can be replayed exactly:
+
+    python -m tests.differential --docs 2000 --seed 7
+    python -m tests.differential --docs 500 --check  # exit status 1 on divergence
+"""
+
+import difflib
+import importlib
+import io
+import itertools
+import random
+import sys
+from collections.abc import Callable, Iterable, Mapping
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import fire
+from bs4 import BeautifulSoup
+
+from html22text import convert_result, convert_snippets, convert_to, html22text
+from html22text.html22text import _iter_render, _prepare
+
+from . import reference
+
+ROOT = Path(__file__).parent.parent
+# Test constants larger than this are left out, to keep a run fast.
+MAX_FIXTURE_SIZE = 64 * 1024
+
+# Options of the reference implementation, each set compared separately.
+OPTION_SETS: list[dict[str, Any]] = [
+    {},
+    {"markdown": True},
+    {"block_quote": True, "open_quote": "«", "close_quote": "»"},
+    {"kill_tags": "b, q", "kill_strikethrough": True},
+    {"selector": "div"},
+    {"default_image_alt": "[img]"},
+    {"markdown": True, "base_url": "https://example.com/docs/"},
+    {"markdown": True, "kill_images": True, "file_ext_override": "txt"},
+]
+
+INLINE_TAGS = ["a", "b", "code", "em", "i", "kbd", "mark", "q", "s", "span", "strong"]
+BLOCK_TAGS = ["blockquote", "div", "h1", "h3", "p", "pre", "section"]
+TEXTS = [
+    "word",
+    "two words",
+    " padded ",
+    "\n line\nbreaks ",
+    "&amp; &lt;tag&gt;",
+    "a&nbsp;b",
+    "caf\u00e9 \u2013 \U0001f600",
+    "*stars* _under_ [brackets]",
+    "1. not a list",
+    "",
+]
+VOID_MARKUP = [
+    "<br>",
+    "<hr>",
+    '<img src="i.png" alt="Alt">',
+    '<img src="/abs/j.png">',
+    "<!-- comment -->",
+]
+# Relative frequencies of the kinds of generated content.
+KINDS = {"text": 30, "void": 8, "list": 8, "table": 4, "tag": 50}
+# Probability that a tag is left unclosed.
+UNCLOSED_ODDS = 0.05
+HREFS = [
+    "page.html",
+    "dir/page.htm#part",
+    "#top",
+    "https://example.com/x",
+    "mailto:a@b",
+]
+
+
+class Divergence(NamedTuple):
+    """An output of an optimized pipeline that differs from the reference."""
+
+    pipeline: str
+    options: dict[str, Any]
+    document: str
+    offset: int
+    expected: str
+    actual: str
+
+
+def generate_html(rng: random.Random, depth: int = 0, max_depth: int = 5) -> str:
+    """Returns a random HTML fragment.
+
+    The fragments mix block and inline tags, lists, tables, links, images,
+    entities and whitespace, and some tags are left unclosed. The same
+    generator state always gives the same fragment.
+
+    Args:
+        rng (random.Random): Random number generator.
+        depth (int, optional): Current nesting depth. Defaults to 0.
+        max_depth (int, optional): Depth from which only text is generated.
+            Defaults to 5.
+
+    Returns:
+        str: HTML fragment.
+    """
+    parts = []
+    for _ in range(rng.randint(1, 4)):
+        kind = rng.choices(list(KINDS), list(KINDS.values()))[0]
+        if kind == "text" or depth >= max_depth:
+            parts.append(rng.choice(TEXTS))
+        elif kind == "void":
+            parts.append(rng.choice(VOID_MARKUP))
+        elif kind == "list":
+            tag = rng.choice(["ul", "ol"])
+            items = "".join(
+                f"<li>{generate_html(rng, depth + 2, max_depth)}</li>"
+                for _ in range(rng.randint(1, 3))
+            )
+            parts.append(f"<{tag}>{items}</{tag}>")
+        elif kind == "table":
+            cells = "".join(
+                f"<td>{rng.choice(TEXTS)}</td>" for _ in range(rng.randint(1, 3))
+            )
+            parts.append(f"<table><tr><th>h</th></tr><tr>{cells}</tr></table>")
+        else:
+            tag = rng.choice(INLINE_TAGS + BLOCK_TAGS)
+            attrs = f' href="{rng.choice(HREFS)}"' if tag == "a" else ""
+            inner = generate_html(rng, depth + 1, max_depth)
+            close = "" if rng.random() < UNCLOSED_ODDS else f"</{tag}>"
+            parts.append(f"<{tag}{attrs}>{inner}{close}")
+    return "".join(parts)
+
+
+def generate_corpus(count: int, seed: int = 0) -> dict[str, str]:
+    """Returns `count` random documents, named after the seed and index."""
+    rng = random.Random(seed)
+    return {f"random-{seed}-{index}": generate_html(rng) for index in range(count)}
+
+
+def fixture_documents() -> dict[str, str]:
+    """Returns `sample1.html` and the HTML constants of the test modules.
+
+    Constants larger than `MAX_FIXTURE_SIZE` are left out.
+    """
+    documents = {"sample1.html": (ROOT / "sample1.html").read_text(encoding="utf-8")}
+    for path in sorted(Path(__file__).parent.glob("test_*.py")):
+        module = importlib.import_module(f"{__package__}.{path.stem}")
+        for name, value in vars(module).items():
+            values = value if isinstance(value, list | tuple) else [value]
+            for index, item in enumerate(values):
+                if (
+                    isinstance(item, str)
+                    and "<" in item
+                    and len(item) <= MAX_FIXTURE_SIZE
+                ):
+                    documents[f"{path.stem}.{name}[{index}]"] = item
+    return documents
+
+
+def _convert_to_text(html_content: str, **options: Any) -> str:
+    fp = io.StringIO()
+    convert_to(fp, html_content, **options)
+    return fp.getvalue()
+
+
+def _convert_to_bytes(html_content: str, **options: Any) -> str:
+    fp = io.BytesIO()
+    convert_to(fp, html_content, **options)
+    return fp.getvalue().decode("utf-8")
+
+
+def _result_text(html_content: str, **options: Any) -> str:
+    return convert_result(html_content, **options).text
+
+
+def _streamed(html_content: str, **options: Any) -> str:
+    h, html = _prepare(html_content, **options)
+    # Tiny slices put slice boundaries inside every element
+    return "\n".join(_iter_render(h, html, feed_size=16))
+
+
+def _each(convert: Callable[..., str]) -> Callable[..., list[str]]:
+    def pipeline(documents: list[str], **options: Any) -> list[str]:
+        return [convert(html_content, **options) for html_content in documents]
+
+    return pipeline
+
+
+def _threaded(documents: list[str], **options: Any) -> list[str]:
+    with ThreadPoolExecutor(4) as executor:
+        return list(
+            executor.map(
+                lambda html_content: html22text(html_content, **options), documents
+            )
+        )
+
+
+PIPELINES: dict[str, Callable[..., list[str]]] = {
+    "html22text": _each(html22text),
+    "convert_to(text)": _each(_convert_to_text),
+    "convert_to(bytes)": _each(_convert_to_bytes),
+    "streamed": _each(_streamed),
+    "convert_result": _each(_result_text),
+    "convert_snippets": convert_snippets,
+    "threads": _threaded,
+}
+
+
+def _outcomes(
+    pipeline: Callable[..., list[str]], documents: list[str], options: dict[str, Any]
+) -> list[str]:
+    """Runs a pipeline, with documents that raise giving the exception name."""
+    try:
+        return pipeline(documents, **options)
+    except Exception:  # noqa: BLE001
+        outcomes = []
+        for html_content in documents:
+            try:
+                outcomes.extend(pipeline([html_content], **options))
+            except Exception as exc:  # noqa: BLE001, PERF203
+                outcomes.append(f"<raised {type(exc).__name__}>")
+        return outcomes
+
+
+def is_known_divergence(
+    html_content: str, options: Mapping[str, Any], expected: str = ""
+) -> bool:
+    """Tells whether the output is expected to differ from the reference.
+
+    The reference raises `IndexError` on tables nested in tables in
+    Markdown, where the table padding now gives output. For `kill_tags`
+    that reach into `<mark>` or `<kbd>`, see `kills_inside_marks()`.
+    """
+    del html_content
+    return expected == "<raised IndexError>" and bool(options.get("markdown"))
+
+
+def kills_inside_marks(html_content: str, options: Mapping[str, Any]) -> bool:
+    """Tells whether `kill_tags` may reach `<mark>` or `<kbd>` or their content.
+
+    The reference flattens `<mark>` and `<kbd>` into text before it applies
+    `kill_tags`, so selectors such as `div > *` cannot reach them or the
+    tags inside them. Tag rules (see `Options.tag_rules`) flatten them
+    while rendering, after `kill_tags` has removed what it matches. The
+    outputs of such documents are compared on `flatten_marks()` input.
+    """
+    if not options.get("kill_tags"):
+        return False
+    soup = BeautifulSoup(html_content, "html.parser")
+    for selector in options["kill_tags"].split(","):
+        if any(name in selector for name in ("mark", "kbd")):
+            return True
+        try:
+            killed = soup.select(selector.strip())
+        except Exception:  # noqa: BLE001
+            continue
+        for tag in killed:
+            if tag.name in {"mark", "kbd"} or tag.find_parent(["mark", "kbd"]):
+                return True
+    return False
+
+
+def flatten_marks(html_content: str) -> str:
+    """Replaces `<mark>` and `<kbd>` with their text, as the reference does."""
+    soup = BeautifulSoup(html_content, "html.parser")
+    for tag in soup.find_all(["mark", "kbd"]):
+        tag.replace_with(tag.get_text(""))
+    return str(soup)
+
+
+def compare(
+    documents: Mapping[str, str],
+    pipelines: Mapping[str, Callable[..., list[str]]] | None = None,
+    option_sets: Iterable[dict[str, Any]] = OPTION_SETS,
+) -> tuple[list[Divergence], int]:
+    """Converts the documents with the reference and every pipeline.
+
+    Where `kills_inside_marks()`, a pipeline whose output differs is run
+    again on `flatten_marks()` input, and only a difference that remains
+    is a divergence.
+
+    Args:
+        documents (Mapping[str, str]): HTML documents by name.
+        pipelines (Mapping[str, Callable[..., list[str]]] | None, optional):
+            Pipelines by name, each converting a list of documents with
+            `html22text()` options. Defaults to `PIPELINES`.
+        option_sets (Iterable[dict[str, Any]], optional): Options to compare
+            with. Defaults to `OPTION_SETS`.
+
+    Returns:
+        tuple[list[Divergence], int]: Unexpected divergences, and the number
+            of known divergences that were skipped or explained.
+    """
+    names = list(documents)
+    contents = list(documents.values())
+    divergences: list[Divergence] = []
+    known = 0
+    for options in option_sets:
+        expected = _outcomes(_each(reference.html22text), contents, options)
+        for pipeline_name, pipeline in (pipelines or PIPELINES).items():
+            actual = _outcomes(pipeline, contents, options)
+            for name, html_content, want, got in zip(
+                names, contents, expected, actual, strict=True
+            ):
+                if want == got:
+                    continue
+                if is_known_divergence(html_content, options, want):
+                    known += 1
+                    continue
+                if kills_inside_marks(html_content, options):
+                    flat = _outcomes(pipeline, [flatten_marks(html_content)], options)
+                    if flat == [want]:
+                        known += 1
+                        continue
+                want_bytes, got_bytes = want.encode(), got.encode()
+                offset = next(
+                    (
+                        index
+                        for index, (a, b) in enumerate(
+                            zip(want_bytes, got_bytes, strict=False)
+                        )
+                        if a != b
+                    ),
+                    min(len(want_bytes), len(got_bytes)),
+                )
+                divergences.append(
+                    Divergence(pipeline_name, options, name, offset, want, got)
+                )
+    return divergences, known
+
+
+def format_divergence(divergence: Divergence, context: int = 3) -> str:
+    """Describes a divergence, with a unified diff of the output lines."""
+    lines = difflib.unified_diff(
+        divergence.expected.splitlines(keepends=True),
+        divergence.actual.splitlines(keepends=True),
+        "reference",
+        divergence.pipeline,
+        n=context,
+    )
+    return (
+        f"{divergence.pipeline} {divergence.options} {divergence.document}: "
+        f"first difference at byte {divergence.offset}\n" + "".join(lines)
+    )
+
+
+def main(
+    docs: int = 200,
+    seed: int = 0,
+    fixtures: bool = True,
+    check: bool = False,
+    show: int = 5,
+) -> None:
+    """Compare all pipelines against the reference and report divergences.
+
+    Args:
+        docs (int, optional): Number of random documents. Defaults to 200.
+        seed (int, optional): Seed of the random documents. Defaults to 0.
+        fixtures (bool, optional): Include `sample1.html` and the test
+            fixtures. Defaults to True.
+        check (bool, optional): Exit with status 1 on any divergence, for
+            CI. Defaults to False.
+        show (int, optional): Number of divergences shown in full.
+            Defaults to 5.
+    """
+    documents = fixture_documents() if fixtures else {}
+    documents.update(generate_corpus(docs, seed))
+    divergences, known = compare(documents)
+    for divergence in itertools.islice(divergences, show):
+        print(format_divergence(divergence))
+    print(
+        f"{len(documents)} documents, {len(OPTION_SETS)} option sets, "
+        f"{len(PIPELINES)} pipelines: {len(divergences)} divergences "
+        f"({known} known divergences skipped)"
+    )
+    if check and divergences:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
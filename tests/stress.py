@@ -0,0 +1,185 @@
+# this_file: tests/stress.py
+"""Adversarial inputs for `html22text()` with time and memory budgets.
+
+Every case builds a hostile page of a given size, such as a tag with tens
+of thousands of attributes or a table with ten thousand columns, and has
+a budget for the conversion time at full size and for the peak memory per
+input character. The scaling exponent is measured from conversions at the
+full size and at a quarter of it: about 1 for linear and 2 for quadratic
+growth. The report shows the worst case of the library:
+
+    python -m tests.stress
+    python -m tests.stress --scale 0.25 --check  # exit status 1 over budget
+"""
+
+import math
+import sys
+import time
+import tracemalloc
+from collections.abc import Callable
+from typing import Any, NamedTuple
+
+import fire
+
+from html22text import html22text
+
+# Exponent up to which growth counts as linear, given timing noise.
+LINEAR = 1.5
+
+
+class Case(NamedTuple):
+    """A hostile input and its budgets.
+
+    Attributes:
+        name (str): Name of the case.
+        build (Callable[[int], str]): Builds the HTML of a given size.
+        size (int): Full size, in the unit of `build`.
+        options (dict[str, Any]): Options of `html22text()`.
+        seconds (float): Time budget at full size.
+        bytes_per_char (int): Peak memory budget per char of input.
+        max_exponent (float): Largest acceptable scaling exponent.
+    """
+
+    name: str
+    build: Callable[[int], str]
+    size: int
+    options: dict[str, Any]
+    seconds: float
+    bytes_per_char: int
+    max_exponent: float = LINEAR
+
+
+class Measurement(NamedTuple):
+    """Conversion time, peak memory and scaling exponent of a case."""
+
+    chars: int
+    seconds: float
+    bytes_per_char: float
+    exponent: float
+
+
+def _attributes(count: int) -> str:
+    attributes = " ".join(f'data-a{index}="value {index}"' for index in range(count))
+    return f"<div {attributes}>x</div>"
+
+
+def _text(chars: int) -> str:
+    return "<p>" + "word " * (chars // 5) + "</p>"
+
+
+def _table(columns: int) -> str:
+    return (
+        "<table><tr>"
+        + "<th>head</th>" * columns
+        + "</tr><tr>"
+        + "<td>cell</td>" * columns
+        + "</tr></table>"
+    )
+
+
+def _killed(matches: int) -> str:
+    return "<div>" + '<span class="ad">ad</span> text ' * matches + "</div>"
+
+
+def _nested_lists(depth: int) -> str:
+    return "<ul><li>" * depth + "item" + "</li></ul>" * depth
+
+
+def _entities(count: int) -> str:
+    entities = ["&amp;", "&lt;", "&#169;", "&eacute;", "&#x263A;", "&nbsp;"]
+    return "<p>" + " ".join(entities[index % 6] for index in range(count)) + "</p>"
+
+
+CASES = [
+    Case("attributes", _attributes, 50_000, {}, 4, 150),
+    Case("text node", _text, 1_000_000, {"markdown": True}, 1, 60),
+    Case("wide table", _table, 10_000, {"markdown": True}, 8, 300),
+    Case("wide table, plain", _table, 10_000, {}, 8, 300),
+    Case("kill_tags matches", _killed, 10_000, {"kill_tags": ".ad"}, 3, 200),
+    Case("nested lists", _nested_lists, 10_000, {"max_depth": 64}, 4, 400),
+    # Every level is a line indented by its depth, so the output itself
+    # grows quadratically without a max_depth.
+    Case("nested lists, unbounded", _nested_lists, 4_000, {}, 20, 1000, 2.5),
+    Case("entities", _entities, 200_000, {}, 10, 30),
+]
+
+
+def _best_time(html_content: str, options: dict[str, Any], repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        html22text(html_content, **options)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def measure(case: Case, scale: float = 1, repeat: int = 3) -> Measurement:
+    """Converts a case at `scale` times its full size and measures it.
+
+    Args:
+        case (Case): Case to measure.
+        scale (float, optional): Fraction of the full size. Defaults to 1.
+        repeat (int, optional): Conversions per size, of which the fastest
+            counts. Defaults to 3.
+
+    Returns:
+        Measurement: Time at the given size, peak memory at a quarter of
+            it, and the scaling exponent between both sizes.
+    """
+    size = max(16, int(case.size * scale))
+    html_content = case.build(size)
+    quarter = case.build(size // 4)
+    seconds = _best_time(html_content, case.options, repeat)
+    exponent = math.log(seconds / _best_time(quarter, case.options, repeat), 4)
+    tracemalloc.start()
+    try:
+        html22text(quarter, **case.options)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return Measurement(len(html_content), seconds, peak / len(quarter), exponent)
+
+
+def over_budget(case: Case, measurement: Measurement, scale: float = 1) -> list[str]:
+    """Returns the budgets of a case that a measurement exceeds."""
+    exceeded = []
+    if measurement.seconds > case.seconds * scale:
+        exceeded.append(f"time {measurement.seconds:.2f}s > {case.seconds * scale}s")
+    if measurement.bytes_per_char > case.bytes_per_char:
+        exceeded.append(
+            f"memory {measurement.bytes_per_char:.0f} > {case.bytes_per_char} B/char"
+        )
+    if measurement.exponent > case.max_exponent:
+        exceeded.append(f"exponent {measurement.exponent:.2f} > {case.max_exponent}")
+    return exceeded
+
+
+def main(scale: float = 1, check: bool = False, only: str = "") -> None:
+    """Measure every case and print its time, memory and scaling exponent.
+
+    Args:
+        scale (float, optional): Fraction of the full sizes. Defaults to 1.
+        check (bool, optional): Exit with status 1 if a case is over its
+            budget. Defaults to False.
+        only (str, optional): Measure only the cases whose name contains
+            this. Defaults to "" (all cases).
+    """
+    print(f"{'case':<24} {'chars':>9} {'time':>7} {'B/char':>7} {'exponent':>8}")
+    failed = False
+    for case in CASES:
+        if only not in case.name:
+            continue
+        measurement = measure(case, scale)
+        exceeded = over_budget(case, measurement, scale)
+        failed = failed or bool(exceeded)
+        print(
+            f"{case.name:<24} {measurement.chars:>9} {measurement.seconds:>6.2f}s "
+            f"{measurement.bytes_per_char:>7.0f} {measurement.exponent:>8.2f}"
+            + (f"  OVER BUDGET: {', '.join(exceeded)}" if exceeded else "")
+        )
+    if check and failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    fire.Fire(main)
@@ -0,0 +1,222 @@
+# this_file: tests/test_batch.py
+
+"""Test batch conversion of directories and archives."""
+
+import hashlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tarfile
+import zipfile
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+import html22text
+from html22text.batch import (
+    archive_kind,
+    batch_convert,
+    iter_sources,
+    merge_manifests,
+    output_name,
+    parse_shard,
+    safe_member_name,
+    shard_of,
+)
+
+PAGES = {
+    "index.html": '<h1>Home</h1><p>See <a href="docs/guide.html">guide</a></p>',
+    "docs/guide.html": '<h1>Guide</h1><p><img src="shot.png" alt="Shot"></p>',
+    "docs/style.css": "body { color: red }",
+}
+
+
+def _make_zip(path: Path) -> None:
+    with zipfile.ZipFile(path, "w") as zip_file:
+        for name, content in PAGES.items():
+            zip_file.writestr(name, content)
+
+
+def _make_tar(path: Path) -> None:
+    with tarfile.open(path, "w:gz") as tar_file:
+        for name, content in PAGES.items():
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar_file.addfile(info, io.BytesIO(data))
+
+
+def _make_dir(path: Path) -> None:
+    for name, content in PAGES.items():
+        (path / name).parent.mkdir(parents=True, exist_ok=True)
+        (path / name).write_text(content, encoding="utf-8")
+
+
+def test_archive_kind() -> None:
+    """Test archive format detection by suffix."""
+    assert archive_kind("site.zip") == "zip"
+    assert archive_kind("site.TAR.GZ") == "tar"
+    assert archive_kind("site.tgz") == "tar"
+    assert archive_kind("site") == ""
+
+
+def test_output_name() -> None:
+    """Test mapping of member paths to output paths."""
+    assert output_name("docs/guide.html", "md") == "docs/guide.md"
+    assert output_name("a b.htm", "txt") == "a b.txt"
+
+
+@pytest.mark.parametrize(
+    ("name", "maker"),
+    [("site.zip", _make_zip), ("site.tar.gz", _make_tar), ("site", _make_dir)],
+)
+def test_iter_sources(tmp_path: Path, name: str, maker: Callable[[Path], None]) -> None:
+    """Test that only HTML members are read from every source kind."""
+    src = tmp_path / name
+    if maker is _make_dir:
+        src.mkdir()
+    maker(src)
+    names = sorted(name for name, _ in iter_sources(str(src)))
+    assert names == ["docs/guide.html", "index.html"]
+
+
+def test_batch_zip_to_zip(tmp_path: Path) -> None:
+    """Test converting a zip archive into a zip archive."""
+    src = tmp_path / "site.zip"
+    _make_zip(src)
+    out = tmp_path / "out.zip"
+
+    assert batch_convert(str(src), str(out), jobs=2, markdown=True) == 2
+
+    with zipfile.ZipFile(out) as zip_file:
+        assert sorted(zip_file.namelist()) == ["docs/guide.md", "index.md"]
+        index = zip_file.read("index.md").decode("utf-8")
+    assert "[guide](<docs/guide.md>)" in index
+
+
+def test_batch_tar_to_directory(tmp_path: Path) -> None:
+    """Test converting a tarball into a directory with per-member base URLs."""
+    src = tmp_path / "site.tar.gz"
+    _make_tar(src)
+    out = tmp_path / "out"
+
+    count = batch_convert(
+        str(src), str(out), jobs=1, markdown=True, base_url="http://example.com/"
+    )
+
+    assert count == 2
+    guide = (out / "docs" / "guide.md").read_text(encoding="utf-8")
+    assert "http://example.com/docs/shot.png" in guide
+
+
+def test_batch_directory_to_tar(tmp_path: Path) -> None:
+    """Test converting a directory into a tarball."""
+    src = tmp_path / "site"
+    src.mkdir()
+    _make_dir(src)
+    out = tmp_path / "out.tar.gz"
+
+    assert batch_convert(str(src), str(out), jobs=1) == 2
+
+    with tarfile.open(out) as tar_file:
+        assert sorted(tar_file.getnames()) == ["docs/guide.txt", "index.txt"]
+        member = tar_file.extractfile("index.txt")
+        assert member is not None
+        assert "Home" in member.read().decode("utf-8")
+
+
+def test_hostile_member_names_stay_inside_output(tmp_path: Path) -> None:
+    """Members that lead outside the output root fail and write nothing."""
+    src = tmp_path / "hostile.zip"
+    with zipfile.ZipFile(src, "w") as zip_file:
+        zip_file.writestr("../escaped.html", "<p>Escaped</p>")
+        zip_file.writestr("%2e%2e/quoted.html", "<p>Quoted</p>")
+        zip_file.writestr("./docs/../index.html", "<p>Dotted</p>")
+        zip_file.writestr("index.html", "<p>Home</p>")
+    out = tmp_path / "site" / "out"
+    manifest = tmp_path / "manifest.jsonl"
+
+    assert batch_convert(str(src), str(out), jobs=1, manifest=str(manifest)) == 2
+    written = sorted(path.relative_to(out) for path in tmp_path.rglob("*.txt"))
+    assert written == [Path("%2e%2e/quoted.txt"), Path("index.txt")]
+    records = [json.loads(line) for line in manifest.read_text("utf-8").splitlines()]
+    assert sorted(record["status"] for record in records) == ["error"] * 2 + ["ok"] * 2
+
+    assert safe_member_name("./docs//a.txt") == "docs/a.txt"
+    for name in ("../a.txt", "/a.txt", "a/../../b.txt", "C:/a.txt", "..\\a.txt"):
+        with pytest.raises(ValueError, match="Unsafe member path"):
+            safe_member_name(name)
+
+
+def test_duplicate_outputs_are_not_overwritten(tmp_path: Path) -> None:
+    """Sources that map to the same output are converted once."""
+    src = tmp_path / "site"
+    src.mkdir()
+    (src / "a.html").write_text("<p>From html</p>", encoding="utf-8")
+    (src / "a.htm").write_text("<p>From htm</p>", encoding="utf-8")
+    out = tmp_path / "out"
+    manifest = tmp_path / "manifest.jsonl"
+
+    assert batch_convert(str(src), str(out), jobs=1, manifest=str(manifest)) == 1
+    records = [json.loads(line) for line in manifest.read_text("utf-8").splitlines()]
+    ok, failed = sorted(records, key=lambda record: record["status"] != "ok")
+    assert failed["status"] == "error"
+    assert failed["error"].startswith("ValueError: Duplicate output 'a.txt'")
+    data = (out / "a.txt").read_bytes()
+    assert ok["sha256"] == hashlib.sha256(data).hexdigest()
+
+
+def test_parse_shard() -> None:
+    """Test shard specification parsing and validation."""
+    assert parse_shard("2/8") == (2, 8)
+    for spec in ("0/4", "5/4", "x/4", "3"):
+        with pytest.raises(ValueError, match="Invalid shard"):
+            parse_shard(spec)
+
+
+def test_shard_of_is_deterministic_partition() -> None:
+    """Test that every member lands in exactly one, stable shard."""
+    names = [f"dir{i % 7}/page{i}.html" for i in range(500)]
+    shards = [shard_of(name, 4) for name in names]
+    assert shards == [shard_of(name, 4) for name in names]
+    assert set(shards) == {1, 2, 3, 4}
+
+
+def test_sharded_processes_and_merge(tmp_path: Path) -> None:
+    """Test N local shard processes covering the input exactly once."""
+    src = tmp_path / "site"
+    for i in range(30):
+        (src / f"d{i % 3}").mkdir(parents=True, exist_ok=True)
+        (src / f"d{i % 3}" / f"p{i}.html").write_text(f"<p>Page {i}</p>", "utf-8")
+    out = tmp_path / "out-{shard}.zip"
+    env = {**os.environ, "PYTHONPATH": str(Path(html22text.__file__).parent.parent)}
+
+    processes = [
+        subprocess.Popen(
+            [sys.executable, "-m", "html22text", "batch", str(src), str(out)]
+            + ["--shard", f"{k}/3", "--jobs", "1"],
+            env=env,
+        )
+        for k in (1, 2, 3)
+    ]
+    assert [process.wait() for process in processes] == [0, 0, 0]
+
+    manifests = [str(tmp_path / f"out-{k}.zip.shard-{k}-of-3.jsonl") for k in (1, 2, 3)]
+    merged = tmp_path / "manifest.jsonl"
+    assert merge_manifests(str(merged), *manifests) == 30
+
+    records = [json.loads(line) for line in merged.read_text("utf-8").splitlines()]
+    assert [record["source"] for record in records] == sorted(
+        f"d{i % 3}/p{i}.html" for i in range(30)
+    )
+    members = []
+    for k in (1, 2, 3):
+        with zipfile.ZipFile(tmp_path / f"out-{k}.zip") as zip_file:
+            members += zip_file.namelist()
+    assert sorted(members) == sorted(record["output"] for record in records)
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        merge_manifests(str(tmp_path / "dup.jsonl"), manifests[0], manifests[0])
@@ -0,0 +1,87 @@
+# this_file: tests/test_boilerplate.py
+
+"""Test the boilerplate cache shared by the pages of a site."""
+
+import re
+from pathlib import Path
+
+import pytest
+
+from html22text import BoilerplateCache, Options, batch_convert, html22text
+
+NAV = (
+    '<nav><ul><li><a href="index.html">Home</a></li>'
+    '<li><a href="docs.html">Documentation</a></li></ul></nav>'
+)
+FOOTER = "<footer><p>&copy; 2024 Example Inc. All rights reserved.</p></footer>"
+PAGES = [
+    f"<html><body><div id='page'>{NAV}<main><h1>Page {number}</h1>"
+    f"<p>Text of page {number}.</p></main>{FOOTER}</div></body></html>"
+    for number in range(3)
+]
+
+
+def test_reuse_gives_the_same_text() -> None:
+    """Cached blocks give the text of html22text(), and are rendered once."""
+    cache = BoilerplateCache()
+    for options in (Options(), Options(markdown=True)):
+        for page in PAGES:
+            # html2text puts two blank lines after a list
+            expected = re.sub("\n{3,}", "\n\n", html22text(page, **options.as_kwargs()))
+            assert cache.convert(page, options) == expected
+    # The navigation and the footer, with both options, are rendered once
+    assert (cache.hits, cache.misses) == (8, 4)
+    assert BoilerplateCache().convert(PAGES[2]) == cache.convert(PAGES[2])
+
+
+def test_drop_leaves_out_repeated_blocks() -> None:
+    """Blocks of earlier documents are dropped, and the first page keeps them."""
+    cache = BoilerplateCache("drop")
+    first, second = (cache.convert(page) for page in PAGES[:2])
+    assert "Documentation" in first
+    assert "Example Inc." in first
+    assert second == "# Page 1\n\nText of page 1.\n"
+
+
+def test_cache_is_bounded() -> None:
+    """The least recently used blocks are forgotten first."""
+    cache = BoilerplateCache("drop", max_size=1)
+    cache.convert(PAGES[0])
+    assert len(cache.blocks) == 1
+    # Every block pushes the other one out, so nothing is dropped
+    assert cache.convert(PAGES[1]) == BoilerplateCache().convert(PAGES[1])
+    assert cache.hits == 0
+    with pytest.raises(ValueError, match="Unknown boilerplate mode"):
+        BoilerplateCache("skip")
+
+
+def test_batch_drops_boilerplate(tmp_path: Path) -> None:
+    """A batch shares one cache between its documents."""
+    src = tmp_path / "site"
+    src.mkdir()
+    for number, page in enumerate(PAGES):
+        (src / f"page{number}.html").write_text(page, encoding="utf-8")
+    out = tmp_path / "out"
+
+    assert batch_convert(str(src), str(out), jobs=1, boilerplate="drop") == len(PAGES)
+    texts = [path.read_text(encoding="utf-8") for path in sorted(out.glob("*.txt"))]
+    assert sum("Example Inc." in text for text in texts) == 1
+    assert all(f"Text of page {number}." in texts[number] for number in range(3))
+
+
+def test_batch_drop_is_stable_with_one_worker(tmp_path: Path) -> None:
+    """One worker drops the same blocks, in process and in a worker pool."""
+    src = tmp_path / "site"
+    src.mkdir()
+    for number, page in enumerate(PAGES):
+        (src / f"page{number}.html").write_text(page, encoding="utf-8")
+
+    outputs = []
+    for run, budget in enumerate((0, 60, 0)):
+        out = tmp_path / f"out{run}"
+        batch_convert(str(src), str(out), jobs=1, boilerplate="drop", timeout=budget)
+        outputs.append(
+            {path.name: path.read_bytes() for path in sorted(out.glob("*.txt"))}
+        )
+    assert outputs[0] == outputs[1] == outputs[2]
+    assert len(outputs[0]) == len(PAGES)
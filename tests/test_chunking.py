@@ -0,0 +1,88 @@
+# this_file: tests/test_chunking.py
+
+"""Test streamed rendering and heading-aware chunking."""
+
+import itertools
+from pathlib import Path
+
+import pytest
+
+from html22text import html22text
+from html22text.chunking import chunks
+from html22text.html22text import _iter_render, _prepare
+
+SAMPLE = Path(__file__).parent.parent / "sample1.html"
+
+DOCS = [
+    "",
+    "<p>a&nbsp;b</p><pre>one\n  two</pre>",
+    "<h1>T</h1><table><tr><th>a</th><th>bb</th></tr><tr><td>1</td><td>2</td></tr></table><p>x</p>",
+    '<p><a href="x.html"><img src="i.png" alt="I"></a> <a href="http://e.com">e</a></p>',
+    SAMPLE.read_text(encoding="utf-8"),
+]
+
+GUIDE = (
+    "<h1>Guide</h1><p>Intro.</p><h2>Install</h2>"
+    + "".join(f"<p>Step {i} does one thing.</p>" for i in range(12))
+    + "<h2>Use</h2><p>"
+    + "word " * 200
+    + "</p><h3>Deep</h3><p>Done.</p>"
+)
+
+
+@pytest.mark.parametrize("markdown", [True, False])
+@pytest.mark.parametrize("feed_size", [1, 16, 65536])
+def test_streamed_render_matches_handle(markdown: bool, feed_size: int) -> None:
+    """Test that streamed output lines join to exactly the handle() output."""
+    for doc in DOCS:
+        h, html = _prepare(doc, markdown=markdown)
+        streamed = "\n".join(_iter_render(h, html, feed_size))
+        assert streamed == html22text(doc, markdown=markdown)
+
+
+def test_chunks_respect_size_and_headings() -> None:
+    """Test chunk size bound and heading paths."""
+    result = list(chunks(GUIDE, max_chars=120, markdown=True))
+
+    assert all(len(chunk.text) <= 120 for chunk in result)
+    assert result[0].headings == ("Guide",)
+    assert result[0].text.startswith("# Guide")
+    assert result[-1].headings == ("Guide", "Use", "Deep")
+    assert {chunk.headings for chunk in result} == {
+        ("Guide",),
+        ("Guide", "Install"),
+        ("Guide", "Use"),
+        ("Guide", "Use", "Deep"),
+    }
+    # Without overlap, no text is lost or repeated.
+    words = " ".join(chunk.text for chunk in result).split()
+    assert words == html22text(GUIDE, markdown=True).split()
+
+
+def test_chunks_overlap() -> None:
+    """Test that consecutive chunks of a section share trailing text."""
+    result = [
+        chunk
+        for chunk in chunks(GUIDE, max_chars=100, overlap=30, markdown=True)
+        if chunk.headings == ("Guide", "Install")
+    ]
+
+    assert len(result) > 1
+    for previous, current in itertools.pairwise(result):
+        assert len(current.text) <= 100
+        first_block = current.text.split("\n\n")[0]
+        assert previous.text.endswith(first_block)
+
+
+def test_chunks_invalid_overlap() -> None:
+    """Test that an overlap as large as the chunk size is rejected."""
+    with pytest.raises(ValueError, match="overlap"):
+        list(chunks("<p>x</p>", max_chars=10, overlap=10))
+
+
+@pytest.mark.parametrize("max_chars", [1, 2, 3])
+def test_chunks_tiny_max_chars(max_chars: int) -> None:
+    """Test that a chunk size smaller than a word still splits the text."""
+    result = list(chunks("<p>hello world</p>", max_chars=max_chars))
+    assert all(0 < len(chunk.text) <= max_chars for chunk in result)
+    assert "".join(chunk.text for chunk in result) == "helloworld"
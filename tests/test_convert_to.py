@@ -0,0 +1,63 @@
+# this_file: tests/test_convert_to.py
+
+"""Test streaming output to file handles."""
+
+import io
+import sys
+from pathlib import Path
+
+import pytest
+
+from html22text import convert_to, html22text
+from html22text.__main__ import cli
+
+SAMPLE = Path(__file__).parent.parent / "sample1.html"
+
+
+class _CountingStream(io.StringIO):
+    """Text stream that counts write calls."""
+
+    writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        return super().write(text)
+
+
+@pytest.mark.parametrize("markdown", [True, False])
+def test_convert_to_text_and_binary(markdown: bool) -> None:
+    """Test that text and binary streams receive the html22text() output."""
+    expected = html22text(str(SAMPLE), is_input_path=True, markdown=markdown)
+
+    text_stream = io.StringIO()
+    written = convert_to(
+        text_stream, str(SAMPLE), is_input_path=True, markdown=markdown
+    )
+    assert text_stream.getvalue() == expected
+    assert written == len(expected)
+
+    binary_stream = io.BytesIO()
+    convert_to(binary_stream, str(SAMPLE), is_input_path=True, markdown=markdown)
+    assert binary_stream.getvalue() == expected.encode("utf-8")
+
+
+def test_convert_to_buffers_writes() -> None:
+    """Test that many output lines are written in few buffered pieces."""
+    html_input = "".join(f"<p>Paragraph {i}</p>" for i in range(5000))
+    stream = _CountingStream()
+
+    convert_to(stream, html_input)
+
+    assert stream.getvalue() == html22text(html_input)
+    assert stream.writes < 10
+
+
+def test_cli_output_option(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that `-o` writes the conversion to a file."""
+    output = tmp_path / "out.md"
+    argv = ["html22text", "<p>Hello <b>World</b></p>", "--markdown", "-o", str(output)]
+    monkeypatch.setattr(sys, "argv", argv)
+
+    cli()
+
+    assert output.read_text(encoding="utf-8") == "Hello **World**\n"
@@ -0,0 +1,97 @@
+# this_file: tests/test_crawl.py
+
+"""Test the local-mirror crawler."""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from html22text import Options, html22text
+from html22text.crawl import crawl
+
+SITE = {
+    "index.html": (
+        '<h1>Home</h1><a href="docs/a.html">A</a> <a href="docs/b.html">B</a>'
+        ' <a href="missing.html">Gone</a> <a href="https://example.com/x.html">X</a>'
+    ),
+    "docs/a.html": (
+        '<p>A links <a href="b.html">B</a> and <a href="../index.html">home</a></p>'
+    ),
+    "docs/b.html": '<p>B links <a href="../../outside.html">outside</a></p>',
+    "orphan.html": "<p>Nobody links here</p>",
+}
+
+
+@pytest.fixture
+def site(tmp_path: Path) -> Path:
+    root = tmp_path / "site"
+    for name, content in SITE.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(content, encoding="utf-8")
+    return root
+
+
+def test_links_collector() -> None:
+    """Test that html22text reports relative document links in both modes."""
+    html_input = (
+        '<a href="a.html">A</a> <a href="#top">Top</a> '
+        '<a href="http://x.com/b.html">B</a>'
+    )
+    for markdown in (True, False):
+        links: list[str] = []
+        html22text(html_input, markdown=markdown, links=links)
+        assert links == ["a.html"]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_crawl_reachable_pages(site: Path, tmp_path: Path, jobs: int) -> None:
+    """Test that only reachable pages are converted, with graph and report."""
+    out = tmp_path / "out"
+
+    assert crawl(str(site / "index.html"), str(out), jobs=jobs, markdown=True) == 3
+
+    assert (out / "index.md").is_file()
+    assert (out / "docs" / "a.md").is_file()
+    assert (out / "docs" / "b.md").is_file()
+    assert not (out / "orphan.md").exists()
+    assert "[B](<b.md>)" in (out / "docs" / "a.md").read_text(encoding="utf-8")
+
+    graph = json.loads((out / "link-graph.json").read_text(encoding="utf-8"))
+    assert graph == {
+        "docs/a.html": ["docs/b.html", "index.html"],
+        "docs/b.html": [],
+        "index.html": ["docs/a.html", "docs/b.html", "missing.html"],
+    }
+
+    broken = json.loads((out / "broken-links.json").read_text(encoding="utf-8"))
+    assert sorted((item["page"], item["reason"]) for item in broken) == [
+        ("docs/b.html", "outside root"),
+        ("index.html", "not found"),
+    ]
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_crawl_continues_after_failed_page(
+    site: Path, tmp_path: Path, jobs: int, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test that a page that fails to convert is reported and skipped."""
+    convert = Options.convert
+
+    def failing_convert(self: Options, html_content: str, **kwargs: Any) -> str:
+        if "A links" in html_content:
+            error_message = "bad page"
+            raise ValueError(error_message)
+        return convert(self, html_content, **kwargs)
+
+    monkeypatch.setattr(Options, "convert", failing_convert)
+    out = tmp_path / "out"
+
+    assert crawl(str(site / "index.html"), str(out), jobs=jobs) == 2
+
+    assert (out / "index.txt").is_file()
+    assert (out / "docs" / "b.txt").is_file()
+    assert not (out / "docs" / "a.txt").exists()
+    failed = json.loads((out / "failed-pages.json").read_text(encoding="utf-8"))
+    assert failed == [{"page": "docs/a.html", "error": "ValueError: bad page"}]
@@ -0,0 +1,77 @@
+# this_file: tests/test_deep_nesting.py
+
+"""Stress-test conversion of pathologically deep markup."""
+
+import sys
+from typing import Any
+
+import pytest
+
+from html22text import html22text
+
+
+def _nested(open_tags: str, depth: int, text: str = "x") -> str:
+    close_tags = "".join(f"</{tag}>" for tag in reversed(open_tags.split()))
+    return (
+        "".join(f"<{tag}>" for tag in open_tags.split()) * depth
+        + text
+        + (close_tags * depth)
+    )
+
+
+def test_depth_beyond_recursion_limit() -> None:
+    """Test that nesting far beyond the recursion limit converts."""
+    depth = sys.getrecursionlimit() * 10
+    assert html22text(_nested("div", depth, "deep")) == "deep\n"
+    assert html22text(_nested("span", depth, "deep"), markdown=True) == "deep\n"
+
+
+@pytest.mark.parametrize(
+    ("open_tags", "options"),
+    [
+        ("div", {}),
+        ("span", {"markdown": True}),
+        ("mark", {}),
+        ("kbd", {"markdown": True}),
+        ("blockquote", {"block_quote": True}),
+        ("ul li", {"max_depth": 64}),
+    ],
+)
+def test_deep_nesting_converts(open_tags: str, options: dict[str, Any]) -> None:
+    """Test that deep nesting converts to its text, with rules and limits."""
+    text = html22text(_nested(open_tags, 4000), **options)
+    assert text.count("x") == 1
+
+
+def test_many_deep_blocks_convert() -> None:
+    """Test that each of many deeply nested blocks keeps its text."""
+    block = _nested("div span", 200, "word")
+    text = html22text(block * 40, max_depth=32)
+    assert text.split() == ["word"] * 40
+
+
+def test_max_depth_flattens_deep_content() -> None:
+    """Test that content below the depth limit becomes running text."""
+    html_content = "<div><div><p>a <b>b</b></p><p>c<br>d</p></div></div>"
+    assert html22text(html_content, markdown=True) == "a **b**\n\nc  \nd\n"
+    assert html22text(html_content, markdown=True, max_depth=2) == "a b c  \nd\n"
+    assert html22text(html_content, markdown=True, max_depth=4) == (
+        html22text(html_content, markdown=True)
+    )
+
+
+def test_max_depth_bounds_list_indentation() -> None:
+    """Test that flattening keeps the output of deep lists small."""
+    text = html22text(_nested("ul li", 5000, "item"), max_depth=16)
+    assert text.strip() == "item"
+    assert len(text) < 100
+
+
+def test_max_depth_leaves_out_scripts_and_styles() -> None:
+    """Test that flattening drops the content the renderer leaves out."""
+    html_content = (
+        "<div><div><p>a<script>var x = 1 < 2;</script>"
+        "<style>p { color: red }</style><!-- note --> b</p></div></div>"
+    )
+    assert html22text(html_content, max_depth=1) == "a b\n"
+    assert html22text(html_content, max_depth=1) == html22text(html_content)
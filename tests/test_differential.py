@@ -0,0 +1,82 @@
+# this_file: tests/test_differential.py
+
+"""Test that the optimized code paths match the reference implementation."""
+
+import random
+from typing import Any
+
+from html22text import html22text
+from tests.differential import (
+    OPTION_SETS,
+    _each,
+    compare,
+    fixture_documents,
+    generate_corpus,
+    generate_html,
+    is_known_divergence,
+    kills_inside_marks,
+    main,
+)
+
+
+def test_pipelines_match_reference() -> None:
+    """The fixtures and a random corpus convert exactly as in the reference."""
+    documents = fixture_documents()
+    documents.update(generate_corpus(30, seed=1))
+    divergences, _ = compare(documents)
+    assert divergences == []
+
+
+def test_divergences_are_reported() -> None:
+    """A pipeline that changes one byte is reported at that byte."""
+
+    def broken(documents: list[str], **options: Any) -> list[str]:
+        return [html22text(html_content, **options) + "!" for html_content in documents]
+
+    documents = {"doc": "<p>Hi</p>"}
+    divergences, known = compare(documents, {"broken": broken}, [{}])
+    assert known == 0
+    assert [(d.pipeline, d.document, d.offset) for d in divergences] == [
+        ("broken", "doc", len("Hi\n"))
+    ]
+    assert OPTION_SETS[0] == {}
+
+
+def test_generator_is_seeded() -> None:
+    """The same seed gives the same corpus."""
+    assert generate_corpus(5, seed=3) == generate_corpus(5, seed=3)
+    assert generate_html(random.Random(1)) != generate_html(random.Random(2))
+
+
+def test_known_divergence() -> None:
+    """Nested tables are known, kill_tags reaching into <mark> or <kbd> checked."""
+    html_content = "<p><mark>a <b>b</b></mark> <b>c</b></p>"
+    assert kills_inside_marks(html_content, {"kill_tags": "b"})
+    assert not kills_inside_marks("<p>a <b>b</b></p>", {"kill_tags": "b"})
+    assert not kills_inside_marks(html_content, {"markdown": True})
+    assert not is_known_divergence(html_content, {"kill_tags": "b"})
+    assert is_known_divergence("<table>", {"markdown": True}, "<raised IndexError>")
+
+    documents = {"doc": html_content}
+    divergences, known = compare(
+        documents, {"html22text": _each(html22text)}, [{"kill_tags": "b"}]
+    )
+    assert (divergences, known) == ([], 1)
+
+
+def test_divergences_inside_marks_are_reported() -> None:
+    """A document where kill_tags reach into <mark> is still compared."""
+
+    def broken(documents: list[str], **options: Any) -> list[str]:
+        return [html22text(html_content, **options) + "!" for html_content in documents]
+
+    documents = {"doc": "<p><mark>a <b>b</b></mark> <b>c</b></p>"}
+    divergences, known = compare(documents, {"broken": broken}, [{"kill_tags": "b"}])
+    assert known == 0
+    assert [d.pipeline for d in divergences] == ["broken"]
+
+
+def test_check_mode_exits_on_divergence(capsys: Any) -> None:
+    """The check mode passes on the current code and prints a summary."""
+    main(docs=5, fixtures=False, check=True)
+    assert "0 divergences" in capsys.readouterr().out
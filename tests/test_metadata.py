@@ -0,0 +1,56 @@
+# this_file: tests/test_metadata.py
+
+"""Test metadata extraction without conversion."""
+
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from html22text import extract_metadata
+from html22text.html22text import prep_doc
+
+SAMPLE = Path(__file__).parent.parent / "sample1.html"
+
+DOCS = [
+    SAMPLE.read_text(encoding="utf-8"),
+    "<title> A &amp;\n B </title><h2>One <b>two</b></h2><h3>Three",
+    (
+        '<a href="x.html">x</a><a href="#top">t</a><a href>e</a><a href="y.htm#s">y</a>'
+        '<a href="http://e.com/z.html">z</a><img src="i.png"><script src="/s.js">'
+        '</script><link rel="icon" href="f.ico"><svg><title>inner</title></svg>'
+    ),
+]
+
+
+@pytest.mark.parametrize("html_content", DOCS)
+def test_metadata_matches_soup(html_content: str) -> None:
+    """Links, assets, title and headings match a full parse with prep_doc."""
+    base_url = "http://example.com/docs/"
+    metadata = extract_metadata(html_content, base_url, "md")
+
+    links: list[str] = []
+    soup = prep_doc(BeautifulSoup(html_content, "html.parser"), base_url, "md", links)
+    assert [href for href, _ in metadata.links] == links
+    rewritten = [tag["href"] for tag in soup.find_all("a", href=True)]
+    assert all(new_href in rewritten for _, new_href in metadata.links)
+    assets = [tag["href"] for tag in soup.find_all("link", href=True)]
+    assets += [tag["src"] for tag in soup.find_all(src=True)]
+    assert sorted(metadata.assets) == sorted(assets)
+    title = soup.title.get_text() if soup.title else ""
+    assert metadata.title == " ".join(title.split())
+    headings = soup.find_all(["h1", "h2", "h3", "h4", "h5", "h6"])
+    assert metadata.headings == tuple(
+        (int(tag.name[1]), " ".join(tag.get_text().split())) for tag in headings
+    )
+
+
+def test_metadata_of_file(tmp_path: Path) -> None:
+    """Files are read with is_input_path."""
+    path = tmp_path / "page.html"
+    path.write_text('<title>T</title><h1>H</h1><a href="b.html">b</a>', "utf-8")
+    metadata = extract_metadata(str(path), is_input_path=True)
+    assert metadata.title == "T"
+    assert metadata.links == (("b.html", "b.txt"),)
+    assert metadata.assets == ()
+    assert metadata.headings == ((1, "H"),)
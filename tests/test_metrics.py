@@ -0,0 +1,80 @@
+# this_file: tests/test_metrics.py
+
+"""Test the Prometheus metrics of the long-lived modes."""
+
+import urllib.request
+from pathlib import Path
+
+from html22text.batch import batch_convert
+from html22text.metrics import Metrics, exporting
+from html22text.watch import Watcher
+
+
+def test_render_counters_and_histograms() -> None:
+    """Counters, labels and histogram buckets follow the text format."""
+    metrics = Metrics()
+    metrics.record_document(100, 40, {"parse": 0.002, "render": 0.003}, (1, 5, 2))
+    metrics.record_document(50, 20, {"parse": 0.2, "render": 0.1}, (1, 9, 2))
+    metrics.record_failure("error", 'Value"Error')
+
+    text = metrics.render()
+    assert "# TYPE html22text_documents_total counter" in text
+    assert 'html22text_documents_total{status="ok"} 2' in text
+    assert 'html22text_documents_total{status="error"} 1' in text
+    assert "html22text_bytes_in_total 150" in text
+    assert 'html22text_errors_total{type="Value\\"Error"} 1' in text
+    # Cache counts are absolute per process, so the last report wins
+    assert 'html22text_cache_hits_total{cache="renderer_settings"} 9' in text
+    assert 'html22text_cache_misses_total{cache="renderer_settings"} 2' in text
+    assert "# TYPE html22text_stage_seconds histogram" in text
+    assert 'html22text_stage_seconds_bucket{stage="parse",le="0.0025"} 1' in text
+    assert 'html22text_stage_seconds_bucket{stage="parse",le="+Inf"} 2' in text
+    assert 'html22text_stage_seconds_count{stage="render"} 2' in text
+    assert 'html22text_document_seconds_bucket{le="0.005"} 1' in text
+
+
+def test_exporting_to_file_and_endpoint(tmp_path: Path) -> None:
+    """Metrics are served over HTTP and dumped to a file on exit."""
+    metrics = Metrics()
+    path = tmp_path / "html22text.prom"
+    with exporting(metrics, str(path)) as update:
+        metrics.record_failure("timeout", "timeout")
+        update()
+        server = metrics.serve(0)
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read().decode("utf-8")
+        server.shutdown()
+        server.server_close()
+    assert 'html22text_errors_total{type="timeout"} 1' in body
+    assert path.read_text(encoding="utf-8") == metrics.render()
+
+
+def test_batch_metrics(tmp_path: Path) -> None:
+    """A batch records its documents, bytes and stage latencies."""
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.html").write_text("<p>A</p>", encoding="utf-8")
+    (src / "b.html").write_text("<p>Bb</p>", encoding="utf-8")
+    path = tmp_path / "batch.prom"
+
+    batch_convert(str(src), str(tmp_path / "out"), jobs=2, metrics=str(path))
+
+    text = path.read_text(encoding="utf-8")
+    assert 'html22text_documents_total{status="ok"} 2' in text
+    assert "html22text_bytes_in_total 17" in text
+    for stage in ("parse", "rewrite", "serialize", "render"):
+        assert f'html22text_stage_seconds_count{{stage="{stage}"}} 2' in text
+
+
+def test_watcher_records_failures(tmp_path: Path) -> None:
+    """A failing document is counted by exception type and skipped."""
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "a.html").write_text("<p>A</p>", encoding="utf-8")
+    watcher = Watcher(str(src), str(tmp_path / "out"), kill_tags="p[")
+
+    assert watcher.sync() == []
+    text = watcher.metrics.render()
+    assert 'html22text_documents_total{status="error"} 1' in text
+    assert 'html22text_errors_total{type="SelectorSyntaxError"} 1' in text
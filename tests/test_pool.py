@@ -0,0 +1,79 @@
+# this_file: tests/test_pool.py
+
+"""Test the process pool with per-task time budgets."""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from html22text.batch import batch_convert
+from html22text.pool import ProcessPool, TaskFailed
+
+
+def _work(task: tuple[str, float]) -> tuple[str, int]:
+    """Sleeps or raises depending on the task, returns the worker PID."""
+    kind, seconds = task
+    if kind == "raise":
+        error_message = "bad page"
+        raise ValueError(error_message)
+    if kind == "oom":
+        error_message = "out of memory"
+        raise MemoryError(error_message)
+    time.sleep(seconds)
+    return kind, os.getpid()
+
+
+def test_pool_results_and_errors() -> None:
+    """Test that results come back and exceptions become TaskFailed."""
+    tasks = [("ok", 0.0), ("raise", 0.0), ("ok", 0.0)]
+    outcomes = dict(ProcessPool(_work, 2).imap_unordered(tasks))
+    assert outcomes[("raise", 0.0)] == TaskFailed("error", "ValueError: bad page")
+    assert outcomes[("ok", 0.0)][0] == "ok"
+
+
+def test_pool_timeout_kills_and_replaces_worker() -> None:
+    """Test that an overdue task fails without holding up the others."""
+    tasks = [("slow", 30.0), *[(f"ok{i}", 0.0) for i in range(4)]]
+    started = time.monotonic()
+    outcomes = dict(ProcessPool(_work, 1, timeout=0.5).imap_unordered(tasks))
+    assert time.monotonic() - started < 10
+    assert outcomes[("slow", 30.0)].status == "timeout"
+    assert {outcomes[(f"ok{i}", 0.0)][0] for i in range(4)} == {
+        f"ok{i}" for i in range(4)
+    }
+
+
+def test_pool_recycles_workers() -> None:
+    """Test that workers are replaced after max_tasks tasks."""
+    tasks = [(f"ok{i}", 0.0) for i in range(6)]
+    outcomes = ProcessPool(_work, 1, max_tasks=2).imap_unordered(tasks)
+    pids = {pid for _, (_, pid) in outcomes}
+    assert len(pids) == 3
+
+
+def test_pool_replaces_worker_after_memory_error() -> None:
+    """Test that a worker that ran out of memory is not reused."""
+    tasks = [("before", 0.0), ("oom", 0.0), ("after", 0.0)]
+    outcomes = dict(ProcessPool(_work, 1).imap_unordered(tasks))
+    assert outcomes[("oom", 0.0)] == TaskFailed("error", "MemoryError: out of memory")
+    assert outcomes[("before", 0.0)][1] != outcomes[("after", 0.0)][1]
+
+
+def test_batch_records_failures_in_manifest(tmp_path: Path) -> None:
+    """Test that documents over budget are recorded, not written."""
+    src = tmp_path / "site"
+    src.mkdir()
+    (src / "index.html").write_text("<p>Hello</p>", encoding="utf-8")
+    manifest = tmp_path / "manifest.jsonl"
+    converted = batch_convert(
+        str(src), str(tmp_path / "out"), jobs=1, manifest=str(manifest), timeout=1e-9
+    )
+    assert converted == 0
+    assert not (tmp_path / "out" / "index.txt").exists()
+    record = json.loads(manifest.read_text(encoding="utf-8"))
+    assert record == {
+        "source": "index.html",
+        "status": "timeout",
+        "error": "Exceeded 1e-09 s",
+    }
@@ -0,0 +1,106 @@
+# this_file: tests/test_presets.py
+
+"""Test conversion option presets."""
+
+import dataclasses
+import pickle
+from pathlib import Path
+
+import pytest
+
+from html22text import Options, html22text, load_presets
+from html22text.batch import batch_convert
+from html22text.html22text import _renderer, _renderer_settings
+from html22text.presets import PRESETS, resolve_options
+
+HTML = '<h1>Title</h1><p>Some <b>bold</b> text, <a href="b.html">a link</a>.</p>'
+
+PRESET_TOML = """
+[docs]
+markdown = true
+kill_tags = "nav"
+
+[plain]
+open_quote = "«"
+close_quote = "»"
+"""
+
+
+def test_options_are_frozen_hashable_and_small() -> None:
+    """Test that Options can serve as a cache key and cheap task payload."""
+    options = Options(markdown=True)
+    assert options == Options(markdown=True)
+    assert hash(options) == hash(Options(markdown=True))
+    assert not hasattr(options, "__dict__")
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        options.markdown = False  # type: ignore[misc]
+    assert pickle.loads(pickle.dumps(options)) == options
+    assert len(pickle.dumps(options)) < 400
+
+
+def test_options_convert_matches_html22text() -> None:
+    """Test that converting with Options equals calling html22text()."""
+    for options in [Options(), Options(markdown=True, file_ext_override="htm")]:
+        assert options.convert(HTML) == html22text(HTML, **options.as_kwargs())
+    assert Options(markdown=True).file_ext == "md"
+    assert Options(file_ext_override="rst").file_ext == "rst"
+
+
+def test_renderer_settings_are_memoized() -> None:
+    """Test that renderer settings are cached per Options."""
+    _renderer_settings.cache_clear()
+    for _ in range(3):
+        _renderer(Options(markdown=True))
+    _renderer(Options(markdown=True, base_url="https://example.com/"))
+    info = _renderer_settings.cache_info()
+    assert (info.misses, info.hits) == (1, 3)
+
+
+def test_load_presets(tmp_path: Path) -> None:
+    """Test loading presets from TOML."""
+    preset_file = tmp_path / "presets.toml"
+    preset_file.write_text(PRESET_TOML, encoding="utf-8")
+    presets = load_presets(str(preset_file))
+    assert presets["docs"] == Options(markdown=True, kill_tags="nav")
+    assert presets["plain"].open_quote == "«"
+
+
+@pytest.mark.parametrize(
+    "content", ["markdown = true\n", '[bad]\nmarkdown = true\ncolour = "red"\n']
+)
+def test_load_presets_rejects_invalid(tmp_path: Path, content: str) -> None:
+    """Test that non-table presets and unknown options are rejected."""
+    preset_file = tmp_path / "presets.toml"
+    preset_file.write_text(content, encoding="utf-8")
+    with pytest.raises(ValueError, match="preset"):
+        load_presets(str(preset_file))
+
+
+def test_resolve_options(tmp_path: Path) -> None:
+    """Test that explicit options override the preset."""
+    preset_file = tmp_path / "presets.toml"
+    preset_file.write_text(PRESET_TOML, encoding="utf-8")
+    assert resolve_options("markdown") == PRESETS["markdown"]
+    assert resolve_options(markdown=True) == Options(markdown=True)
+    assert resolve_options("docs", str(preset_file), kill_tags=None) == Options(
+        markdown=True
+    )
+    with pytest.raises(ValueError, match="Unknown preset"):
+        resolve_options("docs")
+
+
+def test_batch_with_preset(tmp_path: Path) -> None:
+    """Test that worker processes convert with the preset they were given."""
+    src = tmp_path / "site"
+    src.mkdir()
+    for name in ["a.html", "b.html", "c.html"]:
+        (src / name).write_text(HTML, encoding="utf-8")
+    preset_file = tmp_path / "presets.toml"
+    preset_file.write_text(PRESET_TOML, encoding="utf-8")
+    out = tmp_path / "out"
+    converted = batch_convert(
+        str(src), str(out), jobs=2, preset="docs", preset_file=str(preset_file)
+    )
+    assert converted == 3
+    expected = html22text(HTML, markdown=True, kill_tags="nav")
+    assert (out / "b.md").read_text(encoding="utf-8") == expected
@@ -0,0 +1,71 @@
+# this_file: tests/test_preview.py
+
+"""Test previews converted from a prefix of the document."""
+
+from pathlib import Path
+
+import pytest
+
+from html22text import html22text, preview
+from html22text.chunking import _iter_blocks
+
+SECTIONS = 2000
+DOC = (
+    "<html><body>"
+    + "".join(
+        f"<h2>S{i}</h2><p>Para {i} {'word ' * 30}<b>bold</b></p>"
+        f"<ul><li>x</li><li>y</li></ul>"
+        for i in range(SECTIONS)
+    )
+    + "</body></html>"
+)
+
+
+def _expected(html_content: str, max_chars: int, max_blocks: int) -> str:
+    """Cuts the full conversion down the way `preview()` documents."""
+    blocks = list(_iter_blocks(html22text(html_content).split("\n")))
+    text = "\n\n".join(blocks[:max_blocks] if max_blocks else blocks)
+    if max_chars and len(text) > max_chars:
+        cut = max(text.rfind("\n", 0, max_chars + 1), text.rfind(" ", 0, max_chars + 1))
+        text = text[: cut if cut > 0 else max_chars]
+    return text.rstrip()
+
+
+@pytest.mark.parametrize("max_chars", [0, 1, 40, 500, 5000])
+@pytest.mark.parametrize("max_blocks", [0, 1, 4])
+def test_preview_matches_full_conversion(max_chars: int, max_blocks: int) -> None:
+    """A preview is the beginning of the full output."""
+    if not max_chars and not max_blocks:
+        return
+    html_content = DOC[:60_000] + "</p></body></html>"
+    got = preview(html_content, max_chars, max_blocks)
+    assert got == _expected(html_content, max_chars, max_blocks)
+
+
+def test_preview_of_short_document() -> None:
+    """A document shorter than the limit is returned whole."""
+    assert preview("<h1>T</h1><p>a</p>", 100) == "# T\n\na"
+    assert preview("<p>A</p>", 100, markdown=True) == "A"
+
+
+def test_preview_with_selector() -> None:
+    """The selected element is found and previewed without the rest."""
+    assert preview(DOC, 50, selector="ul") == "   x\n   y"
+    assert preview(DOC, 20, selector="p") == "Para 0 word word"
+
+
+def test_preview_reads_only_a_prefix(tmp_path: Path) -> None:
+    """Files are read only as far as the preview needs."""
+    path = tmp_path / "big.html"
+    path.write_bytes(DOC.encode("utf-8") + b"\xff" * 10)
+    assert (
+        preview(str(path), 30, is_input_path=True) == "## S0\n\nPara 0 word word word"
+    )
+    with pytest.raises(UnicodeDecodeError):
+        html22text(str(path), is_input_path=True)
+
+
+def test_preview_needs_a_limit() -> None:
+    """At least one limit must be positive."""
+    with pytest.raises(ValueError, match="must be positive"):
+        preview(DOC, 0)
@@ -0,0 +1,62 @@
+# this_file: tests/test_profiling.py
+
+"""Test the profiling report behind `html22text --profile`."""
+
+import importlib
+import pstats
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from html22text import Options, html22text
+from html22text.html22text import _serialize
+from html22text.profiling import STAGES, _run_stages, profile_conversion
+
+
+def test_profile_report_lists_stages(tmp_path: Path) -> None:
+    """Test that the report covers every stage and dumps a loadable profile."""
+    dump = tmp_path / "run.pstats"
+    report = profile_conversion(
+        "<h1>Title</h1><p>Some <b>text</b></p>",
+        top=5,
+        pstats_path=str(dump),
+        markdown=True,
+    )
+
+    for stage in (*STAGES, "total"):
+        assert f"\n{stage} " in f"\n{report}"
+    assert "cumulative" in report
+    assert pstats.Stats(str(dump)).get_stats_profile().func_profiles
+
+
+def test_profile_reads_input_path(tmp_path: Path) -> None:
+    """Test that `is_input_path` is honored like in `html22text()`."""
+    page = tmp_path / "page.html"
+    page.write_text("<p>From a file</p>", encoding="utf-8")
+
+    report = profile_conversion(str(page), is_input_path=True)
+
+    assert "render" in report
+
+
+def test_stages_render_verbatim_blocks(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that the stages serialize like `html22text()`, with verbatim blocks."""
+    profiling = importlib.import_module("html22text.profiling")
+    verbatim_lists: list[list[str] | None] = []
+
+    def spy(*args: Any) -> str:
+        verbatim_lists.append(args[3])
+        return _serialize(*args)
+
+    monkeypatch.setattr(profiling, "_serialize", spy)
+    code = "\n".join(f"if (a &lt; {line}) {{ b(); }}" for line in range(50))
+    html_content = f"<p>Code:</p><pre><code>{code}</code></pre>"
+    stages: list[str] = []
+
+    text = _run_stages(html_content, Options(markdown=True), None, stages.append)
+
+    assert text == html22text(html_content, markdown=True)
+    assert stages == list(STAGES)
+    assert verbatim_lists[0] is not None
+    assert len(verbatim_lists[0]) == 1
@@ -0,0 +1,66 @@
+# this_file: tests/test_renderer_pool.py
+
+"""Test the per-thread pool of configured renderers."""
+
+import threading
+
+import pytest
+from html2text import HTML2Text
+
+from html22text import Options
+from html22text.html22text import _pooled_renderer, _renderer
+
+DOCS = [
+    "<h1>T</h1><ol><li>a<ul><li>b</li></ul></li></ol><a href='x.html'>x</a>",
+    "<p>Plain <b>text</b></p><pre>  code\n</pre>",
+    "<blockquote><table><tr><th>h</th></tr><tr><td>c</td></tr></table></blockquote>",
+]
+
+
+def test_renderer_is_reused_and_reset() -> None:
+    """The same renderer is lent again, and gives the output of a fresh one."""
+    options = Options(markdown=True)
+    expected = [_renderer(options).handle(html_content) for html_content in DOCS]
+    with _pooled_renderer(options) as first:
+        pass
+    for _ in range(2):
+        for html_content, text in zip(DOCS, expected, strict=True):
+            with _pooled_renderer(options) as h:
+                assert h is first
+                assert h.handle(html_content) == text
+
+
+def test_renderer_is_reset_after_an_error() -> None:
+    """A renderer abandoned mid-document is reset before it is lent again."""
+    options = Options(markdown=True)
+    lent: list[HTML2Text] = []
+
+    def abandon() -> None:
+        with _pooled_renderer(options) as h:
+            lent.append(h)
+            h.feed("<ul><li><b>open")
+            raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        abandon()
+    with _pooled_renderer(options) as again:
+        assert again is lent[0]
+        assert again.handle(DOCS[0]) == _renderer(options).handle(DOCS[0])
+
+
+def test_renderers_are_not_shared() -> None:
+    """Nested conversions and other threads get renderers of their own."""
+    options = Options()
+    with _pooled_renderer(options) as outer, _pooled_renderer(options) as inner:
+        assert outer is not inner
+
+    seen = []
+
+    def lend() -> None:
+        with _pooled_renderer(options) as h:
+            seen.append(h)
+
+    thread = threading.Thread(target=lend)
+    thread.start()
+    thread.join()
+    assert seen[0] not in (outer, inner)
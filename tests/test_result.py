@@ -0,0 +1,73 @@
+# this_file: tests/test_result.py
+
+"""Test conversion results with links, assets, timings and lazy fields."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from html22text import ConversionResult, Metadata, convert_result, html22text, metadata
+from html22text import result as result_module
+
+HTML = (
+    "<html><head><title> Guide  page </title>"
+    '<link rel="stylesheet" href="style.css"></head>'
+    '<body><h1>Guide</h1><p>See <a href="docs/intro.html">the intro</a> and '
+    '<a href="https://example.com/">home</a>.</p><img src="shot.png" alt="Shot">'
+    "<h2>Next</h2></body></html>"
+)
+
+
+@pytest.mark.parametrize("markdown", [False, True])
+def test_result_matches_html22text(markdown: bool) -> None:
+    """The text is that of html22text(), with the links and assets it rewrote."""
+    result = convert_result(HTML, markdown=markdown, base_url="https://x.org/")
+    assert (
+        result.text
+        == str(result)
+        == html22text(HTML, markdown=markdown, base_url="https://x.org/")
+    )
+    assert result.links == ("docs/intro.html",)
+    assert result.assets == ("https://x.org/style.css", "https://x.org/shot.png")
+    assert list(result.timings) == ["parse", "rewrite", "serialize", "render"]
+
+
+def test_lazy_fields(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Words, title and headings are computed once, when first read."""
+    calls = []
+
+    def extract_metadata(*args: Any) -> Metadata:
+        calls.append(args)
+        return metadata.extract_metadata(*args)
+
+    monkeypatch.setattr(result_module, "extract_metadata", extract_metadata)
+    path = tmp_path / "guide.html"
+    path.write_text(HTML, encoding="utf-8")
+    links: list[str] = []
+    result = convert_result(str(path), is_input_path=True, links=links)
+    assert links == ["docs/intro.html"]
+    assert result.words == len(result.text.split())
+    assert not calls
+    assert result.title == "Guide page"
+    assert result.headings == ((1, "Guide"), (2, "Next"))
+    assert result.metadata.links == (("docs/intro.html", "docs/intro.txt"),)
+    assert len(calls) == 1
+
+
+def test_result_has_slots() -> None:
+    """Results have no instance dict."""
+    assert not hasattr(convert_result("<p>a</p>"), "__dict__")
+    assert "text" in ConversionResult.__slots__
+
+
+def test_metadata_ignores_selector() -> None:
+    """The text comes from the selected part, the metadata from the whole input."""
+    result = convert_result(HTML, selector="p")
+    assert result.text == html22text(HTML, selector="p")
+    assert "Guide" not in result.text
+    assert result.links == ("docs/intro.html",)
+    assert result.assets == ()
+    assert result.title == "Guide page"
+    assert result.headings == ((1, "Guide"), (2, "Next"))
+    assert result.metadata.assets == ("style.css", "shot.png")
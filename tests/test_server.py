@@ -0,0 +1,110 @@
+# this_file: tests/test_server.py
+
+"""Test the conversion server and its thin client."""
+
+import os
+import subprocess
+import sys
+import time
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from html22text import html22text
+from html22text_client import SERVER_ENV, SOCKET_ENV, control
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, "fork"), reason="The server needs fork and Unix sockets"
+)
+
+SRC = Path(__file__).parent.parent / "src"
+HTML = "<h1>Title</h1><p>Some <b>bold</b> text.</p>"
+
+
+@pytest.fixture
+def env(tmp_path: Path) -> Iterator[dict[str, str]]:
+    """Environment of clients that use a server on a socket of their own."""
+    environment = {
+        **os.environ,
+        "PYTHONPATH": str(SRC),
+        SOCKET_ENV: str(tmp_path / "server.sock"),
+        SERVER_ENV: "1",
+    }
+    yield environment
+    control("stop", environment[SOCKET_ENV])
+
+
+def _client(
+    env: dict[str, str], *args: str, **kwargs: Any
+) -> subprocess.CompletedProcess[str]:
+    command = [sys.executable, "-c", "from html22text_client import main; main()"]
+    return subprocess.run(
+        [*command, *args],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=False,
+        **kwargs,
+    )
+
+
+def test_requests_share_one_server(env: dict[str, str]) -> None:
+    """Outputs match in-process conversions, from a server started once."""
+    for _ in range(2):
+        result = _client(env, HTML, "--markdown")
+        assert result.returncode == 0
+        assert result.stdout == html22text(HTML, markdown=True) + "\n"
+    status = control("status", env[SOCKET_ENV])
+    assert status is not None
+    assert status["requests"] == 2
+    assert status["failures"] == 0
+
+
+def test_requests_use_client_environment(env: dict[str, str]) -> None:
+    """Requests run with the environment and encodings of their client."""
+    assert _client(env, HTML).returncode == 0  # Starts the server
+    html_content = "<p>Caf\u00e9 \u2013 <b>bold</b></p>"
+    latin = {**env, "PYTHONIOENCODING": "latin-1:replace", "TZ": "UTC"}
+    result = _client(latin, html_content, encoding="latin-1")
+    assert result.returncode == 0
+    assert result.stdout == html22text(html_content).replace("\u2013", "?") + "\n"
+
+
+def test_stdin_working_directory_and_errors(
+    env: dict[str, str], tmp_path: Path
+) -> None:
+    """Requests read the client's stdin and files, and report failures."""
+    (tmp_path / "page.html").write_text(HTML, encoding="utf-8")
+    result = _client(env, "page.html", "--is_input_path", cwd=tmp_path)
+    assert result.stdout == html22text(HTML) + "\n"
+    result = _client(env, "-", "-o", "-", input=HTML)
+    assert result.stdout == html22text(HTML)
+
+    result = _client(env, HTML, "--tag_rules", "{b: ' '}")
+    assert result.returncode != 0
+    assert "Invalid rule for <b>" in result.stderr
+    status = control("status", env[SOCKET_ENV])
+    assert status is not None
+    assert status["failures"] == 1
+
+
+def test_idle_server_exits(env: dict[str, str]) -> None:
+    """A server without requests exits and removes its socket."""
+    env["HTML22TEXT_SERVER_IDLE"] = "0.2"
+    assert _client(env, HTML).returncode == 0
+    deadline = time.monotonic() + 10
+    while Path(env[SOCKET_ENV]).exists() and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert not Path(env[SOCKET_ENV]).exists()
+    assert control("status", env[SOCKET_ENV]) is None
+
+
+def test_runs_in_process_without_server(env: dict[str, str]) -> None:
+    """If no server can be reached, the command runs in the client."""
+    # Longer than a socket path can be
+    too_long = {**env, SOCKET_ENV: str(Path(env[SOCKET_ENV]).parent / ("x" * 200))}
+    result = _client(too_long, "-", "--markdown", input=HTML)
+    assert result.returncode == 0
+    assert result.stdout == html22text(HTML, markdown=True) + "\n"
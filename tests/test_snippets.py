@@ -0,0 +1,48 @@
+# this_file: tests/test_snippets.py
+
+"""Test batch conversion of short HTML snippets."""
+
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from html22text import convert_snippets, html22text
+
+SNIPPETS = [
+    "Thanks, see you <b>tomorrow</b>!",
+    "<p>Notes are <a href='notes.html'>here</a> &amp; <mark>there</mark>.</p>",
+    "<HTML><body><p>Upper</p></body></HTML><p>after</p>",
+    "<html><nav>n</nav><p>x</p></html>",
+    "",
+    "<ul><li>a</li><li><kbd>b</kbd></li></ul>",
+]
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"markdown": True}, {"selector": "p"}, {"kill_tags": "nav,b"}],
+)
+def test_snippets_match_single_conversions(options: dict[str, Any]) -> None:
+    """Every snippet converts as it does on its own, with the same links."""
+    links: list[str] = []
+    expected_links: list[str] = []
+    expected = [html22text(s, links=expected_links, **options) for s in SNIPPETS]
+    assert convert_snippets(SNIPPETS, links=links, **options) == expected
+    assert links == expected_links
+
+
+def test_snippets_from_files(tmp_path: Path) -> None:
+    """Snippets can be file paths."""
+    path = tmp_path / "a.html"
+    path.write_text("<p>From <i>file</i></p>", encoding="utf-8")
+    assert convert_snippets([str(path)], is_input_path=True, markdown=True) == [
+        "From _file_\n"
+    ]
+
+
+def test_snippets_validate_options_once() -> None:
+    """Invalid options are rejected even for an empty batch."""
+    with pytest.raises(ValueError, match="Invalid rule"):
+        convert_snippets([], tag_rules={"b": " "})
+    assert convert_snippets(iter([])) == []
@@ -0,0 +1,53 @@
+# this_file: tests/test_stress.py
+
+"""Test that adversarial inputs convert, and how their budgets are checked.
+
+Time, memory and scaling budgets depend on the machine and its load, so
+they are checked by `python -m tests.stress --check` only, not here.
+"""
+
+import pytest
+
+from html22text import html22text
+from html22text.html22text import EXTRACT_TAKES_INDEX
+from tests.stress import CASES, Case, Measurement, over_budget
+
+# Fraction of the full sizes of `tests.stress`, which CI runs in full.
+SCALE = 0.1
+
+
+@pytest.mark.parametrize("case", CASES, ids=[case.name for case in CASES])
+def test_case_converts(case: Case) -> None:
+    """Every case converts to some text at a tenth of its size."""
+    html_content = case.build(max(16, int(case.size * SCALE)))
+    assert html22text(html_content, **case.options).strip()
+
+
+def test_over_budget_lists_exceeded_budgets() -> None:
+    """Each exceeded budget is reported, and none within the budgets."""
+    case = CASES[0]
+    within = Measurement(1000, case.seconds / 2, case.bytes_per_char / 2, 1.0)
+    assert over_budget(case, within) == []
+    over = Measurement(1000, case.seconds * 2, case.bytes_per_char * 2, 2.0)
+    assert [budget.split()[0] for budget in over_budget(case, over)] == [
+        "time",
+        "memory",
+        "exponent",
+    ]
+    assert over_budget(case, within, scale=0.1)[0].startswith("time")
+
+
+def test_many_kill_tags_matches() -> None:
+    """Removing thousands of matching siblings keeps the rest in order."""
+    html_content = "".join(f"<i>x</i><b>{index}</b>" for index in range(3000))
+    expected = "".join(str(index) for index in range(3000)) + "\n"
+    assert html22text(f"<div>{html_content}</div>", kill_tags="i") == expected
+    assert html22text(f"<div>{html_content}</div>", kill_tags="i, b") == "\n"
+
+
+def test_extract_takes_index() -> None:
+    """Beautiful Soup still takes the position that kill_tags relies on."""
+    assert EXTRACT_TAKES_INDEX, (
+        "PageElement.extract() lost its _self_index parameter, so kill_tags "
+        "removes many siblings in quadratic time"
+    )
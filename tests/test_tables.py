@@ -0,0 +1,59 @@
+# this_file: tests/test_tables.py
+
+"""Test table padding and unpadded tables in Markdown."""
+
+import pytest
+
+from html22text import html22text
+from html22text.html22text import _prepare, _reformat_table
+
+TABLES = [
+    (
+        "<table><tr><th>Name</th><th>Qty</th></tr><tr><td>apple</td><td>3</td></tr>"
+        "<tr><td>kiwi</td><td>12</td></tr></table>"
+    ),
+    (
+        "<table><tr><td>no header</td></tr><tr><td>a</td><td>b</td><td>c</td></tr>"
+        "<tr><td colspan='2'>wide</td></tr></table>"
+    ),
+    (
+        "<p>Before</p><table><tr><th>a </th><th> b</th></tr><tr><td>- | -</td>"
+        "<td><b>x</b> <a href='y.html'>y</a></td></tr></table><p>After</p>"
+    ),
+    "<ul><li>Item<table><tr><th>h</th></tr><tr><td>c</td></tr></table></li></ul>",
+    "<blockquote><table><tr><th>q</th><th>r</th></tr></table></blockquote>",
+    "<table></table><table><tr><td></td></tr></table>",
+]
+NESTED = "<table><tr><td><table><tr><td>inner</td></tr></table></td></tr></table>"
+
+
+@pytest.mark.parametrize("html_content", TABLES)
+def test_padding_matches_html2text(html_content: str) -> None:
+    """Padded tables are the same as with `HTML2Text.handle()`."""
+    h, html = _prepare(html_content, markdown=True)
+    assert html22text(html_content, markdown=True) == h.handle(html)
+
+
+def test_separator_and_ragged_rows() -> None:
+    """Rows of any length are padded to the widest cell of each column."""
+    lines = ["a | bb", "---|---", "ccc | d | e ", "f"]
+    assert list(_reformat_table(lines)) == [
+        "| a   | bb |",
+        "|-----|----|",
+        "| ccc | d  | e |",
+        "| f   |",
+    ]
+
+
+def test_nested_tables() -> None:
+    """Nested tables render instead of raising IndexError."""
+    assert "inner" in html22text(NESTED, markdown=True)
+    assert list(_reformat_table([])) == []
+
+
+def test_unpadded_tables() -> None:
+    """Without padding, rows are written as rendered and only Markdown changes."""
+    assert html22text(TABLES[0], markdown=True, pad_tables=False) == (
+        "Name| Qty  \n---|---  \napple| 3  \nkiwi| 12\n"
+    )
+    assert html22text(TABLES[0], pad_tables=False) == html22text(TABLES[0])
@@ -0,0 +1,56 @@
+# this_file: tests/test_tag_rules.py
+
+"""Test tag rules applied while rendering."""
+
+from pathlib import Path
+
+import pytest
+from html2text import HTML2Text
+
+from html22text import Options, html22text, load_presets
+from html22text.html22text import _renderer, _RuleRenderer
+
+HTML = (
+    "<p>Press <kbd>Ctrl </kbd> <kbd>C</kbd>, <mark><b>see</b> <i>this</i></mark>.</p>"
+    "<aside>Ad</aside><section><p>Body</p></section>"
+    "<blockquote>Quoted</blockquote>"
+)
+
+
+def test_default_rules() -> None:
+    """<mark> and <kbd> are rendered as their text, as one piece of text."""
+    assert html22text(HTML) == "Press Ctrl C, see this.\n\nAd\n\nBody\n\n> Quoted\n"
+    assert html22text(HTML, block_quote=True) == (
+        "Press Ctrl C, see this.\n\nAd\n\nBody\n\n“Quoted”\n"
+    )
+    assert html22text(HTML, markdown=True).startswith("Press Ctrl C, see this.")
+
+
+def test_user_rules() -> None:
+    """User rules drop, unwrap, rename tags and override the defaults."""
+    rules = {"aside": "drop", "section": "unwrap", "mark": "keep", "b": "text"}
+    assert html22text(HTML, markdown=True, tag_rules=rules) == (
+        "Press Ctrl C, see _this_.\n\nBody\n\n> Quoted\n"
+    )
+    assert html22text("<x-note>n</x-note>", tag_rules={"x-note": "p q"}) == "“n”\n"
+
+
+def test_no_rules_use_stock_renderer() -> None:
+    """Without any rules the stock renderer is used, which shows <kbd> as code."""
+    assert isinstance(_renderer(Options()), _RuleRenderer)
+    options = Options(tag_rules={"mark": "keep", "kbd": "keep"})
+    assert type(_renderer(options)) is HTML2Text
+    assert html22text("<kbd>a</kbd>", tag_rules={"kbd": "keep"}) == "`a`\n"
+
+
+def test_rules_are_normalized_and_validated(tmp_path: Path) -> None:
+    """Mappings and pairs compare equal, and invalid rules are rejected."""
+    options = Options(tag_rules={"b": "drop", "a": "text"})
+    assert options == Options(tag_rules=(("a", "text"), ("b", "drop")))
+    assert hash(options) == hash(Options(tag_rules={"a": "text", "b": "drop"}))
+    with pytest.raises(ValueError, match="Invalid rule for <b>"):
+        Options(tag_rules={"b": " "})
+
+    path = tmp_path / "presets.toml"
+    path.write_text('[clean.tag_rules]\naside = "drop"\n', encoding="utf-8")
+    assert load_presets(str(path))["clean"] == Options(tag_rules={"aside": "drop"})
@@ -0,0 +1,81 @@
+# this_file: tests/test_threads.py
+
+"""Test concurrent use of the conversion API from many threads."""
+
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import fire
+import pytest
+
+from html22text import Options, chunks, html22text
+from html22text.__main__ import cli
+from html22text.batch import batch_convert
+
+SAMPLE = Path(__file__).parent.parent / "sample1.html"
+
+VARIANTS = [
+    Options(),
+    Options(markdown=True),
+    Options(markdown=True, base_url="https://example.com/docs/", max_depth=8),
+    Options(block_quote=True, open_quote="«", close_quote="»"),
+    Options(kill_tags="table,code", kill_images=True),
+]
+
+
+def test_concurrent_conversions_match_serial() -> None:
+    """Test that conversions with mixed options do not interfere."""
+    html_content = SAMPLE.read_text(encoding="utf-8")
+    expected = [options.convert(html_content) for options in VARIANTS]
+    tasks = [i % len(VARIANTS) for i in range(100)]
+
+    def convert(index: int) -> tuple[int, str, str]:
+        options = VARIANTS[index]
+        joined = "\n\n".join(chunk.text for chunk in chunks(html_content, 500))
+        return index, html22text(html_content, **options.as_kwargs()), joined
+
+    with ThreadPoolExecutor(8) as executor:
+        results = list(executor.map(convert, tasks))
+    joined_expected = "\n\n".join(chunk.text for chunk in chunks(html_content, 500))
+    for index, text, joined in results:
+        assert text == expected[index]
+        assert joined == joined_expected
+
+
+def test_threaded_batch_matches_inline(tmp_path: Path) -> None:
+    """Test that the threaded batch mode writes the same outputs."""
+    src = tmp_path / "site"
+    src.mkdir()
+    for i in range(20):
+        (src / f"page{i}.html").write_text(
+            f"<h1>Page {i}</h1><p>See <a href='page{i + 1}.html'>next</a></p>",
+            encoding="utf-8",
+        )
+    assert batch_convert(str(src), str(tmp_path / "inline"), jobs=1, markdown=True)
+    converted = batch_convert(
+        str(src), str(tmp_path / "threads"), jobs=4, threads=True, markdown=True
+    )
+    assert converted == 20
+    for i in range(20):
+        name = f"page{i}.md"
+        assert (tmp_path / "threads" / name).read_bytes() == (
+            tmp_path / "inline" / name
+        ).read_bytes()
+
+
+def test_threaded_batch_rejects_budgets(tmp_path: Path) -> None:
+    """Test that budgets, which need processes, are refused with threads."""
+    with pytest.raises(ValueError, match="threads"):
+        batch_convert(str(tmp_path), str(tmp_path / "out"), threads=True, timeout=1)
+
+
+def test_cli_restores_fire_display(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that the CLI does not leave its Fire display patch behind."""
+    display = fire.core.Display
+    monkeypatch.setattr(sys, "argv", ["html22text", "<p>Hello</p>"])
+    cli()
+    assert capsys.readouterr().out == "Hello\n\n"
+    assert fire.core.Display is display
@@ -0,0 +1,61 @@
+# this_file: tests/test_verbatim.py
+
+"""Test that large <pre> blocks are passed to the renderer verbatim."""
+
+import pytest
+
+from html22text import Options, html22text
+from html22text.html22text import (
+    VERBATIM_SIZE,
+    _prepare_html,
+    _render,
+    _renderer,
+)
+
+CODE = "\n".join(
+    f"  if (a[{index}] &lt; b &amp;&amp; c &gt; d) {{ s = &quot;&#233;&nbsp;&quot;; }}"
+    for index in range(12)
+)
+DOCS = [
+    f"<h1>Code</h1><pre>{CODE}</pre><p>After</p>",
+    f"<p>Before</p><pre><code>\n{CODE}\n</code></pre>",
+    f"<ul><li>Item<pre>\n&#32;{CODE}</pre></li><li>Next</li></ul>",
+    f"<blockquote><pre><code>&lt;{CODE}</code></pre></blockquote>",
+    f"<table><tr><th>h</th></tr><tr><td><pre>{CODE}</pre></td></tr></table>",
+    f"<pre><span>x</span>{CODE}</pre><pre>short &amp; sweet</pre>",
+    f"<b>Bold</b><pre> {CODE} </pre><i>it</i>",
+    f"<pre>&#xE000;0&#xe001; {CODE}</pre>",
+    f"<p><b><pre>  &lt;{CODE}</pre></b><em>x</em><mark><pre>{CODE}</pre></mark></p>",
+]
+
+
+@pytest.mark.parametrize("html_content", DOCS)
+@pytest.mark.parametrize("markdown", [False, True])
+def test_verbatim_output_is_unchanged(html_content: str, markdown: bool) -> None:
+    """The output is the same as with the blocks serialized and parsed again."""
+    options = Options(markdown=markdown)
+    expected = _render(_renderer(options), _prepare_html(options, html_content))
+    assert html22text(html_content, markdown=markdown) == expected
+
+
+def test_blocks_are_swapped() -> None:
+    """Only large blocks of text, optionally in one <code>, are swapped."""
+    swapped = [DOCS[0], DOCS[1], DOCS[6]]
+    verbatim: list[str] = []
+    html = _prepare_html(Options(), "".join([*swapped, DOCS[5]]), verbatim=verbatim)
+    assert len(verbatim) == len(swapped)
+    assert all(len(text) >= VERBATIM_SIZE for text in verbatim)
+    assert verbatim[0].startswith("  if (a[0] < b && c > d)")
+    assert "<pre>\ue0000\ue001</pre>" in html
+    assert "<pre><code>\ue0001\ue001</code></pre>" in html
+    assert "short &amp; sweet" in html
+
+
+def test_blocks_stay_when_unsafe() -> None:
+    """Token chars in the document and rules for <pre> or <code> disable it."""
+    verbatim: list[str] = []
+    _prepare_html(Options(), DOCS[7], verbatim=verbatim)
+    assert verbatim == []
+    rules = Options(tag_rules={"code": "unwrap"})
+    _prepare_html(rules, DOCS[1], verbatim=verbatim)
+    assert verbatim == []
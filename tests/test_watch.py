@@ -0,0 +1,122 @@
+# this_file: tests/test_watch.py
+
+"""Test watch mode and its change index."""
+
+import importlib
+import os
+from pathlib import Path
+
+import pytest
+
+from html22text import Options
+from html22text.batch import _convert_document, _Result
+from html22text.watch import INDEX_NAME, Watcher, watch
+
+
+def _touch(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def test_watcher_converts_only_changes(tmp_path: Path) -> None:
+    """Test that sync reconverts changed documents and removes deleted ones."""
+    src = tmp_path / "src"
+    out = tmp_path / "out"
+    _touch(src / "a.html", "<p>Alpha</p>")
+    _touch(src / "sub" / "b.html", "<p>Beta</p>")
+    _touch(src / "notes.txt", "not html")
+
+    watcher = Watcher(str(src), str(out), markdown=True)
+    assert sorted(watcher.sync()) == ["a.html", "sub/b.html"]
+    assert (out / "sub" / "b.md").read_text(encoding="utf-8") == "Beta\n"
+    assert watcher.sync() == []
+
+    # Same content with a new mtime is hashed but not reconverted.
+    stat = (src / "a.html").stat()
+    os.utime(src / "a.html", ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert watcher.sync() == []
+
+    _touch(src / "a.html", "<p>Alpha, edited</p>")
+    assert watcher.sync() == ["a.html"]
+    assert (out / "a.md").read_text(encoding="utf-8") == "Alpha, edited\n"
+
+    (src / "sub" / "b.html").unlink()
+    assert watcher.sync() == ["sub/b.html"]
+    assert not (out / "sub" / "b.md").exists()
+
+
+def test_watch_once_persists_index(tmp_path: Path) -> None:
+    """Test that a restarted watcher reuses the stored index."""
+    src = tmp_path / "src"
+    out = tmp_path / "out"
+    _touch(src / "a.html", "<p>Alpha</p>")
+
+    watch(str(src), str(out), once=True)
+
+    assert (out / "a.txt").read_text(encoding="utf-8") == "Alpha\n"
+    assert (out / INDEX_NAME).is_file()
+    assert Watcher(str(src), str(out)).sync() == []
+
+
+def test_restart_with_other_options_reconverts(tmp_path: Path) -> None:
+    """Test that changed options reconvert everything and drop stale outputs."""
+    src = tmp_path / "src"
+    out = tmp_path / "out"
+    _touch(src / "a.html", "<p>Alpha <b>bold</b></p><aside>Ad</aside>")
+    assert Watcher(str(src), str(out)).sync() == ["a.html"]
+
+    assert Watcher(str(src), str(out), markdown=True).sync() == ["a.html"]
+    assert (out / "a.md").read_text(encoding="utf-8") == "Alpha **bold**\n\nAd\n"
+    assert not (out / "a.txt").exists()
+
+    assert Watcher(str(src), str(out), markdown=True, kill_tags="aside").sync() == [
+        "a.html"
+    ]
+    assert (out / "a.md").read_text(encoding="utf-8") == "Alpha **bold**\n"
+    assert Watcher(str(src), str(out), markdown=True, kill_tags="aside").sync() == []
+
+
+def test_missing_output_is_reconverted(tmp_path: Path) -> None:
+    """Test that an output deleted behind the watcher's back is written again."""
+    src = tmp_path / "src"
+    out = tmp_path / "out"
+    _touch(src / "a.html", "<p>Alpha</p>")
+    watcher = Watcher(str(src), str(out))
+    assert watcher.sync() == ["a.html"]
+
+    (out / "a.txt").unlink()
+    assert watcher.sync() == ["a.html"]
+    assert Watcher(str(src), str(out)).sync() == []
+    (out / "a.txt").unlink()
+    assert Watcher(str(src), str(out)).sync() == ["a.html"]
+    assert (out / "a.txt").read_text(encoding="utf-8") == "Alpha\n"
+
+
+def test_failed_document_is_retried_only_when_changed(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    """Test that a page without output is not reconverted on every poll."""
+    src = tmp_path / "src"
+    out = tmp_path / "out"
+    _touch(src / "a.html", "<p>Alpha</p>")
+    _touch(src / "b.html", "<p>boom</p>")
+    attempts: list[str] = []
+
+    def convert_document(member_name: str, data: bytes, options: Options) -> _Result:
+        attempts.append(member_name)
+        if b"boom" in data:
+            error_message = "boom"
+            raise ValueError(error_message)
+        return _convert_document(member_name, data, options)
+
+    watch_module = importlib.import_module("html22text.watch")
+    monkeypatch.setattr(watch_module, "_convert_document", convert_document)
+    watcher = Watcher(str(src), str(out))
+    assert watcher.sync() == ["a.html"]
+    assert watcher.sync() == []
+    assert sorted(attempts) == ["a.html", "b.html"]
+    assert capsys.readouterr().err.count("b.html: error: boom") == 1
+
+    _touch(src / "b.html", "<p>Beta</p>")
+    assert watcher.sync() == ["b.html"]
+    assert (out / "b.txt").read_text(encoding="utf-8") == "Beta\n"
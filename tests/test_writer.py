@@ -0,0 +1,160 @@
+# this_file: tests/test_writer.py
+
+"""Test the atomic directory sink and the background writer thread."""
+
+import os
+from pathlib import Path
+from typing import cast
+
+import pytest
+
+from html22text.batch import FSYNC_POLICIES, Sink, _DirectorySink, batch_convert
+from html22text.writer import BackgroundWriter
+
+OLD_MTIME_NS = 1_000_000_000_000_000_000
+
+
+class _FailingSink:
+    """Sink whose writes fail after a number of documents."""
+
+    def __init__(self, fail_after: int) -> None:
+        self.fail_after = fail_after
+        self.names: list[str] = []
+        self.closed = False
+
+    def write(self, name: str, data: bytes) -> None:
+        del data
+        if len(self.names) >= self.fail_after:
+            error_message = "disk full"
+            raise OSError(error_message)
+        self.names.append(name)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+@pytest.mark.parametrize("fsync", FSYNC_POLICIES)
+def test_directory_sink_writes_atomically(tmp_path: Path, fsync: str) -> None:
+    """Test that every policy leaves complete files and no temporaries."""
+    sink = _DirectorySink(str(tmp_path), fsync)
+    sink.write("a.txt", b"first")
+    sink.write("sub/dir/b.txt", b"second")
+    sink.close()
+    assert (tmp_path / "a.txt").read_bytes() == b"first"
+    assert (tmp_path / "sub" / "dir" / "b.txt").read_bytes() == b"second"
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_directory_sink_batch_policy_renames_on_flush(tmp_path: Path) -> None:
+    """Test that with the batch policy files appear when flushed."""
+    sink = _DirectorySink(str(tmp_path), "batch")
+    sink.write("a.txt", b"data")
+    assert not (tmp_path / "a.txt").exists()
+    sink.flush()
+    assert (tmp_path / "a.txt").read_bytes() == b"data"
+
+
+def test_directory_sink_rejects_escaping_names(tmp_path: Path) -> None:
+    """Test that names leading outside the root, also by a symlink, fail."""
+    out = tmp_path / "out"
+    sink = _DirectorySink(str(out))
+    with pytest.raises(ValueError, match="Unsafe member path"):
+        sink.write("../escaped.txt", b"data")
+    (out / "link").symlink_to(tmp_path)
+    with pytest.raises(ValueError, match="Unsafe member path"):
+        sink.write("link/escaped.txt", b"data")
+    assert not list(tmp_path.rglob("escaped.txt"))
+
+
+def test_directory_sink_skips_unchanged(tmp_path: Path) -> None:
+    """Test that identical content is not rewritten."""
+    path = tmp_path / "a.txt"
+    path.write_bytes(b"same")
+    os.utime(path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+    sink = _DirectorySink(str(tmp_path))
+    sink.write("a.txt", b"same")
+    assert path.stat().st_mtime_ns == OLD_MTIME_NS
+    sink.write("a.txt", b"diff")
+    assert path.read_bytes() == b"diff"
+    assert (sink.written, sink.skipped) == (1, 1)
+
+
+def test_directory_sink_rejects_unknown_policy(tmp_path: Path) -> None:
+    """Test that an invalid fsync policy is rejected."""
+    with pytest.raises(ValueError, match="fsync"):
+        _DirectorySink(str(tmp_path), "sometimes")
+
+
+def test_background_writer_writes_in_order(tmp_path: Path) -> None:
+    """Test that queued documents all reach the sink."""
+    writer = BackgroundWriter(_DirectorySink(str(tmp_path)), batch_size=3)
+    for i in range(10):
+        writer.write(f"{i}.txt", str(i).encode())
+    writer.close()
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(
+        f"{i}.txt" for i in range(10)
+    )
+
+
+def test_background_writer_reports_errors() -> None:
+    """Test that a failing sink neither blocks producers nor goes unnoticed."""
+    sink = _FailingSink(fail_after=2)
+    writer = BackgroundWriter(cast("Sink", sink), batch_size=1, max_pending=2)
+    for i in range(3):
+        writer.write(f"{i}.txt", b"x")
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()
+    with pytest.raises(OSError, match="disk full"):
+        writer.write("3.txt", b"x")
+    assert sink.names == ["0.txt", "1.txt"]
+
+
+def test_batch_rerun_keeps_unchanged_outputs(tmp_path: Path) -> None:
+    """Test that reconverting leaves unchanged outputs untouched."""
+    src = tmp_path / "site"
+    src.mkdir()
+    (src / "a.html").write_text("<p>A</p>", encoding="utf-8")
+    (src / "b.html").write_text("<p>B</p>", encoding="utf-8")
+    out = tmp_path / "out"
+    batch_convert(str(src), str(out), jobs=1, fsync="batch")
+    for path in out.iterdir():
+        os.utime(path, ns=(OLD_MTIME_NS, OLD_MTIME_NS))
+    (src / "b.html").write_text("<p>B2</p>", encoding="utf-8")
+    assert batch_convert(str(src), str(out), jobs=1) == 2
+    assert (out / "a.txt").stat().st_mtime_ns == OLD_MTIME_NS
+    assert (out / "b.txt").read_text(encoding="utf-8") == "B2\n"
+
+
+def test_batch_fsync_rewrites_pending_name(tmp_path: Path) -> None:
+    """Test that the last of two writes of a name before a flush wins."""
+    sink = _DirectorySink(str(tmp_path), "batch")
+    sink.write("a.txt", b"first")
+    sink.write("a.txt", b"second")
+    sink.flush()
+    assert (tmp_path / "a.txt").read_bytes() == b"second"
+    assert sink.pending == {}
+    assert [path.name for path in tmp_path.iterdir()] == ["a.txt"]
+
+    # Writing the content on disk again must not keep the pending write
+    sink.write("a.txt", b"third")
+    sink.write("a.txt", b"second")
+    sink.close()
+    assert (tmp_path / "a.txt").read_bytes() == b"second"
+
+
+def test_background_writer_raises_first_error(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test that an error in closing the sink does not hide the first one."""
+    sink = _FailingSink(fail_after=0)
+
+    def failing_close() -> None:
+        error_message = "close failed"
+        raise OSError(error_message)
+
+    monkeypatch.setattr(sink, "close", failing_close)
+    writer = BackgroundWriter(cast("Sink", sink), batch_size=1)
+    writer.write("0.txt", b"x")
+    with pytest.raises(OSError, match="disk full"):
+        writer.close()